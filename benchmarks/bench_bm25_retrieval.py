@@ -0,0 +1,101 @@
+"""
+BM25F Retrieval Benchmark
+Compares single-query latency and ranking quality (share of queries whose
+source document is in the top k) of the TF-IDF index and the BM25F index,
+with and without MaxScore early termination, and checks that early
+termination returns the same scores as scoring every posting.
+
+Usage:
+    python benchmarks/bench_bm25_retrieval.py --docs 1000 100000 --top-k 5
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+from synthetic_corpus import make_destinations, make_queries
+
+from rag.bm25_retrieval import BM25FIndex
+from rag.rag_retrieval import DestinationIndex
+from src.common.batch_runner import percentile
+
+
+def measure(search, queries, sources, top_k):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query, top_k))
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    hits = sum(
+        source in [idx for idx, _ in matches]
+        for source, matches in zip(sources, results)
+    )
+    return results, {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_second": round(len(queries) / (sum(latencies) / 1000), 1),
+        f"success_at_{top_k}": round(hits / len(queries), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    results = []
+    for num_docs in args.docs:
+        print(f"🏗️ Building indexes over {num_docs} synthetic destinations...")
+        destinations = make_destinations(num_docs)
+        queries, sources = make_queries(destinations, args.queries, return_sources=True)
+        started = time.perf_counter()
+        tfidf = DestinationIndex.fit(destinations)
+        tfidf_build = time.perf_counter() - started
+        started = time.perf_counter()
+        bm25 = BM25FIndex.fit(destinations)
+        bm25_build = time.perf_counter() - started
+
+        backends = {
+            "tfidf": tfidf.search,
+            "bm25f-exhaustive": lambda q, k: bm25.search_one(
+                q, k, early_termination=False
+            ),
+            "bm25f-maxscore": bm25.search_one,
+        }
+        matches = {}
+        for name, search in backends.items():
+            matches[name], stats = measure(search, queries, sources, args.top_k)
+            stats.update(docs=num_docs, backend=name)
+            stats["build_seconds"] = round(
+                tfidf_build if name == "tfidf" else bm25_build, 2
+            )
+            results.append(stats)
+            print(
+                f"{name:>17} | {stats['p50_ms']:8.3f}ms p50 | "
+                f"{stats['p99_ms']:8.3f}ms p99 | "
+                f"{stats['queries_per_second']:9.1f} q/s | "
+                f"success@{args.top_k} {stats[f'success_at_{args.top_k}']:.3f}"
+            )
+
+        exact = all(
+            np.allclose(
+                [score for _, score in full], [score for _, score in pruned], rtol=1e-5
+            )
+            for full, pruned in zip(
+                matches["bm25f-exhaustive"], matches["bm25f-maxscore"]
+            )
+        )
+        print(f"{'MaxScore exact':>17} | {'✅' if exact else '❌'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"top_k": args.top_k, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+End-to-End Benchmark
+Points parts 1-5 at the local mock OpenAI server (mock_openai_server.py)
+and measures throughput, latency percentiles and memory per part at
+several concurrency levels, plus find_relevant_destinations latency for
+corpus sizes from 10 to 1M documents. Results are saved as JSON tagged
+with the git commit, so runs can be diffed between commits.
+
+Each part runs in its own interpreter, so memory numbers and module-level
+state (clients, caches, schedulers) do not leak from one part to the next.
+
+Usage:
+    python benchmarks/bench_end_to_end.py --profile fast --concurrency 1 4 16
+    python benchmarks/bench_end_to_end.py --parts part1 part2 --skip-retrieval
+    python benchmarks/bench_end_to_end.py --parts --corpus-sizes 10 1000 1000000
+    python benchmarks/bench_end_to_end.py --baseline bench_end_to_end_abc1234.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+sys.path.append(REPO_ROOT)
+
+from mock_openai_server import (  # noqa: E402
+    MockServer,
+    add_profile_arguments,
+    profile_from_args,
+)
+from src.common.batch_runner import percentile  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+QUERIES = [
+    "Plan a 5-day trip to Tokyo in September with a mid-range budget",
+    "Find flights from NYC to Tokyo on 2025-09-15 and the weather there",
+    "Convert 1500 USD to EUR for a week of food and museums in Paris",
+    "Which beaches in Bali are best for snorkelling, and what should I eat?",
+]
+DEFAULT_CORPUS_SIZES = [10, 1000, 100000, 1000000]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def latency_summary(latencies_ms):
+    ordered = sorted(latencies_ms)
+    return {f"p{p}_ms": round(percentile(ordered, p), 2) for p in (50, 90, 95, 99)}
+
+
+async def _consume_stream(stream):
+    """Drain an async text stream; returns the time to its first piece."""
+    started = time.perf_counter()
+    first = None
+    async for _ in stream:
+        if first is None:
+            first = time.perf_counter() - started
+    return first
+
+
+# Part sessions: set up what a part shares across requests, then yield
+# `run(query)`, which answers one query and returns its time to first
+# token when the part streams text (else None)
+
+
+@asynccontextmanager
+async def part1_session():
+    import simple_travel_assistant as part
+
+    yield lambda query: _consume_stream(
+        part.astream_travel_advice(query, use_cache=False)
+    )
+
+
+@asynccontextmanager
+async def part2_session():
+    import rag_travel_assistant as part
+
+    yield lambda query: _consume_stream(
+        part.astream_rag_enhanced_advice(query, use_cache=False)
+    )
+
+
+@asynccontextmanager
+async def part3_session():
+    import single_agent_tools as part
+
+    async def run(query):
+        # Agents keep their conversation, so each query gets a fresh one
+        await part.create_travel_agent().run(task=query)
+
+    yield run
+    await part.get_model_client().close()
+
+
+@asynccontextmanager
+async def part4_session(parallel=False):
+    import multi_agent_system as part
+
+    async def run(query):
+        team = part.TravelTeam(part.get_model_client())
+        if parallel:
+            async for _ in team.parallel_runner.run_stream(query):
+                pass
+        else:
+            await team.team.run(task=query)
+
+    yield run
+    await part.get_model_client().close()
+
+
+@asynccontextmanager
+async def part5_session():
+    import mcp_integrated_autogen as part
+    from src.part5_mcp.mcp_pool import McpServerPool, default_server_params
+
+    pool_size = int(os.getenv("MCP_POOL_SIZE", "2"))
+    async with McpServerPool(default_server_params(), size=pool_size) as pool:
+        tools = await pool.tools()
+
+        async def run(query):
+            await part.create_travel_agent(tools).run(task=query)
+
+        yield run
+    await part.get_model_client().close()
+
+
+# Target -> (folder under src/ the part's script lives in, session factory)
+PARTS = {
+    "part1": ("part1_simple_llm", part1_session),
+    "part2": ("part2_rag", part2_session),
+    "part3": ("part3_single_agent", part3_session),
+    "part4": ("part4_multi_agent", part4_session),
+    "part4-parallel": ("part4_multi_agent", lambda: part4_session(parallel=True)),
+    "part5": ("part5_mcp", part5_session),
+}
+
+
+def _mock_stats():
+    import httpx
+
+    base_url = os.environ["GITHUB_MODELS_BASE_URL"]
+    return httpx.get(f"{base_url}/stats").json()
+
+
+async def run_level(run, concurrency, num_requests):
+    """`num_requests` queries through `run` with `concurrency` in flight."""
+    counter = itertools.count()
+    latencies, ttfts, errors = [], [], []
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= num_requests:
+                return
+            started = time.perf_counter()
+            try:
+                ttft = await run(QUERIES[i % len(QUERIES)])
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            if ttft is not None:
+                ttfts.append(ttft * 1000)
+
+    calls_before = _mock_stats()["requests"]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    llm_calls = _mock_stats()["requests"] - calls_before
+
+    result = {
+        "concurrency": concurrency,
+        "requests": num_requests,
+        "errors": len(errors),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "llm_calls_per_request": round(llm_calls / num_requests, 2),
+        **latency_summary(latencies),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if ttfts:
+        result["ttft_p50_ms"] = round(percentile(sorted(ttfts), 50), 2)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+async def bench_part(name, levels, num_requests):
+    folder, session = PARTS[name]
+    # Parts import their sibling packages (rag, tools) from the script folder
+    sys.path.insert(0, os.path.join(SRC_DIR, folder))
+    started = time.perf_counter()
+    async with session() as run:
+        # One untimed query loads indexes, SDKs and connections
+        await run(QUERIES[0])
+        result = {
+            "warm_up_seconds": round(time.perf_counter() - started, 3),
+            "baseline_rss_mb": peak_rss_mb(),
+            "levels": [],
+        }
+        for concurrency in levels:
+            requests = num_requests or max(8, 2 * concurrency)
+            level = await run_level(run, concurrency, requests)
+            result["levels"].append(level)
+    return result
+
+
+def bench_retrieval(corpus_sizes, num_queries):
+    """find_relevant_destinations latency over synthetic corpora."""
+    from synthetic_corpus import make_destinations, make_queries
+
+    from rag.rag_retrieval import DestinationIndex, find_relevant_destinations
+
+    results = []
+    for size in corpus_sizes:
+        destinations = make_destinations(size)
+        started = time.perf_counter()
+        index = DestinationIndex.fit(destinations)
+        build_seconds = time.perf_counter() - started
+        queries = make_queries(destinations, num_queries)
+        find_relevant_destinations(queries[0], destinations, index=index)
+
+        latencies = []
+        started = time.perf_counter()
+        for query in queries:
+            query_started = time.perf_counter()
+            find_relevant_destinations(query, destinations, index=index)
+            latencies.append((time.perf_counter() - query_started) * 1000)
+        elapsed = time.perf_counter() - started
+        results.append(
+            {
+                "documents": size,
+                "build_seconds": round(build_seconds, 3),
+                "queries_per_second": round(len(queries) / elapsed, 1),
+                **latency_summary(latencies),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+        )
+        del destinations, index
+    return results
+
+
+def run_worker(args):
+    """Child-process entry point: benchmark one target, write its JSON."""
+    try:
+        if args.worker == "retrieval":
+            result = bench_retrieval(args.corpus_sizes, args.retrieval_queries)
+        else:
+            result = asyncio.run(
+                bench_part(args.worker, args.concurrency, args.requests)
+            )
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    with open(args.worker_output, "w", encoding="utf-8") as file:
+        json.dump(result, file)
+
+
+def spawn_worker(target, args, env):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as file:
+        output = file.name
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--worker",
+        target,
+        "--worker-output",
+        output,
+        "--concurrency",
+        *map(str, args.concurrency),
+        "--corpus-sizes",
+        *map(str, args.corpus_sizes),
+        "--retrieval-queries",
+        str(args.retrieval_queries),
+    ]
+    if args.requests:
+        command += ["--requests", str(args.requests)]
+    try:
+        subprocess.run(command, env=env, cwd=BENCH_DIR, check=False)
+        with open(output, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        return {"error": f"worker failed: {e}"}
+    finally:
+        if os.path.exists(output):
+            os.remove(output)
+
+
+def git_revision():
+    def git(*command):
+        return subprocess.run(
+            ["git", *command], cwd=REPO_ROOT, capture_output=True, text=True
+        ).stdout.strip()
+
+    try:
+        commit = git("rev-parse", "--short", "HEAD") or "unknown"
+        dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    except OSError:
+        return "unknown", False
+    return commit, dirty
+
+
+def print_part(name, result):
+    if "error" in result:
+        print(f"⚠️ {name:<15} skipped: {result['error']}")
+        return
+    for level in result["levels"]:
+        ttft = level.get("ttft_p50_ms")
+        print(
+            f"🚀 {name:<15} c={level['concurrency']:<4}"
+            f"{level['throughput_rps']:8.2f} req/s  "
+            f"p50={level['p50_ms']:8.1f}ms p95={level['p95_ms']:8.1f}ms"
+            + (f" ttft={ttft:6.1f}ms" if ttft is not None else "")
+            + f"  {level['llm_calls_per_request']:.1f} calls/req"
+            f"  rss={level['peak_rss_mb']}MB"
+            + (f"  ❌ {level['errors']} errors" if level["errors"] else "")
+        )
+
+
+def print_comparison(baseline, current):
+    """Relative change of the headline numbers against a baseline run."""
+
+    def change(old, new):
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "   n/a"
+
+    print(f"\n📊 Against {baseline.get('commit')} (positive = higher):")
+    for name, result in current["parts"].items():
+        old = baseline.get("parts", {}).get(name, {})
+        old_levels = {lvl["concurrency"]: lvl for lvl in old.get("levels", [])}
+        for level in result.get("levels", []):
+            previous = old_levels.get(level["concurrency"])
+            if previous:
+                print(
+                    f"   {name:<15} c={level['concurrency']:<4}"
+                    f" throughput {change(previous['throughput_rps'], level['throughput_rps'])}"
+                    f"  p95 {change(previous['p95_ms'], level['p95_ms'])}"
+                )
+    old_sizes = {r["documents"]: r for r in baseline.get("retrieval") or []}
+    for size in current.get("retrieval") or []:
+        previous = old_sizes.get(size["documents"])
+        if previous:
+            print(
+                f"   retrieval {size['documents']:>9} docs"
+                f"  p50 {change(previous['p50_ms'], size['p50_ms'])}"
+                f"  q/s {change(previous['queries_per_second'], size['queries_per_second'])}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_profile_arguments(parser)
+    parser.add_argument(
+        "--parts",
+        nargs="*",
+        choices=list(PARTS),
+        default=list(PARTS),
+        help="Parts to load-test (none: retrieval only)",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--requests",
+        type=int,
+        help="Queries per concurrency level (default: max(8, 2 x concurrency))",
+    )
+    parser.add_argument(
+        "--corpus-sizes", type=int, nargs="+", default=DEFAULT_CORPUS_SIZES
+    )
+    parser.add_argument("--retrieval-queries", type=int, default=200)
+    parser.add_argument("--skip-retrieval", action="store_true")
+    parser.add_argument("--output", help="JSON results path (default: per commit)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare with")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    profile = profile_from_args(args)
+    commit, dirty = git_revision()
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "profile": asdict(profile),
+        "parts": {},
+        "retrieval": None,
+    }
+
+    with MockServer(profile) as server:
+        print(f"🧪 Mock server at {server.base_url} ({profile.name} profile)")
+        env = {
+            **os.environ,
+            "GITHUB_MODELS_BASE_URL": server.base_url,
+            "GITHUB_TOKEN": "mock",
+            # Measure the parts, not the client-side GitHub Models limits
+            "MODEL_RPM": "0",
+            "MODEL_TPM": "0",
+            "MODEL_MAX_IN_FLIGHT": str(max(args.concurrency) * 8),
+            "MODEL_MAX_CONNECTIONS": str(max(args.concurrency) * 8),
+            "LLM_CACHE_ENABLED": "false",
+            "TELEMETRY_ENABLED": "false",
+        }
+        for name in args.parts:
+            print(f"⏳ {name}...")
+            results["parts"][name] = spawn_worker(name, args, env)
+            print_part(name, results["parts"][name])
+
+    if not args.skip_retrieval:
+        print(f"⏳ retrieval over {args.corpus_sizes} documents...")
+        retrieval = spawn_worker("retrieval", args, dict(os.environ))
+        if isinstance(retrieval, dict):
+            print(f"⚠️ retrieval skipped: {retrieval['error']}")
+        else:
+            results["retrieval"] = retrieval
+            for size in retrieval:
+                print(
+                    f"🔎 {size['documents']:>9} docs  "
+                    f"{size['queries_per_second']:10.1f} q/s  "
+                    f"p50={size['p50_ms']:.3f}ms p99={size['p99_ms']:.3f}ms  "
+                    f"build={size['build_seconds']:.1f}s rss={size['peak_rss_mb']}MB"
+                )
+
+    output = args.output or f"bench_end_to_end_{commit}.json"
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"💾 Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            print_comparison(json.load(file), results)
+
+
+if __name__ == "__main__":
+    main()
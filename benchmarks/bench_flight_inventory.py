@@ -0,0 +1,119 @@
+"""
+Flight Inventory Benchmark
+Builds a synthetic schedule with millions of fares and measures the
+latency of cheapest-k, max-stops and date-window searches.
+
+Usage:
+    python benchmarks/bench_flight_inventory.py --rows 5000000 --airports 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Make the part3 `tools` package importable from the benchmarks folder
+TOOLS_PARENT = os.path.join(
+    os.path.dirname(__file__), "..", "src", "part3_single_agent"
+)
+sys.path.append(os.path.abspath(TOOLS_PARENT))
+
+from tools.flight_inventory import FlightInventory  # noqa: E402
+
+
+def make_inventory(rows, num_airports, num_days, seed=0):
+    """Random schedule with popular hubs, as real route networks have."""
+    rng = np.random.default_rng(seed)
+    airports = [f"A{i:03d}" for i in range(num_airports)]
+    airlines = [f"Airline {i}" for i in range(40)]
+    # Zipf-like hub popularity
+    weights = 1.0 / np.arange(1, num_airports + 1)
+    weights /= weights.sum()
+    origin = rng.choice(num_airports, rows, p=weights)
+    destination = (origin + 1 + rng.choice(num_airports - 1, rows)) % num_airports
+    first_day = int(np.datetime64("2025-01-01", "D").astype(np.int64))
+    return FlightInventory.from_arrays(
+        origin,
+        destination,
+        first_day + rng.integers(0, num_days, rows),
+        np.round(rng.gamma(4.0, 150.0, rows), 2),
+        rng.integers(0, len(airlines), rows),
+        rng.integers(60, 1200, rows),
+        rng.choice(3, rows, p=[0.5, 0.35, 0.15]),
+        airports=airports,
+        airlines=airlines,
+    )
+
+
+def time_queries(inventory, queries, **search):
+    start = time.perf_counter()
+    found = 0
+    for origin, destination, date in queries:
+        found += len(inventory.search_rows(origin, destination, date, **search))
+    elapsed = time.perf_counter() - start
+    return elapsed / len(queries) * 1e6, found / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--airports", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    print(f"🏗️ Building inventory with {args.rows:,} synthetic fares...")
+    start = time.perf_counter()
+    built = make_inventory(args.rows, args.airports, args.days)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    # Sample queries from existing rows so most of them hit a route
+    sample = rng.choice(len(built), args.queries)
+    queries = [
+        (row["origin"], row["destination"], row["departure_date"])
+        for row in (built.row(i) for i in sample)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        built.save(directory)
+        del built
+        start = time.perf_counter()
+        inventory = FlightInventory.load(directory)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        scenarios = {
+            "cheapest-5": {"limit": 5},
+            "nonstop cheapest-5": {"limit": 5, "max_stops": 0},
+            "±3 days cheapest-5": {"limit": 5, "window_days": 3},
+            "±3 days all": {"window_days": 3},
+        }
+        results = {
+            "rows": args.rows,
+            "build_seconds": round(build_seconds, 2),
+            "mmap_load_ms": round(load_ms, 2),
+            "queries": {},
+        }
+        print(f"⚙️ Built in {build_seconds:.1f}s, memory-mapped in {load_ms:.1f}ms")
+        for name, search in scenarios.items():
+            # Warm the page cache before timing
+            time_queries(inventory, queries[:1000], **search)
+            micros, hits = time_queries(inventory, queries, **search)
+            results["queries"][name] = {
+                "mean_us": round(micros, 1),
+                "mean_results": round(hits, 2),
+            }
+            print(f"{name:>20} | {micros:8.1f} µs/query | {hits:6.2f} results")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Import Time Benchmark
+Imports the CLI and every part's module in a fresh interpreter with
+`python -X importtime`, reports the cumulative import time, and fails when
+a module pulls in a heavy dependency at import or exceeds its budget.
+
+Usage:
+    python benchmarks/bench_import_time.py --repeat 5 --max-ms 400
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Dependencies that must only be imported on first use
+HEAVY_MODULES = [
+    "sklearn",
+    "scipy",
+    "openai",
+    "autogen_core",
+    "autogen_agentchat",
+    "autogen_ext",
+]
+
+# Target -> (module, folder under src/ it is imported from)
+TARGETS = {
+    "cli": ("cli", ""),
+    "part1": ("simple_travel_assistant", "part1_simple_llm"),
+    "part2": ("rag_travel_assistant", "part2_rag"),
+    "part3": ("single_agent_tools", "part3_single_agent"),
+    "part4": ("multi_agent_system", "part4_multi_agent"),
+    "part5": ("mcp_integrated_autogen", "part5_mcp"),
+    # Spawned per stdio MCP session; needs the MCP SDK but nothing agent-side
+    "mcp-server": ("mcp_server", "part5_mcp"),
+}
+
+
+def measure(module, folder):
+    """Cumulative import time of `module` in µs and every module it loaded."""
+    folder = os.path.join(SRC_DIR, folder) if folder else SRC_DIR
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=folder,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([folder, SRC_DIR])},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1]
+        raise RuntimeError(error)
+
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        imported[name.strip()] = int(cumulative_us)
+    return imported[module], imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if a target's best import time exceeds this",
+    )
+    parser.add_argument("targets", nargs="*", default=list(TARGETS))
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    results = []
+    failures = []
+    for target in args.targets:
+        module, folder = TARGETS[target]
+        try:
+            runs = [measure(module, folder) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"⚠️ {target:<10} could not be imported: {e}")
+            results.append({"target": target, "error": str(e)})
+            failures.append(f"{target} could not be imported")
+            continue
+
+        best_ms = min(us for us, _ in runs) / 1000
+        imported = runs[0][1]
+        heavy = [name for name in HEAVY_MODULES if name in imported]
+        print(
+            f"📦 {target:<10} {best_ms:8.1f}ms" + (f"  heavy: {heavy}" if heavy else "")
+        )
+        results.append(
+            {"target": target, "module": module, "best_ms": best_ms, "heavy": heavy}
+        )
+        if heavy:
+            failures.append(f"{target} imports {', '.join(heavy)} at import time")
+        if args.max_ms is not None and best_ms > args.max_ms:
+            failures.append(f"{target} took {best_ms:.0f}ms > {args.max_ms:.0f}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Sharded Retrieval Benchmark
+Measures query throughput of ShardedDestinationIndex from 1 to N workers.
+
+Usage:
+    python benchmarks/bench_sharded_retrieval.py --docs 200000 --max-workers 8
+"""
+
+import argparse
+import json
+import os
+import time
+
+from synthetic_corpus import make_destinations, make_queries
+
+from rag.rag_retrieval import DestinationIndex
+from rag.sharded_retrieval import ShardedDestinationIndex
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def measure(index, queries, workers, executor, top_k, batch_size):
+    with ShardedDestinationIndex(index, workers, executor) as sharded:
+        # Warm up: start the workers and ship the shards before timing
+        sharded.search_batch(queries[:batch_size], top_k=top_k)
+
+        start = time.perf_counter()
+        for i in range(0, len(queries), batch_size):
+            sharded.search_batch(queries[i : i + batch_size], top_k=top_k)
+        elapsed = time.perf_counter() - start
+    return len(queries) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--executor", choices=["process", "thread", "both"], default="both"
+    )
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    print(f"🏗️ Building index over {args.docs} synthetic destinations...")
+    destinations = make_destinations(args.docs)
+    index = DestinationIndex.fit(destinations)
+    queries = make_queries(destinations, args.queries)
+
+    executors = ["process", "thread"] if args.executor == "both" else [args.executor]
+    results = []
+    for executor in executors:
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            qps = measure(
+                index, queries, workers, executor, args.top_k, args.batch_size
+            )
+            baseline = baseline or qps
+            results.append(
+                {
+                    "executor": executor,
+                    "workers": workers,
+                    "queries_per_second": round(qps, 1),
+                    "speedup": round(qps / baseline, 2),
+                }
+            )
+            print(
+                f"{executor:>7} | {workers:>3} workers | "
+                f"{qps:10.1f} q/s | x{qps / baseline:.2f}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"docs": args.docs, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Mock OpenAI Server
+Local stand-in for the GitHub Models chat completions endpoint, so every
+part can be load-tested offline and without network jitter. Supports
+streaming (SSE), tool calls and latency profiles (time to first token,
+tokens per second, jitter, rate-limit errors).
+
+Replies are canned but shaped like the workshop's conversations: tool
+calls for agents with tools, a numbered plan and then "FINISHED" for the
+Part 4 planner, an agent name for the LLM speaker selector.
+
+Usage:
+    python benchmarks/mock_openai_server.py --profile github-models --port 8080
+    GITHUB_MODELS_BASE_URL=http://127.0.0.1:8080 python src/cli.py part1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """How fast the mock model answers."""
+
+    name: str
+    ttft_ms: float = 0.0  # time to first token (or to the whole response)
+    tokens_per_second: float = 0.0  # generation speed, 0 = unlimited
+    jitter: float = 0.0  # +/- fraction applied to ttft_ms
+    completion_tokens: int = 120  # length of text replies
+    error_rate: float = 0.0  # fraction of requests answered with a 429
+
+
+PROFILES = {
+    "instant": LatencyProfile("instant"),
+    "fast": LatencyProfile("fast", ttft_ms=50, tokens_per_second=400, jitter=0.1),
+    # Roughly what gpt-4o-mini on GitHub Models feels like
+    "github-models": LatencyProfile(
+        "github-models", ttft_ms=450, tokens_per_second=80, jitter=0.3
+    ),
+    "slow": LatencyProfile("slow", ttft_ms=1500, tokens_per_second=25, jitter=0.3),
+    "rate-limited": LatencyProfile(
+        "rate-limited", ttft_ms=100, tokens_per_second=200, error_rate=0.1
+    ),
+}
+
+# Travel-shaped sample values for tool arguments, by parameter name
+SAMPLE_ARGUMENTS = {
+    "origin": "NYC",
+    "destination": "Tokyo",
+    "departure_date": "2025-09-15",
+    "location": "Tokyo",
+    "days": 3,
+    "amount": 100,
+    "from_currency": "USD",
+    "to_currency": "JPY",
+    "top_k": 3,
+}
+# Tool name parts that say nothing about what a tool is for
+GENERIC_TOOL_WORDS = {"get", "search", "find", "mcp", "info", "batch", "tool"}
+FILLER_WORDS = (
+    "Here is a practical plan for your trip with the best time to visit, "
+    "local attractions, a realistic budget and transport tips."
+).split()
+
+PLAN_FORMAT_RE = re.compile(r"<agent>\s*:\s*<task>")
+TEAM_MEMBER_RE = re.compile(r"^\s*-\s*(\w+Agent)\s*$", re.M)
+SELECTOR_RE = re.compile(r"select an agent from \[([^\]]*)\]", re.I)
+
+
+@dataclass
+class MockReply:
+    content: Optional[str] = None
+    tool_calls: Optional[List[Dict[str, Any]]] = None
+
+
+def _text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content)
+    return content
+
+
+def _filler(num_words: int, topic: str) -> str:
+    words = topic.split()[:8] + FILLER_WORDS
+    return " ".join(itertools.islice(itertools.cycle(words), num_words))
+
+
+def sample_arguments(schema: Dict[str, Any], root=None) -> Any:
+    """Arguments matching a JSON schema, preferring SAMPLE_ARGUMENTS."""
+    root = root or schema
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        return sample_arguments(root.get("$defs", {}).get(name, {}), root)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return sample_arguments(options[0] if options else {}, root)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type", "string")
+    if kind == "object":
+        return {
+            name: SAMPLE_ARGUMENTS.get(name, sample_arguments(prop, root))
+            for name, prop in schema.get("properties", {}).items()
+            if name in schema.get("required", []) or name in SAMPLE_ARGUMENTS
+        }
+    if kind == "array":
+        return [sample_arguments(schema.get("items", {}), root)]
+    return {"integer": 1, "number": 1.0, "boolean": False}.get(kind, "sample")
+
+
+def _choose_tools(tools: List[Dict[str, Any]], request_text: str):
+    """Tools whose name matches the request, or the first tool."""
+    request_text = request_text.lower()
+    chosen = []
+    for tool in tools:
+        words = set(tool["function"]["name"].lower().split("_"))
+        if any(word in request_text for word in words - GENERIC_TOOL_WORDS):
+            chosen.append(tool)
+    return chosen or tools[:1]
+
+
+def default_responder(body: Dict[str, Any], completion_tokens: int) -> MockReply:
+    """Canned reply for a chat completion request body."""
+    messages = body.get("messages", [])
+    system = " ".join(_text(m) for m in messages if m.get("role") == "system")
+    last = messages[-1] if messages else {}
+    user_messages = [_text(m) for m in messages if m.get("role") == "user"]
+    user_text = " ".join(user_messages)
+    topic = user_messages[-1] if user_messages else ""
+
+    selector = SELECTOR_RE.search(system + " " + user_text)
+    if selector:
+        names = re.findall(r"\w+", selector.group(1))
+        return MockReply(content=names[0] if names else "")
+
+    if PLAN_FORMAT_RE.search(system):
+        if any(m.get("role") == "assistant" for m in messages):
+            summary = _filler(completion_tokens, topic)
+            return MockReply(content=f"{summary}\n\nFINISHED")
+        members = TEAM_MEMBER_RE.findall(system)
+        plan = "\n".join(
+            f"{i}. {name} : Handle your part of: {topic}"
+            for i, name in enumerate(members, start=1)
+        )
+        return MockReply(content=plan)
+
+    tools = body.get("tools") or []
+    if tools and last.get("role") != "tool":
+        calls = []
+        for tool in _choose_tools(tools, _text(last)):
+            function = tool["function"]
+            arguments = sample_arguments(function.get("parameters", {}))
+            calls.append(
+                {
+                    "id": f"call_{random.getrandbits(48):012x}",
+                    "type": "function",
+                    "function": {
+                        "name": function["name"],
+                        "arguments": json.dumps(arguments),
+                    },
+                }
+            )
+        return MockReply(tool_calls=calls)
+
+    return MockReply(content=_filler(completion_tokens, topic))
+
+
+class MockStats:
+    """Request counters, readable from GET /stats."""
+
+    def __init__(self):
+        self.requests = 0
+        self.streamed = 0
+        self.tool_calls = 0
+        self.rate_limited = 0
+        self.completion_tokens = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def create_app(profile: LatencyProfile, responder=default_responder) -> Starlette:
+    """Starlette app serving /chat/completions (and /v1/chat/completions)."""
+    stats = MockStats()
+
+    def usage(body, completion_tokens):
+        prompt_chars = len(json.dumps(body.get("messages", [])))
+        prompt_tokens = prompt_chars // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def first_token_delay():
+        delay = profile.ttft_ms / 1000
+        if profile.jitter:
+            delay *= random.uniform(1 - profile.jitter, 1 + profile.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        stats.requests += 1
+        if profile.error_rate and random.random() < profile.error_rate:
+            stats.rate_limited += 1
+            return JSONResponse(
+                {"error": {"code": "RateLimitReached", "message": "Mock 429"}},
+                status_code=429,
+                headers={"retry-after-ms": "200"},
+            )
+
+        reply = responder(body, profile.completion_tokens)
+        completion_id = f"chatcmpl-mock{random.getrandbits(64):016x}"
+        model = body.get("model", "gpt-4o-mini")
+        words = reply.content.split(" ") if reply.content else []
+        completion_tokens = len(words) or len(reply.tool_calls or []) * 10
+        stats.completion_tokens += completion_tokens
+        finish_reason = "tool_calls" if reply.tool_calls else "stop"
+        if reply.tool_calls:
+            stats.tool_calls += len(reply.tool_calls)
+
+        if not body.get("stream"):
+            await first_token_delay()
+            if profile.tokens_per_second and words:
+                await asyncio.sleep(len(words) / profile.tokens_per_second)
+            message = {"role": "assistant", "content": reply.content}
+            if reply.tool_calls:
+                message["tool_calls"] = reply.tool_calls
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": message,
+                            "finish_reason": finish_reason,
+                        }
+                    ],
+                    "usage": usage(body, completion_tokens),
+                }
+            )
+
+        stats.streamed += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(delta, finish=None, chunk_usage=None):
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": (
+                    []
+                    if delta is None
+                    else [{"index": 0, "delta": delta, "finish_reason": finish}]
+                ),
+            }
+            if chunk_usage is not None:
+                data["usage"] = chunk_usage
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            await first_token_delay()
+            started = time.perf_counter()
+            yield chunk({"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                if profile.tokens_per_second:
+                    # Pace against a schedule, so slow sleeps do not add up
+                    due = started + i / profile.tokens_per_second
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                yield chunk({"content": word if i == 0 else " " + word})
+            for i, call in enumerate(reply.tool_calls or []):
+                yield chunk({"tool_calls": [{"index": i, **call}]})
+            yield chunk({}, finish_reason)
+            if include_usage:
+                yield chunk(None, chunk_usage=usage(body, completion_tokens))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def root(request: Request) -> Response:
+        # Connection warm-ups send HEAD requests to the base URL
+        return Response(status_code=200)
+
+    async def get_stats(request: Request) -> Response:
+        return JSONResponse(stats.as_dict())
+
+    app = Starlette(
+        routes=[
+            Route("/", root, methods=["GET", "HEAD"]),
+            Route("/chat/completions", chat_completions, methods=["POST"]),
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/stats", get_stats, methods=["GET"]),
+        ]
+    )
+    app.state.stats = stats
+    return app
+
+
+class MockServer:
+    """
+    The mock app served by uvicorn on a background thread:
+
+        with MockServer(PROFILES["fast"]) as server:
+            os.environ["GITHUB_MODELS_BASE_URL"] = server.base_url
+    """
+
+    def __init__(
+        self,
+        profile: LatencyProfile = PROFILES["instant"],
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.profile = profile
+        self.app = create_app(profile)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> MockStats:
+        return self.app.state.stats
+
+    def start(self) -> "MockServer":
+        # Bind here so port 0 resolves to a free port before serving
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        config = uvicorn.Config(
+            self.app, log_level="warning", lifespan="off", backlog=4096
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [sock]}, daemon=True
+        )
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Mock server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+            self._server = None
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def add_profile_arguments(parser) -> None:
+    """--profile plus per-field overrides of the chosen profile."""
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--ttft-ms", type=float)
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--completion-tokens", type=int)
+    parser.add_argument("--error-rate", type=float)
+
+
+def profile_from_args(args) -> LatencyProfile:
+    overrides = {
+        name: getattr(args, name)
+        for name in ("ttft_ms", "tokens_per_second", "completion_tokens", "error_rate")
+        if getattr(args, name) is not None
+    }
+    return replace(PROFILES[args.profile], **overrides)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_profile_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    profile = profile_from_args(args)
+    print(f"🧪 Mock OpenAI server ({profile}) on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
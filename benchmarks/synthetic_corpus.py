@@ -0,0 +1,79 @@
+"""
+Synthetic destination corpora for benchmarks.
+Scales the sample travel_data.json up to arbitrary sizes with a realistic,
+long-tailed vocabulary so retrieval benchmarks are not dominated by 5 rows.
+"""
+
+import os
+import random
+import sys
+
+# Make the part2 `rag` package (and the src.common modules it uses)
+# importable from the benchmarks folder
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..")
+RAG_PARENT = os.path.join(REPO_ROOT, "src", "part2_rag")
+sys.path.append(os.path.abspath(RAG_PARENT))
+sys.path.append(os.path.abspath(REPO_ROOT))
+
+from rag.rag_retrieval import load_travel_data  # noqa: E402
+
+TEXT_FIELDS = ("description", "cultural_tips", "weather_info")
+LIST_FIELDS = ("top_attractions", "local_cuisine")
+
+
+def _word_pool(destinations):
+    words = set()
+    for dest in destinations:
+        for field in TEXT_FIELDS:
+            words.update(dest[field].split())
+        for field in LIST_FIELDS:
+            for item in dest[field]:
+                words.update(item.split())
+    return sorted(words)
+
+
+def make_destinations(num_documents, seed=0, vocabulary_size=50000):
+    """Return `num_documents` destination records shaped like travel_data.json."""
+    rng = random.Random(seed)
+    base = load_travel_data()
+    common_words = _word_pool(base)
+    # Rare, place-specific words follow a long tail like real catalogues do
+    rare_words = [f"term{i}" for i in range(vocabulary_size)]
+
+    def sentence(length):
+        words = rng.choices(common_words, k=length)
+        words += rng.choices(rare_words, k=max(1, length // 4))
+        rng.shuffle(words)
+        return " ".join(words)
+
+    destinations = []
+    for i in range(num_documents):
+        template = base[i % len(base)]
+        destinations.append(
+            {
+                **template,
+                "destination": f"Place{i}, Region{i % 997}",
+                "description": sentence(16),
+                "top_attractions": [sentence(3) for _ in range(4)],
+                "local_cuisine": [sentence(2) for _ in range(4)],
+                "cultural_tips": sentence(8),
+                "weather_info": sentence(5),
+            }
+        )
+    return destinations
+
+
+def make_queries(destinations, num_queries, seed=1, return_sources=False):
+    """
+    Queries built from words of random documents, so most have matches.
+    With `return_sources=True` also returns the index of each query's
+    source document, for measuring ranking quality.
+    """
+    rng = random.Random(seed)
+    queries, sources = [], []
+    for _ in range(num_queries):
+        source = rng.randrange(len(destinations))
+        words = destinations[source]["description"].split()
+        queries.append(" ".join(rng.sample(words, k=min(4, len(words)))))
+        sources.append(source)
+    return (queries, sources) if return_sources else queries
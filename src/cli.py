@@ -0,0 +1,65 @@
+"""
+Travel Workshop CLI
+Single entry point for all workshop parts. Subcommands are loaded lazily:
+only the chosen part's script, and what it imports, is ever loaded.
+
+Usage:
+    python src/cli.py part1 "Plan a trip to Tokyo"
+    python src/cli.py part2 --batch queries.jsonl
+    python src/cli.py part4 --parallel
+    python src/cli.py mcp-server --transport sse --port 8000
+    python src/cli.py part3 --help     # options of a part
+"""
+
+import argparse
+import os
+import runpy
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand -> (script under src/, description)
+COMMANDS = {
+    "part1": (
+        "part1_simple_llm/simple_travel_assistant.py",
+        "Simple LLM travel advice",
+    ),
+    "part2": ("part2_rag/rag_travel_assistant.py", "RAG-enhanced travel advice"),
+    "part3": ("part3_single_agent/single_agent_tools.py", "Tool-enabled agent"),
+    "part4": ("part4_multi_agent/multi_agent_system.py", "Multi-agent team"),
+    "part5": ("part5_mcp/mcp_integrated_autogen.py", "Agent with MCP tools"),
+    "mcp-server": ("part5_mcp/mcp_server.py", "Search flights MCP server"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="AI travel planning workshop",
+        epilog="commands: "
+        + ", ".join(
+            f"{name} ({help_text})" for name, (_, help_text) in COMMANDS.items()
+        ),
+    )
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument(
+        "args", nargs=argparse.REMAINDER, help="Arguments for the command"
+    )
+    return parser
+
+
+def run_command(command: str, argv) -> None:
+    """Run a part's script as __main__, as if it had been started directly."""
+    script = os.path.join(SRC_DIR, COMMANDS[command][0])
+    # Parts import their sibling packages (rag, tools) from the script folder
+    sys.path.insert(0, os.path.dirname(script))
+    sys.argv = [script, *argv]
+    runpy.run_path(script, run_name="__main__")
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Batch Runner
+Streams queries from a JSONL file through an async handler with bounded
+concurrency, appends each result to an output JSONL file as soon as it
+finishes, and can resume after a crash by skipping completed IDs.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Set
+
+Handler = Callable[[str], Awaitable[str]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class BatchReport:
+    """Outcome and latency profile of one batch run."""
+
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Finished queries (completed or failed) per second."""
+        finished = self.completed + self.failed
+        return finished / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def latency_percentiles(self):
+        ordered = sorted(self.latencies_ms)
+        return {f"p{p}": percentile(ordered, p) for p in (50, 95, 99)}
+
+    def summary(self) -> str:
+        pcts = self.latency_percentiles()
+        return (
+            f"✅ {self.completed} completed, ❌ {self.failed} failed, "
+            f"⏭️ {self.skipped} skipped in {self.elapsed_seconds:.1f}s "
+            f"({self.throughput:.2f} queries/s)\n"
+            f"⏱️ Latency p50={pcts['p50']:.0f}ms "
+            f"p95={pcts['p95']:.0f}ms p99={pcts['p99']:.0f}ms"
+        )
+
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """IDs that already have a successful result in the output file."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a truncated last line behind
+                continue
+            if "error" not in record:
+                completed.add(str(record["id"]))
+    return completed
+
+
+def _read_queries(input_path, query_field, id_field):
+    with open(input_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            # Files without IDs fall back to line numbers, which stay stable
+            # across reruns of the same input
+            yield str(record.get(id_field, line_number)), record[query_field]
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    handler: Handler,
+    concurrency: int = 16,
+    query_field: str = "query",
+    id_field: str = "id",
+) -> BatchReport:
+    """
+    Answer every query of `input_path` with `handler` and append one JSON
+    line per query to `output_path`: {"id", "query", "response" | "error",
+    "latency_ms"}. Queries whose ID already succeeded are skipped.
+    """
+    completed_ids = load_completed_ids(output_path)
+    report = BatchReport()
+    # Bounded queue of (id, query) items, None telling a worker to stop:
+    # the input is streamed, never loaded as a whole
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    with open(output_path, "a", encoding="utf-8") as output:
+
+        def write(record):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                query_id, query = item
+                start = time.perf_counter()
+                try:
+                    response = await handler(query)
+                except Exception as e:
+                    record = {"id": query_id, "query": query, "error": str(e)}
+                    report.failed += 1
+                else:
+                    record = {"id": query_id, "query": query, "response": response}
+                    report.completed += 1
+                latency_ms = (time.perf_counter() - start) * 1000
+                record["latency_ms"] = round(latency_ms, 1)
+                report.latencies_ms.append(latency_ms)
+                write(record)
+
+        started = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for query_id, query in _read_queries(input_path, query_field, id_field):
+                if query_id in completed_ids:
+                    report.skipped += 1
+                    continue
+                await queue.put((query_id, query))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            report.elapsed_seconds = time.perf_counter() - started
+
+    return report
+
+
+def add_batch_arguments(parser) -> None:
+    """Command-line options shared by the assistants' batch mode."""
+    parser.add_argument(
+        "--batch",
+        metavar="QUERIES_JSONL",
+        help='Answer every {"id", "query"} line of a JSONL file',
+    )
+    parser.add_argument(
+        "--output",
+        default="results.jsonl",
+        help="JSONL file results are appended to (rerun to resume)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Queries in flight at once"
+    )
+
+
+def run_batch_cli(args, handler: Handler) -> BatchReport:
+    """Run the batch described by parsed `add_batch_arguments` options."""
+    print(f"📦 Batch: {args.batch} -> {args.output} (concurrency {args.concurrency})")
+    report = asyncio.run(
+        run_batch(args.batch, args.output, handler, concurrency=args.concurrency)
+    )
+    print(report.summary())
+    return report
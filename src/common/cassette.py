@@ -0,0 +1,366 @@
+"""
+Model Client Cassettes
+Record/replay layer for the AutoGen model clients of agent runs. Recording
+captures every create()/create_stream() call (a hash of the request, the
+CreateResult and, for streams, every chunk with its offset) to a compact
+JSON Lines cassette, gzip-compressed when the path ends in .gz. Replay
+serves the recorded responses back without a model endpoint, at the
+recorded speed or as fast as possible, so a conversation can be rerun
+deterministically and the orchestration overhead profiled on its own.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional
+
+from autogen_core.models import ChatCompletionClient, CreateResult, RequestUsage
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_CASSETTE_PATH = os.path.join(REPO_ROOT, ".model_cassette.jsonl.gz")
+CASSETTE_VERSION = 1
+# Context window assumed for remaining_tokens() while replaying
+REPLAY_CONTEXT_TOKENS = 128000
+
+
+class CassetteMiss(LookupError):
+    """Replay got a request that has no unused recording left."""
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _hash(payload) -> str:
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _tool_schema(tool) -> Dict[str, Any]:
+    return tool.schema if hasattr(tool, "schema") else dict(tool)
+
+
+def request_key(
+    messages, tools=(), tool_choice="auto", json_output=None, extra_create_args=None
+) -> str:
+    """Stable hash of everything that determines the model's answer."""
+    return _hash(
+        {
+            "messages": [message.model_dump() for message in messages],
+            "tools": [_tool_schema(tool) for tool in tools],
+            "tool_choice": getattr(tool_choice, "name", tool_choice),
+            "json_output": getattr(json_output, "__name__", json_output),
+            "extra": dict(extra_create_args or {}),
+        }
+    )
+
+
+def request_shape(messages, tools=()) -> str:
+    """
+    Hash of a request's structure only (message types, their senders and
+    the tool names), used to match requests whose contents changed, e.g.
+    because a tool returned a fresh timestamp.
+    """
+    return _hash(
+        {
+            "messages": [
+                f"{type(message).__name__}:{getattr(message, 'source', '') or ''}"
+                for message in messages
+            ],
+            "tools": sorted(_tool_schema(tool)["name"] for tool in tools),
+        }
+    )
+
+
+def _request_keys(messages, kwargs):
+    """request_key() and request_shape() of create()'s arguments."""
+    tools = kwargs.get("tools", ())
+    key = request_key(
+        messages,
+        tools,
+        kwargs.get("tool_choice", "auto"),
+        kwargs.get("json_output"),
+        kwargs.get("extra_create_args"),
+    )
+    return key, request_shape(messages, tools)
+
+
+class CassetteRecorder:
+    """Appends recorded calls to a cassette as they finish."""
+
+    def __init__(self, path: str, model_info: Dict[str, Any]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = _open(path, "w")
+        self._write(
+            {
+                "cassette": CASSETTE_VERSION,
+                "recorded_at": time.time(),
+                "model_info": dict(model_info),
+            }
+        )
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def offset(self) -> float:
+        return round(time.perf_counter() - self._started, 4)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        self._write(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    """
+    Records of a cassette, up to the last complete one. A recording cut
+    short (a crashed or interrupted run never closes the file) lacks the
+    gzip trailer and may end mid-line; everything before that is kept.
+    """
+    records = []
+    with _open(path, "r") as file:
+        try:
+            for line in file:
+                if not line.endswith("\n"):
+                    break
+                if line.strip():
+                    records.append(json.loads(line))
+        except EOFError:
+            pass
+    return records
+
+
+class CassettePlayer:
+    """
+    Recorded calls of a cassette, handed out once each. A request gets
+    the earliest unused recording with the same request hash; with
+    `strict=False` it falls back to one with the same request shape.
+    """
+
+    def __init__(self, path: str, strict: bool = False):
+        lines = _read_records(path)
+        if not lines or lines[0].get("cassette") != CASSETTE_VERSION:
+            raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+        self.path = path
+        self.strict = strict
+        self.model_info = lines[0]["model_info"]
+        self.entries: List[Dict[str, Any]] = lines[1:]
+        self._by_key = defaultdict(deque)
+        self._by_shape = defaultdict(deque)
+        for i, entry in enumerate(self.entries):
+            self._by_key[entry["key"]].append(i)
+            self._by_shape[entry["shape"]].append(i)
+        self._used = set()
+        self._lock = threading.Lock()
+        self.exact_matches = 0
+        self.shape_matches = 0
+
+    def _take_from(self, queue) -> Optional[int]:
+        while queue:
+            i = queue.popleft()
+            if i not in self._used:
+                self._used.add(i)
+                return i
+        return None
+
+    def take(self, key: str, shape: str) -> Dict[str, Any]:
+        with self._lock:
+            i = self._take_from(self._by_key.get(key, deque()))
+            if i is not None:
+                self.exact_matches += 1
+                return self.entries[i]
+            if not self.strict:
+                i = self._take_from(self._by_shape.get(shape, deque()))
+                if i is not None:
+                    self.shape_matches += 1
+                    return self.entries[i]
+        raise CassetteMiss(
+            f"No recorded response left for request {key[:12]} in {self.path}"
+        )
+
+    @property
+    def remaining(self) -> int:
+        return len(self.entries) - len(self._used)
+
+
+class RecordingModelClient(ChatCompletionClient):
+    """Delegating model client that records every call to a cassette."""
+
+    def __init__(self, client: ChatCompletionClient, recorder: CassetteRecorder):
+        self._client = client
+        self._recorder = recorder
+
+    def _entry(self, messages, kwargs, started: float) -> Dict[str, Any]:
+        key, shape = _request_keys(messages, kwargs)
+        return {"key": key, "shape": shape, "t": started}
+
+    async def create(self, messages, **kwargs) -> CreateResult:
+        entry = self._entry(messages, kwargs, self._recorder.offset())
+        started = time.perf_counter()
+        result = await self._client.create(messages, **kwargs)
+        entry["latency"] = round(time.perf_counter() - started, 4)
+        entry["result"] = result.model_dump(mode="json")
+        self._recorder.record(entry)
+        return result
+
+    async def create_stream(self, messages, **kwargs):
+        entry = self._entry(messages, kwargs, self._recorder.offset())
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self._client.create_stream(messages, **kwargs):
+            offset = round(time.perf_counter() - started, 4)
+            if isinstance(chunk, CreateResult):
+                entry["latency"] = offset
+                entry["result"] = chunk.model_dump(mode="json")
+            else:
+                chunks.append([offset, chunk])
+            yield chunk
+        entry["chunks"] = chunks
+        self._recorder.record(entry)
+
+    async def close(self) -> None:
+        self._recorder.close()
+        await self._client.close()
+
+    def actual_usage(self):
+        return self._client.actual_usage()
+
+    def total_usage(self):
+        return self._client.total_usage()
+
+    def count_tokens(self, messages, **kwargs) -> int:
+        return self._client.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages, **kwargs) -> int:
+        return self._client.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self._client.capabilities
+
+    @property
+    def model_info(self):
+        return self._client.model_info
+
+
+class ReplayModelClient(ChatCompletionClient):
+    """
+    Model client that answers from a cassette. With `realtime` every call
+    takes as long as it did when recorded (streams chunk by chunk);
+    otherwise responses come back immediately.
+    """
+
+    def __init__(self, player: CassettePlayer, realtime: bool = True):
+        self.player = player
+        self.realtime = realtime
+        self._usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    def _replay(self, messages, kwargs):
+        entry = self.player.take(*_request_keys(messages, kwargs))
+        result = CreateResult.model_validate(entry["result"])
+        self._usage = RequestUsage(
+            prompt_tokens=self._usage.prompt_tokens + result.usage.prompt_tokens,
+            completion_tokens=self._usage.completion_tokens
+            + result.usage.completion_tokens,
+        )
+        return entry, result
+
+    async def create(self, messages, **kwargs) -> CreateResult:
+        entry, result = self._replay(messages, kwargs)
+        if self.realtime:
+            await asyncio.sleep(entry["latency"])
+        return result
+
+    async def create_stream(self, messages, **kwargs):
+        entry, result = self._replay(messages, kwargs)
+        chunks = entry.get("chunks")
+        if chunks is None:
+            # Recorded from create(): one chunk with the whole text
+            content = result.content if isinstance(result.content, str) else ""
+            chunks = [[entry["latency"], content]] if content else []
+        started = time.perf_counter()
+        for offset, text in chunks:
+            if self.realtime:
+                # Sleep against the recorded schedule so delays do not add up
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield text
+        if self.realtime:
+            delay = started + entry["latency"] - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield result
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self):
+        return self._usage
+
+    def total_usage(self):
+        return self._usage
+
+    def count_tokens(self, messages, **kwargs) -> int:
+        # No tokenizer without the real client; about four characters per token
+        chars = sum(len(json.dumps(m.model_dump(), default=str)) for m in messages)
+        return chars // 4
+
+    def remaining_tokens(self, messages, **kwargs) -> int:
+        return REPLAY_CONTEXT_TOKENS - self.count_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        info = self.player.model_info
+        return {
+            "vision": info.get("vision", False),
+            "function_calling": info.get("function_calling", False),
+            "json_output": info.get("json_output", False),
+        }
+
+    @property
+    def model_info(self):
+        return self.player.model_info
+
+
+def cassette_from_env(factory):
+    """
+    `factory()` wrapped per MODEL_CASSETTE_MODE: "record" records its calls
+    to MODEL_CASSETTE_PATH, "replay" answers from that cassette without
+    building the real client (MODEL_CASSETTE_SPEED "recorded" or "fast"),
+    and "off" (the default) returns the client as is.
+    """
+    mode = os.getenv("MODEL_CASSETTE_MODE", "off").lower()
+    path = os.getenv("MODEL_CASSETTE_PATH") or DEFAULT_CASSETTE_PATH
+    if mode in ("", "off"):
+        return factory()
+    if mode == "record":
+        client = factory()
+        print(f"📼 Recording model calls to {path}")
+        return RecordingModelClient(client, CassetteRecorder(path, client.model_info))
+    if mode == "replay":
+        speed = os.getenv("MODEL_CASSETTE_SPEED", "recorded").lower()
+        if speed not in ("recorded", "fast"):
+            raise ValueError(f"MODEL_CASSETTE_SPEED must be recorded or fast: {speed}")
+        player = CassettePlayer(path)
+        print(f"📼 Replaying {len(player.entries)} model calls from {path} ({speed})")
+        return ReplayModelClient(player, realtime=speed == "recorded")
+    raise ValueError(f"MODEL_CASSETTE_MODE must be off, record or replay: {mode}")
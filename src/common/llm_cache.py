@@ -0,0 +1,290 @@
+"""
+LLM Response Cache
+Two-tier cache for chat completions: an in-memory LRU in front of a local
+SQLite store, both with TTL expiry and size-bounded eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.common.telemetry import event, record_llm_usage, span
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_CACHE_PATH = os.path.join(REPO_ROOT, ".llm_cache.sqlite3")
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """Stable hash of everything that determines the model's answer."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a ResponseCache."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """
+    In-memory LRU tier backed by an optional SQLite tier.
+
+    Entries expire `ttl_seconds` after they were stored. The memory tier
+    holds at most `max_memory_entries`; the disk tier is trimmed back to
+    `max_disk_entries` least recently used rows every `trim_every` writes.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 3600,
+        max_memory_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+        trim_every: int = 100,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.trim_every = trim_every
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed_at)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return value
+                del self._memory[key]
+                self.stats.expirations += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, expires_at = row
+                    if expires_at > now:
+                        self._db.execute(
+                            "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                            (now, key),
+                        )
+                        self._db.commit()
+                        self._remember(key, expires_at, value)
+                        self.stats.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.stats.expirations += 1
+
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % self.trim_every == 0:
+                self._trim_disk(now)
+            self._db.commit()
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            evicted_key, _ = self._memory.popitem(last=False)
+            self.stats.evictions += 1
+            if self._db is not None:
+                # Memory hits never touch the disk tier, so hand the entry's
+                # recency back to it on the way out of the LRU
+                self._db.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                    (time.time(), evicted_key),
+                )
+
+    def _trim_disk(self, now):
+        expired = self._db.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (now,)
+        ).rowcount
+        self.stats.expirations += expired
+        evicted = self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        ).rowcount
+        self.stats.evictions += evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def cache_enabled() -> bool:
+    """Whether LLM_CACHE_ENABLED opts the assistants into caching."""
+    return os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache configured from LLM_CACHE_PATH / LLM_CACHE_TTL."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH) or None,
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "3600")),
+        )
+    return _response_cache
+
+
+def request_cache_key(request) -> str:
+    """Cache key of a chat completion request's keyword arguments."""
+    return make_cache_key(
+        request["model"],
+        request["messages"],
+        request.get("temperature"),
+        request.get("max_tokens"),
+    )
+
+
+def load_cached_response(cache: ResponseCache, key: str):
+    """Cached ChatCompletion for `key`, or None on a miss or read error."""
+    # Imported here so the cache itself stays usable without the SDK
+    from openai.types.chat import ChatCompletion
+
+    try:
+        payload = cache.get(key)
+    except sqlite3.Error as e:
+        event("llm_cache.read_failed", f"⚠️ LLM cache read failed: {e}", "warning")
+        return None
+    return None if payload is None else ChatCompletion.model_validate_json(payload)
+
+
+def store_cached_response(cache: ResponseCache, key: str, response) -> None:
+    """Store a ChatCompletion; write errors are reported, not raised."""
+    try:
+        cache.set(key, response.model_dump_json())
+    except sqlite3.Error as e:
+        event("llm_cache.write_failed", f"⚠️ LLM cache write failed: {e}", "warning")
+
+
+def _record_completion(call_span, response, cached: bool) -> None:
+    usage = getattr(response, "usage", None)
+    prompt_tokens = usage.prompt_tokens if usage else None
+    completion_tokens = usage.completion_tokens if usage else None
+    if not cached:
+        record_llm_usage(prompt_tokens, completion_tokens)
+    call_span.set(
+        cached=cached,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+    )
+
+
+def cached_chat_completion(client, cache: Optional[ResponseCache], **request):
+    """
+    `client.chat.completions.create(**request)`, served from the cache
+    when an identical request was answered before.
+    """
+    with span("llm.call", model=request.get("model")) as call_span:
+        response = None
+        if cache is not None:
+            key = request_cache_key(request)
+            response = load_cached_response(cache, key)
+        cached = response is not None
+        if not cached:
+            response = client.chat.completions.create(**request)
+            if cache is not None:
+                store_cached_response(cache, key, response)
+        _record_completion(call_span, response, cached)
+        return response
+
+
+async def acached_chat_completion(client, cache: Optional[ResponseCache], **request):
+    """Async counterpart of cached_chat_completion for AsyncOpenAI clients."""
+    with span("llm.call", model=request.get("model")) as call_span:
+        response = None
+        if cache is not None:
+            key = request_cache_key(request)
+            response = load_cached_response(cache, key)
+        cached = response is not None
+        if not cached:
+            response = await client.chat.completions.create(**request)
+            if cache is not None:
+                store_cached_response(cache, key, response)
+        _record_completion(call_span, response, cached)
+        return response
@@ -0,0 +1,510 @@
+"""
+Shared Model Clients
+One factory for the GitHub Models clients used by parts 1-5. Every client
+shares a pooled keep-alive HTTP connection and one request scheduler that
+enforces requests-per-minute / tokens-per-minute budgets, bounds in-flight
+requests and retries rate-limited calls with jitter, honouring Retry-After.
+"""
+
+import asyncio
+import email.utils
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from typing import Optional
+
+import httpx
+
+from src.common.telemetry import observe, span
+
+GITHUB_MODELS_BASE_URL = "https://models.inference.ai.azure.com"
+DEFAULT_MODEL = "gpt-4o-mini"
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Completion size assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+# Request extension marking traffic that is not a model call (connection
+# warm-up), which must not spend rate-limit budget
+UNSCHEDULED = "unscheduled"
+# Skip warm-ups while a recent one should still have the connection open
+WARM_UP_INTERVAL = 30.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`.
+
+    `reserve` always succeeds and returns how long the caller has to wait
+    before its reservation is covered, so callers queue up fairly instead
+    of polling. A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        if self.rate_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._level = min(
+                self.capacity, self._level + elapsed * self.rate_per_second
+            )
+            self._updated = now
+            # Never ask for more than a full bucket, or it could never refill
+            self._level -= min(amount, self.capacity)
+            if self._level >= 0:
+                return 0.0
+            return -self._level / self.rate_per_second
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Server-requested delay from retry-after-ms / Retry-After headers."""
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+        if retry_at is None:
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Rough prompt + completion token cost of a chat completion request."""
+    try:
+        body = json.loads(request.read() or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return DEFAULT_COMPLETION_TOKENS
+    prompt_chars = len(json.dumps(body.get("messages", []), ensure_ascii=False))
+    completion_tokens = body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    # About four characters per token for English prompts
+    return prompt_chars // 4 + completion_tokens
+
+
+class RequestScheduler:
+    """
+    Rate-limit-aware scheduling shared by every model client in the process.
+
+    Requests wait for both the request and the token bucket, hold one of
+    `max_in_flight` slots until their response is closed (for streams,
+    until the last chunk is read), and a 429 pauses *all* callers until
+    the server's Retry-After has passed.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 15,
+        tokens_per_minute: float = 0,
+        max_in_flight: int = 8,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._blocked_until = 0.0
+        self._thread_slots = threading.BoundedSemaphore(max_in_flight)
+        # asyncio primitives belong to one event loop, so keep one per loop
+        self._loop_slots = weakref.WeakKeyDictionary()
+
+    def _admission_delay(self, tokens: int) -> float:
+        delay = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        return max(delay, self._blocked_until - time.monotonic())
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Jittered delay before retrying a failed response."""
+        retry_after = _retry_after_seconds(response)
+        if retry_after is not None:
+            # Spread the herd a little past the requested time
+            delay = retry_after + random.uniform(0, 0.1 * retry_after + 0.25)
+            if response.status_code == 429:
+                self._blocked_until = max(
+                    self._blocked_until, time.monotonic() + retry_after
+                )
+            return delay
+        # Full jitter exponential backoff
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    def _async_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._loop_slots.get(loop)
+        if slots is None:
+            slots = asyncio.Semaphore(self.max_in_flight)
+            self._loop_slots[loop] = slots
+        return slots
+
+    @asynccontextmanager
+    async def async_slot(self, tokens: int):
+        delay = self._admission_delay(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with self._async_slots():
+            yield
+
+    @contextmanager
+    def slot(self, tokens: int):
+        delay = self._admission_delay(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        with self._thread_slots:
+            yield
+
+
+def _record_request(request_span, response, attempt: int, queued: float) -> None:
+    """Telemetry of one scheduled request, up to its response headers."""
+    request_span.set(
+        status=response.status_code, retries=attempt, queue_ms=round(queued * 1000, 3)
+    )
+    observe("llm_queue_seconds", queued, "Time requests waited for the scheduler")
+
+
+class _SlotReleasingAsyncStream(httpx.AsyncByteStream):
+    """Response body that gives back its scheduler slot once closed."""
+
+    def __init__(self, stream, slot: AsyncExitStack):
+        self._stream = stream
+        self._slot = slot
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            await self._slot.aclose()
+
+
+class _SlotReleasingStream(httpx.SyncByteStream):
+    """Sync counterpart of _SlotReleasingAsyncStream."""
+
+    def __init__(self, stream, slot: ExitStack):
+        self._stream = stream
+        self._slot = slot
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._slot.close()
+
+
+class RateLimitedAsyncTransport(httpx.AsyncBaseTransport):
+    """Async httpx transport that routes every request through the scheduler."""
+
+    def __init__(self, scheduler: RequestScheduler, transport=None):
+        self.scheduler = scheduler
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.extensions.get(UNSCHEDULED):
+            return await self._transport.handle_async_request(request)
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        queued = 0.0
+        with span("llm.request", estimated_tokens=tokens) as request_span:
+            while True:
+                waiting = time.perf_counter()
+                slot = AsyncExitStack()
+                await slot.enter_async_context(self.scheduler.async_slot(tokens))
+                queued += time.perf_counter() - waiting
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except BaseException:
+                    await slot.aclose()
+                    raise
+                # Streamed bodies keep the slot until they are fully read
+                response.stream = _SlotReleasingAsyncStream(response.stream, slot)
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.scheduler.max_retries
+                ):
+                    _record_request(request_span, response, attempt, queued)
+                    return response
+                delay = self.scheduler.retry_delay(response, attempt)
+                await response.aclose()
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Sync counterpart of RateLimitedAsyncTransport for the OpenAI client."""
+
+    def __init__(self, scheduler: RequestScheduler, transport=None):
+        self.scheduler = scheduler
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.extensions.get(UNSCHEDULED):
+            return self._transport.handle_request(request)
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        queued = 0.0
+        with span("llm.request", estimated_tokens=tokens) as request_span:
+            while True:
+                waiting = time.perf_counter()
+                slot = ExitStack()
+                slot.enter_context(self.scheduler.slot(tokens))
+                queued += time.perf_counter() - waiting
+                try:
+                    response = self._transport.handle_request(request)
+                except BaseException:
+                    slot.close()
+                    raise
+                response.stream = _SlotReleasingStream(response.stream, slot)
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.scheduler.max_retries
+                ):
+                    _record_request(request_span, response, attempt, queued)
+                    return response
+                delay = self.scheduler.retry_delay(response, attempt)
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def _base_url() -> str:
+    return os.getenv("GITHUB_MODELS_BASE_URL", GITHUB_MODELS_BASE_URL)
+
+
+def _api_key() -> Optional[str]:
+    return os.getenv("GITHUB_TOKEN")
+
+
+def _pool_limits() -> httpx.Limits:
+    max_connections = int(os.getenv("MODEL_MAX_CONNECTIONS", "32"))
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=60.0,
+    )
+
+
+_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+_scheduler = None
+_sync_client = None
+_lock = threading.Lock()
+_warmed_at = {"sync": 0.0}
+# An httpx.AsyncClient's pool belongs to the event loop that first used
+# it, so async clients (and warm-ups) are kept per loop, like the
+# scheduler's semaphores; a closed loop's entries go away with it
+_async_clients = weakref.WeakKeyDictionary()
+_async_openai_clients = weakref.WeakKeyDictionary()
+_async_warmed_at = weakref.WeakKeyDictionary()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Process-wide scheduler configured from the MODEL_* environment."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(
+                requests_per_minute=float(os.getenv("MODEL_RPM", "15")),
+                tokens_per_minute=float(os.getenv("MODEL_TPM", "0")),
+                max_in_flight=int(os.getenv("MODEL_MAX_IN_FLIGHT", "8")),
+                max_retries=int(os.getenv("MODEL_MAX_RETRIES", "5")),
+            )
+        return _scheduler
+
+
+def get_http_client() -> httpx.Client:
+    """Pooled keep-alive sync HTTP client shared by the sync OpenAI client."""
+    global _sync_client
+    scheduler = get_scheduler()
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(
+                transport=RateLimitedTransport(
+                    scheduler, httpx.HTTPTransport(limits=_pool_limits())
+                ),
+                timeout=_TIMEOUT,
+            )
+        return _sync_client
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _new_async_http_client(scheduler: RequestScheduler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=RateLimitedAsyncTransport(
+            scheduler, httpx.AsyncHTTPTransport(limits=_pool_limits())
+        ),
+        timeout=_TIMEOUT,
+    )
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Pooled keep-alive async HTTP client shared by all async model clients
+    on the running event loop. Outside a loop every call gets a new client,
+    which binds to the loop that first uses it.
+    """
+    scheduler = get_scheduler()
+    loop = _running_loop()
+    if loop is None:
+        return _new_async_http_client(scheduler)
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = _new_async_http_client(scheduler)
+            _async_clients[loop] = client
+        return client
+
+
+def _needs_warm_up(kind: str) -> bool:
+    with _lock:
+        now = time.monotonic()
+        if kind == "async":
+            loop = asyncio.get_running_loop()
+            if now - _async_warmed_at.get(loop, 0.0) < WARM_UP_INTERVAL:
+                return False
+            _async_warmed_at[loop] = now
+            return True
+        if now - _warmed_at[kind] < WARM_UP_INTERVAL:
+            return False
+        _warmed_at[kind] = now
+        return True
+
+
+def warm_up_connection() -> bool:
+    """
+    Open a keep-alive connection (TCP + TLS) to the model endpoint in the
+    sync pool so the next request skips the handshake. Warm-ups bypass the
+    scheduler; failures are ignored since the real request will retry.
+    """
+    if not _needs_warm_up("sync"):
+        return False
+    try:
+        get_http_client().head(_base_url(), extensions={UNSCHEDULED: True})
+    except httpx.HTTPError:
+        return False
+    return True
+
+
+async def awarm_up_connection() -> bool:
+    """Async counterpart of warm_up_connection for the async pool."""
+    if not _needs_warm_up("async"):
+        return False
+    try:
+        await get_async_http_client().head(_base_url(), extensions={UNSCHEDULED: True})
+    except httpx.HTTPError:
+        return False
+    return True
+
+
+def lazy_client(factory):
+    """
+    Zero-argument accessor that builds `factory()` on its first call and
+    returns that client from then on. Modules keep clients behind one so
+    importing them neither constructs a client nor imports its SDK.
+    """
+    client = None
+    lock = threading.Lock()
+
+    def get():
+        nonlocal client
+        with lock:
+            if client is None:
+                client = factory()
+            return client
+
+    return get
+
+
+def get_openai_client():
+    """Sync OpenAI client for GitHub Models on the shared connection pool."""
+    from openai import OpenAI
+
+    # Retries are handled by the scheduler, which also sees other callers
+    return OpenAI(
+        base_url=_base_url(),
+        api_key=_api_key(),
+        http_client=get_http_client(),
+        max_retries=0,
+    )
+
+
+def get_async_openai_client():
+    """
+    Async OpenAI client for GitHub Models on the shared connection pool,
+    one per running event loop.
+    """
+    from openai import AsyncOpenAI
+
+    http_client = get_async_http_client()
+    loop = _running_loop()
+    with _lock:
+        cached = _async_openai_clients.get(loop) if loop is not None else None
+        if cached is not None and cached[0] is http_client:
+            return cached[1]
+        client = AsyncOpenAI(
+            base_url=_base_url(),
+            api_key=_api_key(),
+            http_client=http_client,
+            max_retries=0,
+        )
+        if loop is not None:
+            _async_openai_clients[loop] = (http_client, client)
+        return client
+
+
+def get_chat_completion_client(model: str = DEFAULT_MODEL):
+    """AutoGen model client for GitHub Models on the shared connection pool."""
+    from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+    return OpenAIChatCompletionClient(
+        model=model,
+        api_key=_api_key(),
+        base_url=_base_url(),
+        http_client=get_async_http_client(),
+        max_retries=0,
+    )
+
+
+def get_agent_model_client(model: str = DEFAULT_MODEL):
+    """
+    get_chat_completion_client() for the agent parts, recorded to or
+    replayed from a cassette when MODEL_CASSETTE_MODE is set.
+    """
+    from src.common.cassette import cassette_from_env
+
+    return cassette_from_env(lambda: get_chat_completion_client(model))
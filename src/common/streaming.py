@@ -0,0 +1,229 @@
+"""
+Streaming Chat Completions
+Sync and async generators that yield completion text deltas as they
+arrive, backed by the LLM response cache, and record time-to-first-token
+(TTFT) of every call, also as an llm.call telemetry span.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional
+
+from src.common.batch_runner import percentile
+from src.common.llm_cache import (
+    ResponseCache,
+    load_cached_response,
+    request_cache_key,
+    store_cached_response,
+)
+from src.common.telemetry import observe, record_llm_usage, span
+
+
+@dataclass
+class StreamTiming:
+    """Latency profile of one streamed completion."""
+
+    label: str
+    ttft_ms: Optional[float]
+    total_ms: float
+    cached: bool = False
+
+
+class TimingRecorder:
+    """Thread-safe record of the most recent `max_samples` stream timings."""
+
+    def __init__(self, max_samples: int = 1000):
+        self._timings = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, timing: StreamTiming) -> None:
+        with self._lock:
+            self._timings.append(timing)
+
+    def timings(self, label: Optional[str] = None) -> List[StreamTiming]:
+        with self._lock:
+            return [t for t in self._timings if label is None or t.label == label]
+
+    @property
+    def last(self) -> Optional[StreamTiming]:
+        with self._lock:
+            return self._timings[-1] if self._timings else None
+
+    def ttft_percentiles(self, label: Optional[str] = None):
+        ordered = sorted(
+            t.ttft_ms for t in self.timings(label) if t.ttft_ms is not None
+        )
+        return {f"p{p}": percentile(ordered, p) for p in (50, 95, 99)}
+
+
+_recorder = TimingRecorder()
+
+
+def get_timing_recorder() -> TimingRecorder:
+    """Process-wide recorder every streamed call reports to."""
+    return _recorder
+
+
+def _completion_from_stream(chunks, content: str):
+    """Assemble a ChatCompletion from streamed chunks for the response cache."""
+    from openai.types.chat import ChatCompletion
+
+    last = chunks[-1]
+    finish_reason = "stop"
+    for chunk in reversed(chunks):
+        if chunk.choices and chunk.choices[0].finish_reason:
+            finish_reason = chunk.choices[0].finish_reason
+            break
+    return ChatCompletion.model_validate(
+        {
+            "id": last.id,
+            "object": "chat.completion",
+            "created": last.created,
+            "model": last.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": finish_reason,
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+        }
+    )
+
+
+def _stream_request(request):
+    # Ask for the final usage chunk; without it OpenAI-compatible endpoints
+    # report no token counts for streams. Kept out of the cache key.
+    return {"stream": True, "stream_options": {"include_usage": True}, **request}
+
+
+def _delta(chunk) -> str:
+    # Some providers send chunks without choices (e.g. content filter results)
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+class _Timer:
+    def __init__(self, label, started, request):
+        self.label = label
+        self.started = time.perf_counter() if started is None else started
+        self.ttft_ms = None
+        # Detached: the span outlives this frame across the caller's yields
+        self.span = span("llm.call", label=label, model=request.get("model"))
+
+    def first_token(self):
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self.started) * 1000
+
+    def finish(self, cached=False, chunks=(), error=None):
+        total_ms = (time.perf_counter() - self.started) * 1000
+        _recorder.record(StreamTiming(self.label, self.ttft_ms, total_ms, cached))
+
+        usage = next((c.usage for c in reversed(chunks) if c.usage), None)
+        prompt_tokens = usage.prompt_tokens if usage else None
+        completion_tokens = usage.completion_tokens if usage else None
+        if not cached:
+            record_llm_usage(prompt_tokens, completion_tokens, label=self.label)
+        if self.ttft_ms is not None:
+            observe(
+                "llm_ttft_seconds",
+                self.ttft_ms / 1000,
+                "Time to first token",
+                label=self.label,
+            )
+        self.span.set(
+            ttft_ms=self.ttft_ms,
+            total_ms=round(total_ms, 3),
+            cached=cached,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        self.span.finish(error)
+
+
+def stream_chat_completion(
+    client,
+    cache: Optional[ResponseCache] = None,
+    label: str = "chat",
+    started: Optional[float] = None,
+    **request,
+) -> Iterator[str]:
+    """
+    Yield the text of `client.chat.completions.create(**request)` as it
+    streams in. A cache hit is yielded as a single delta; a miss is stored
+    once the stream completes. TTFT is measured from `started`
+    (a time.perf_counter() value, default: now) so callers can include
+    their own preparation, such as retrieval, in it.
+    """
+    timer = _Timer(label, started, request)
+    key = request_cache_key(request) if cache is not None else None
+    if cache is not None:
+        cached = load_cached_response(cache, key)
+        if cached is not None:
+            timer.first_token()
+            yield cached.choices[0].message.content or ""
+            timer.finish(cached=True)
+            return
+
+    chunks, parts = [], []
+    error = None
+    try:
+        for chunk in client.chat.completions.create(**_stream_request(request)):
+            chunks.append(chunk)
+            delta = _delta(chunk)
+            if delta:
+                timer.first_token()
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        timer.finish(chunks=chunks, error=error)
+    if cache is not None and chunks:
+        store_cached_response(
+            cache, key, _completion_from_stream(chunks, "".join(parts))
+        )
+
+
+async def astream_chat_completion(
+    client,
+    cache: Optional[ResponseCache] = None,
+    label: str = "chat",
+    started: Optional[float] = None,
+    **request,
+) -> AsyncIterator[str]:
+    """Async counterpart of stream_chat_completion for AsyncOpenAI clients."""
+    timer = _Timer(label, started, request)
+    key = request_cache_key(request) if cache is not None else None
+    if cache is not None:
+        cached = load_cached_response(cache, key)
+        if cached is not None:
+            timer.first_token()
+            yield cached.choices[0].message.content or ""
+            timer.finish(cached=True)
+            return
+
+    chunks, parts = [], []
+    error = None
+    try:
+        stream = await client.chat.completions.create(**_stream_request(request))
+        async for chunk in stream:
+            chunks.append(chunk)
+            delta = _delta(chunk)
+            if delta:
+                timer.first_token()
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        timer.finish(chunks=chunks, error=error)
+    if cache is not None and chunks:
+        store_cached_response(
+            cache, key, _completion_from_stream(chunks, "".join(parts))
+        )
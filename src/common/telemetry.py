@@ -0,0 +1,388 @@
+"""
+Telemetry
+Lightweight spans, structured events and Prometheus-style metrics for the
+RAG and agent pipelines. Finished spans and events are appended to a local
+JSONL trace file, and span durations, queue times and token counts feed an
+in-process metrics registry that renders the Prometheus text format.
+
+Disabled by default (TELEMETRY_ENABLED): span() then returns a shared no-op
+span, so instrumented code pays for one function call and a flag check.
+"""
+
+import bisect
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_TRACE_PATH = os.path.join(REPO_ROOT, ".telemetry.jsonl")
+
+# Seconds; wide enough for both sub-millisecond retrieval and slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(key)} {value:g}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, as Prometheus exposes them."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Label key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts = self._values.get(_label_key(labels))
+            return sum(counts[:-1]) if counts else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, list(counts)) for key, counts in self._values.items())
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(key, f'le="{bound:g}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            cumulative += counts[len(self.buckets)]
+            inf = _format_labels(key, 'le="+Inf"')
+            yield f"{self.name}_bucket{inf} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {counts[-1]:g}"
+            yield f"{self.name}_count{_format_labels(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Named counters and histograms, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name!r} is a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def histogram(
+        self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class TraceWriter:
+    """Appends one JSON object per line to a trace file, thread-safely."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Read from TELEMETRY_ENABLED on first use, after .env files are loaded
+_enabled: Optional[bool] = None
+_writer: Optional[TraceWriter] = None
+_configured = False
+_registry = MetricsRegistry()
+_current = contextvars.ContextVar("telemetry_span", default=None)
+_ids = itertools.count(1)
+_pid = os.getpid()
+
+
+def configure(enabled: Optional[bool] = None, trace_path: Optional[str] = None):
+    """
+    Turn telemetry on or off and choose the trace file (default:
+    TELEMETRY_TRACE_PATH, or .telemetry.jsonl in the repository root;
+    an empty path keeps metrics only).
+    """
+    global _enabled, _writer, _configured
+    if enabled is not None:
+        _enabled = enabled
+    _configured = True
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+    if trace_path is None:
+        trace_path = os.getenv("TELEMETRY_TRACE_PATH", DEFAULT_TRACE_PATH)
+    if trace_path:
+        _writer = TraceWriter(trace_path)
+
+
+def enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        value = os.getenv("TELEMETRY_ENABLED", "false")
+        _enabled = value.lower() in ("1", "true", "yes")
+    return _enabled
+
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide metrics registry every span and metric reports to."""
+    return _registry
+
+
+def _new_id() -> str:
+    return f"{_pid:x}-{next(_ids):x}"
+
+
+def _emit(record: Dict[str, Any]) -> None:
+    if not _configured:
+        configure()
+    if _writer is not None:
+        _writer.write(record)
+
+
+class Span:
+    """
+    One timed operation. Use as a context manager to make it the parent of
+    spans started inside it, or call finish() for a detached span (e.g.
+    one that lives across the yields of a generator).
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_time",
+        "_started",
+        "_token",
+        "_finished",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes):
+        self.name = name
+        self.span_id = _new_id()
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self._token = None
+        self._finished = False
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        duration = time.perf_counter() - self._started
+        status = "ok" if error is None else "error"
+        _registry.histogram(
+            "span_duration_seconds", "Duration of instrumented operations"
+        ).observe(duration, span=self.name, status=status)
+        record = {
+            "type": "span",
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start_time,
+            "duration_ms": round(duration * 1000, 3),
+            "status": status,
+            "attributes": self.attributes,
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        _emit(record)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited in another context than it was entered in
+            pass
+        self.finish(exc)
+
+
+class _NoopSpan:
+    """Stand-in returned while telemetry is disabled."""
+
+    __slots__ = ()
+    name = None
+    attributes: Dict[str, Any] = {}
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes):
+    """Span named `name` under the current span (no-op when disabled)."""
+    if not enabled():
+        return NOOP_SPAN
+    return Span(name, _current.get(), attributes)
+
+
+def current_span():
+    """Innermost active span, for adding attributes (no-op if none)."""
+    if not enabled():
+        return NOOP_SPAN
+    return _current.get() or NOOP_SPAN
+
+
+def event(name: str, message: Optional[str] = None, level: str = "info", **attributes):
+    """
+    Structured event under the current span. Warnings and errors also print
+    `message` to the console, as before, whether or not telemetry is on.
+    """
+    if message is not None and level in ("warning", "error"):
+        print(message)
+    if not enabled():
+        return
+    _registry.counter("events_total", "Structured events by name and level").inc(
+        name=name, level=level
+    )
+    parent = _current.get()
+    _emit(
+        {
+            "type": "event",
+            "name": name,
+            "level": level,
+            "time": time.time(),
+            "trace_id": parent.trace_id if parent is not None else None,
+            "parent_id": parent.span_id if parent is not None else None,
+            "message": message,
+            "attributes": attributes,
+        }
+    )
+
+
+def count(name: str, amount: float = 1.0, help_text: str = "", **labels) -> None:
+    """Increment counter `name` (no-op when disabled)."""
+    if enabled():
+        _registry.counter(name, help_text).inc(amount, **labels)
+
+
+def observe(name: str, value: float, help_text: str = "", **labels) -> None:
+    """Record `value` in histogram `name` (no-op when disabled)."""
+    if enabled():
+        _registry.histogram(name, help_text).observe(value, **labels)
+
+
+def record_llm_usage(
+    prompt_tokens: Optional[int], completion_tokens: Optional[int], **labels
+) -> None:
+    """Add a completion's token usage to the llm_tokens_total counter."""
+    if not enabled():
+        return
+    counter = _registry.counter("llm_tokens_total", "LLM tokens by kind")
+    if prompt_tokens:
+        counter.inc(prompt_tokens, kind="prompt", **labels)
+    if completion_tokens:
+        counter.inc(completion_tokens, kind="completion", **labels)
@@ -0,0 +1,283 @@
+"""
+Tool Memoization
+Wraps agent tools so repeated calls with equivalent arguments are served
+from a TTL/LRU cache and concurrent identical calls share one backend
+call (singleflight), with per-tool hit and latency stats.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from src.common.telemetry import span
+
+# Arguments injected by AutoGen that never change a tool's result
+IGNORED_ARGUMENTS = ("cancellation_token",)
+
+
+@dataclass
+class ToolStats:
+    """Call counters and latencies of one memoized tool."""
+
+    calls: int = 0
+    hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    errors: int = 0
+    backend_ms: float = 0.0
+    call_ms: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of calls answered without a backend call of their own."""
+        return (self.hits + self.coalesced) / self.calls if self.calls else 0.0
+
+    @property
+    def mean_backend_ms(self) -> float:
+        return self.backend_ms / self.misses if self.misses else 0.0
+
+    @property
+    def mean_call_ms(self) -> float:
+        return self.call_ms / self.calls if self.calls else 0.0
+
+
+def normalize_argument(value: Any, case_insensitive: bool = False) -> Any:
+    """Canonical form of a tool argument for the cache key."""
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.casefold() if case_insensitive else value
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        # 100 and 100.0 are the same amount
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [normalize_argument(v, case_insensitive) for v in value]
+    if isinstance(value, dict):
+        return {
+            str(k): normalize_argument(v, case_insensitive) for k, v in value.items()
+        }
+    return value
+
+
+class _ToolCache:
+    def __init__(self, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        # Caller holds the lock
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, value
+
+    def set(self, key, value):
+        # Caller holds the lock
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+_registry: Dict[str, ToolStats] = {}
+
+
+def memoize_tool(
+    func: Optional[Callable] = None,
+    *,
+    ttl_seconds: float = 300,
+    max_entries: int = 256,
+    case_insensitive: bool = False,
+):
+    """
+    Memoize a sync or async tool function for AutoGen agents.
+
+    Results are cached by the normalized bound arguments for `ttl_seconds`
+    (at most `max_entries` per tool, least recently used evicted), and a
+    call identical to one already in flight waits for that call instead
+    of hitting the backend again. Exceptions are shared with waiters but
+    never cached. The wrapper keeps the tool's name, signature, type
+    hints and docstring, so AutoGen builds the same tool schema, and
+    exposes `stats` and `cache_clear()`.
+
+    Cached results are shared between callers and must not be mutated.
+    """
+    if func is None:
+        return functools.partial(
+            memoize_tool,
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            case_insensitive=case_insensitive,
+        )
+
+    signature = inspect.signature(func)
+    cache = _ToolCache(ttl_seconds, max_entries)
+    stats = ToolStats()
+    in_flight: Dict[str, Any] = {}
+
+    def make_key(args, kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {
+            name: normalize_argument(value, case_insensitive)
+            for name, value in bound.arguments.items()
+            if name not in IGNORED_ARGUMENTS
+        }
+        return json.dumps(arguments, sort_keys=True, default=repr)
+
+    def record(started, backend_started=None, failed=False):
+        now = time.perf_counter()
+        with cache.lock:
+            stats.call_ms += (now - started) * 1000
+            if backend_started is not None:
+                stats.backend_ms += (now - backend_started) * 1000
+            if failed:
+                stats.errors += 1
+
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span("tool.call", tool=func.__name__, memoized=True) as tool_span:
+                started = time.perf_counter()
+                key = make_key(args, kwargs)
+                loop = asyncio.get_running_loop()
+                with cache.lock:
+                    stats.calls += 1
+                    hit, value = cache.get(key)
+                    if hit:
+                        stats.hits += 1
+                    else:
+                        # Async futures belong to one event loop
+                        pending = in_flight.get(key)
+                        if pending is not None and pending.get_loop() is loop:
+                            stats.coalesced += 1
+                        else:
+                            pending = None
+                            stats.misses += 1
+                            future = loop.create_future()
+                            in_flight[key] = future
+                if hit:
+                    tool_span.set(cache="hit")
+                    record(started)
+                    return value
+                if pending is not None:
+                    tool_span.set(cache="coalesced")
+                    try:
+                        return await asyncio.shield(pending)
+                    finally:
+                        record(started)
+
+                tool_span.set(cache="miss")
+                backend_started = time.perf_counter()
+                try:
+                    value = await func(*args, **kwargs)
+                except BaseException as e:
+                    with cache.lock:
+                        in_flight.pop(key, None)
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+                        # Nobody may be waiting; don't warn about unretrieved errors
+                        future.exception()
+                    record(started, backend_started, failed=True)
+                    raise
+                with cache.lock:
+                    cache.set(key, value)
+                    in_flight.pop(key, None)
+                future.set_result(value)
+                record(started, backend_started)
+                return value
+
+    else:
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span("tool.call", tool=func.__name__, memoized=True) as tool_span:
+                started = time.perf_counter()
+                key = make_key(args, kwargs)
+                with cache.lock:
+                    stats.calls += 1
+                    hit, value = cache.get(key)
+                    if hit:
+                        stats.hits += 1
+                    else:
+                        pending = in_flight.get(key)
+                        if pending is not None:
+                            stats.coalesced += 1
+                        else:
+                            stats.misses += 1
+                            future = Future()
+                            in_flight[key] = future
+                if hit:
+                    tool_span.set(cache="hit")
+                    record(started)
+                    return value
+                if pending is not None:
+                    tool_span.set(cache="coalesced")
+                    try:
+                        return pending.result()
+                    finally:
+                        record(started)
+
+                tool_span.set(cache="miss")
+                backend_started = time.perf_counter()
+                try:
+                    value = func(*args, **kwargs)
+                except BaseException as e:
+                    with cache.lock:
+                        in_flight.pop(key, None)
+                    future.set_exception(e)
+                    record(started, backend_started, failed=True)
+                    raise
+                with cache.lock:
+                    cache.set(key, value)
+                    in_flight.pop(key, None)
+                future.set_result(value)
+                record(started, backend_started)
+                return value
+
+    def cache_clear():
+        with cache.lock:
+            cache.entries.clear()
+
+    wrapper.stats = stats
+    wrapper.cache_clear = cache_clear
+    _registry[func.__name__] = stats
+    return wrapper
+
+
+def get_tool_stats() -> Dict[str, ToolStats]:
+    """Stats of every memoized tool in the process, by tool name."""
+    return dict(_registry)
+
+
+def format_tool_stats() -> str:
+    """One report line per memoized tool that was called."""
+    lines = []
+    for name, stats in sorted(_registry.items()):
+        if not stats.calls:
+            continue
+        lines.append(
+            f"🧰 {name}: {stats.calls} calls, {stats.hits} cached, "
+            f"{stats.coalesced} coalesced ({stats.hit_rate:.0%} saved), "
+            f"backend {stats.mean_backend_ms:.1f}ms avg, "
+            f"call {stats.mean_call_ms:.1f}ms avg"
+        )
+    return "\n".join(lines)
@@ -3,23 +3,45 @@ Simple Travel Planner using OpenAI SDK with GitHub Models
 A basic script for travel planning assistance without classes.
 """
 
+import argparse
 import os
-from openai import OpenAI
+import sys
 from dotenv import load_dotenv
 
+# Add the project root to the path so we can import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from src.common.batch_runner import add_batch_arguments, run_batch_cli
+from src.common.llm_cache import (
+    acached_chat_completion,
+    cache_enabled,
+    cached_chat_completion,
+    get_response_cache,
+)
+from src.common.model_clients import (
+    get_async_openai_client,
+    get_openai_client,
+    lazy_client,
+)
+from src.common.streaming import (
+    astream_chat_completion,
+    get_timing_recorder,
+    stream_chat_completion,
+)
+
 # Load environment variables from .env file
 load_dotenv()
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 # Initialize OpenAI client with GitHub Models
-client = OpenAI(
-    base_url="https://models.inference.ai.azure.com",
-    api_key=GITHUB_TOKEN,
-)
+# (shared connection pool and rate-limit-aware scheduler), created on first use
+get_client = lazy_client(get_openai_client)
+# Async client for batch mode, on the same scheduler (one per event loop,
+# so the async helpers can be run from more than one asyncio.run)
+get_async_client = get_async_openai_client
 
 
-def get_travel_advice(user_query):
-    """Get travel advice from the LLM."""
+def build_messages(user_query):
+    """Chat messages asking the LLM for travel advice."""
     system_prompt = """You are a helpful travel planner. 
                         Provide practical travel advice including:
                             - Destination recommendations
@@ -30,14 +52,27 @@ def get_travel_advice(user_query):
                             - Transportation tips           
                         Keep your responses concise and helpful.
                     """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_query},
+    ]
+
+
+def get_travel_advice(user_query, use_cache=None):
+    """
+    Get travel advice from the LLM.
+    With use_cache (default: LLM_CACHE_ENABLED) repeated queries are
+    answered from the local response cache without a network call.
+    """
+    if use_cache is None:
+        use_cache = cache_enabled()
 
     try:
-        response = client.chat.completions.create(
+        response = cached_chat_completion(
+            get_client(),
+            get_response_cache() if use_cache else None,
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_query},
-            ],
+            messages=build_messages(user_query),
         )
 
         return response.choices[0].message.content
@@ -46,15 +81,83 @@ def get_travel_advice(user_query):
         return f"Error: {str(e)}"
 
 
+async def aget_travel_advice(user_query, use_cache=None):
+    """
+    Async variant of get_travel_advice used by batch mode.
+    Errors are raised rather than returned so the batch records them.
+    """
+    if use_cache is None:
+        use_cache = cache_enabled()
+
+    response = await acached_chat_completion(
+        get_async_client(),
+        get_response_cache() if use_cache else None,
+        model="gpt-4o-mini",
+        messages=build_messages(user_query),
+    )
+    return response.choices[0].message.content
+
+
+def stream_travel_advice(user_query, use_cache=None):
+    """
+    Streaming variant of get_travel_advice: yields the advice in pieces
+    as the LLM generates it, so the first words show up right away.
+    """
+    if use_cache is None:
+        use_cache = cache_enabled()
+
+    try:
+        yield from stream_chat_completion(
+            get_client(),
+            get_response_cache() if use_cache else None,
+            label="travel_advice",
+            model="gpt-4o-mini",
+            messages=build_messages(user_query),
+        )
+
+    except Exception as e:
+        yield f"Error: {str(e)}"
+
+
+async def astream_travel_advice(user_query, use_cache=None):
+    """Async streaming variant of get_travel_advice; errors are raised."""
+    if use_cache is None:
+        use_cache = cache_enabled()
+
+    async for delta in astream_chat_completion(
+        get_async_client(),
+        get_response_cache() if use_cache else None,
+        label="travel_advice",
+        model="gpt-4o-mini",
+        messages=build_messages(user_query),
+    ):
+        yield delta
+
+
 def main():
     """Main function to run the travel planner."""
-    # User query - change this to any travel question you want
-    query = "Plan a trip to Tokyo"
+    parser = argparse.ArgumentParser(description="Simple travel planner")
+    # User query - pass any travel question you want
+    parser.add_argument("query", nargs="?", default="Plan a trip to Tokyo")
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch_cli(args, aget_travel_advice)
+        return
+
+    query = args.query
     print(f"\n🔍 User Query: {query}")
 
-    # Get travel advice
-    advice = get_travel_advice(query)
-    print(f"💡 Travel Advice:\n{advice}")
+    # Stream travel advice as it is generated
+    print("💡 Travel Advice:")
+    for delta in stream_travel_advice(query):
+        print(delta, end="", flush=True)
+    print()
+
+    timing = get_timing_recorder().last
+    if timing is not None and timing.ttft_ms is not None:
+        print(f"⏱️ First token after {timing.ttft_ms:.0f}ms")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,353 @@
+"""
+Field-weighted BM25 (BM25F) retrieval backend.
+
+Every destination field (name, attractions, cuisine, description, tips,
+weather) is tokenised on its own. Term frequencies are length-normalised
+per field, weighted and summed before BM25's saturation, so a query naming
+"Tokyo" matches the destination called Tokyo far more strongly than a
+passing mention in another destination's tips.
+
+A term's BM25F score in a document does not depend on the query, so every
+(term, document) impact is precomputed into inverted postings: one sorted
+array of document ids and one of impacts per term, stored CSR-style.
+Top-k search uses MaxScore early termination: once the k-th best score so
+far is out of reach of what the remaining query terms could add, those
+terms cannot bring in new documents and are only looked up for the
+surviving candidates instead of being scanned in full.
+"""
+
+import json
+import os
+import re
+from array import array
+from itertools import repeat
+
+import numpy as np
+
+from src.common.telemetry import event, span
+
+from .rag_retrieval import (
+    DATA_DIR,
+    TRAVEL_DATA_PATH,
+    Retriever,
+    _top_k_rows,
+    compute_source_hash,
+)
+
+BM25_INDEX_PATH = os.path.join(DATA_DIR, "travel_bm25_index.npz")
+BM25_FORMAT_VERSION = 1
+
+# Field -> (weight, length normalisation b); the name is short and says
+# the most, tips and weather mention other places in passing
+DEFAULT_FIELD_WEIGHTS = {
+    "destination": (4.0, 0.5),
+    "top_attractions": (2.0, 0.75),
+    "local_cuisine": (1.5, 0.75),
+    "description": (1.0, 0.75),
+    "cultural_tips": (0.5, 0.75),
+    "weather_info": (0.5, 0.75),
+}
+# Term frequency saturation
+DEFAULT_K1 = 1.2
+
+# Same tokens as the TF-IDF vectorizer: words of two or more characters
+TOKEN_RE = re.compile(r"\b\w\w+\b")
+STOP_WORDS = frozenset("""
+    about after all also an and any are as at be been before but by can do
+    does for from had has have how if in into is it its me more most my no
+    not of on or our out so some such than that the their them then there
+    these they this to too up very was we were what when where which while
+    who why will with would you your
+    """.split())
+
+
+def tokenize(text):
+    return [
+        token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS
+    ]
+
+
+def _field_text(value):
+    return " ".join(value) if isinstance(value, list) else str(value or "")
+
+
+def _kth_score(scores, k):
+    """k-th highest score, or -inf while there are fewer than k."""
+    if len(scores) < k:
+        return -np.inf
+    return np.partition(scores, -k)[-k]
+
+
+def _merge_postings(doc_ids, scores, term_doc_ids, term_scores):
+    """Add one term's postings to the (sorted) candidate accumulator."""
+    if not len(doc_ids):
+        return term_doc_ids, term_scores.astype(np.float64)
+    merged, inverse = np.unique(
+        np.concatenate([doc_ids, term_doc_ids]), return_inverse=True
+    )
+    return merged, np.bincount(inverse, weights=np.concatenate([scores, term_scores]))
+
+
+class BM25FIndex(Retriever):
+    """Inverted BM25F index with precomputed per-term impact postings."""
+
+    def __init__(
+        self,
+        terms,
+        offsets,
+        doc_ids,
+        impacts,
+        num_documents,
+        params,
+        source_hash=None,
+        destinations=None,
+    ):
+        self.terms = terms
+        self.vocabulary = {str(term): i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.impacts = impacts
+        # Upper bound of every term's contribution, for MaxScore
+        self.max_impacts = (
+            np.maximum.reduceat(impacts, offsets[:-1])
+            if len(impacts)
+            else np.zeros(0, dtype=np.float32)
+        )
+        self._num_documents = num_documents
+        self.params = params
+        self.source_hash = source_hash
+        self.destinations = destinations
+
+    @property
+    def num_documents(self):
+        return self._num_documents
+
+    @classmethod
+    def fit(
+        cls,
+        destinations,
+        source_hash=None,
+        field_weights=DEFAULT_FIELD_WEIGHTS,
+        k1=DEFAULT_K1,
+    ):
+        """Tokenise every field of the destinations and build the postings."""
+        num_documents = len(destinations)
+        vocabulary = {}
+        pair_keys, contributions = [], []
+
+        for field, (weight, b) in field_weights.items():
+            term_ids, doc_ids = array("q"), array("q")
+            lengths = np.zeros(num_documents)
+            for doc, dest in enumerate(destinations):
+                tokens = tokenize(_field_text(dest.get(field)))
+                lengths[doc] = len(tokens)
+                term_ids.extend(
+                    vocabulary.setdefault(t, len(vocabulary)) for t in tokens
+                )
+                doc_ids.extend(repeat(doc, len(tokens)))
+            if not term_ids:
+                continue
+
+            # One key per (term, document) pair, ordered by term then document
+            keys = np.frombuffer(term_ids, dtype=np.int64) * num_documents
+            keys += np.frombuffer(doc_ids, dtype=np.int64)
+            keys, term_frequency = np.unique(keys, return_counts=True)
+            # Per-field length normalisation, then the field weight
+            norms = 1 - b + b * lengths / (lengths.mean() or 1.0)
+            pair_keys.append(keys)
+            contributions.append(weight * term_frequency / norms[keys % num_documents])
+
+        params = {"fields": field_weights, "k1": k1}
+        if not pair_keys:
+            empty = np.zeros(0)
+            return cls(
+                np.asarray([], dtype=str),
+                np.zeros(1, dtype=np.int64),
+                empty.astype(np.int32),
+                empty.astype(np.float32),
+                num_documents,
+                params,
+                source_hash,
+                destinations,
+            )
+
+        # Sum the weighted field frequencies of each pair, then saturate once
+        keys, inverse = np.unique(np.concatenate(pair_keys), return_inverse=True)
+        pseudo_frequency = np.bincount(inverse, weights=np.concatenate(contributions))
+        pair_terms = keys // num_documents
+
+        document_frequency = np.bincount(pair_terms, minlength=len(vocabulary))
+        idf = np.log(
+            1 + (num_documents - document_frequency + 0.5) / (document_frequency + 0.5)
+        )
+        impacts = (
+            idf[pair_terms] * pseudo_frequency * (k1 + 1) / (pseudo_frequency + k1)
+        )
+        offsets = np.concatenate([[0], np.cumsum(document_frequency)])
+
+        return cls(
+            np.asarray(list(vocabulary), dtype=str),
+            offsets.astype(np.int64),
+            (keys % num_documents).astype(np.int32),
+            impacts.astype(np.float32),
+            num_documents,
+            params,
+            source_hash,
+            destinations,
+        )
+
+    def save(self, path=BM25_INDEX_PATH):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(
+                file,
+                version=np.int64(BM25_FORMAT_VERSION),
+                source_hash=np.str_(self.source_hash or ""),
+                params=np.str_(json.dumps(self.params, sort_keys=True)),
+                num_documents=np.int64(self.num_documents),
+                terms=self.terms,
+                offsets=self.offsets,
+                doc_ids=self.doc_ids,
+                impacts=self.impacts,
+            )
+        # Replace atomically so a concurrent reader never sees a partial file
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=BM25_INDEX_PATH, destinations=None):
+        with np.load(path, allow_pickle=False) as stored:
+            if int(stored["version"]) != BM25_FORMAT_VERSION:
+                raise ValueError(f"unsupported BM25 index format in {path}")
+            return cls(
+                stored["terms"],
+                stored["offsets"],
+                stored["doc_ids"],
+                stored["impacts"],
+                int(stored["num_documents"]),
+                json.loads(str(stored["params"])),
+                str(stored["source_hash"]) or None,
+                destinations,
+            )
+
+    def postings(self, term_id):
+        """Sorted document ids and impacts of one term."""
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.doc_ids[start:end], self.impacts[start:end]
+
+    def _query_terms(self, query):
+        """Query term ids with their counts, highest upper bound first."""
+        counts = {}
+        for token in tokenize(query):
+            term_id = self.vocabulary.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        bounds = {t: float(self.max_impacts[t]) * n for t, n in counts.items()}
+        terms = sorted(counts, key=bounds.get, reverse=True)
+        return terms, [counts[t] for t in terms], [bounds[t] for t in terms]
+
+    def search_one(self, query, top_k=2, early_termination=True):
+        """(document index, score) pairs of the best `top_k` matches."""
+        terms, counts, bounds = self._query_terms(query)
+        if not terms or top_k <= 0:
+            return []
+        # remaining[i]: the most that terms i.. can still add to any score
+        remaining = np.concatenate([np.cumsum(bounds[::-1])[::-1], [0.0]])
+
+        doc_ids = np.zeros(0, dtype=np.int32)
+        scores = np.zeros(0)
+        i = 0
+        while i < len(terms):
+            term_doc_ids, impacts = self.postings(terms[i])
+            doc_ids, scores = _merge_postings(
+                doc_ids, scores, term_doc_ids, impacts * counts[i]
+            )
+            i += 1
+            if early_termination and _kth_score(scores, top_k) >= remaining[i]:
+                break
+
+        # Documents outside the candidates can no longer reach the top k:
+        # probe the remaining postings only for candidates that still can
+        for j in range(i, len(terms)):
+            keep = scores + remaining[j] >= _kth_score(scores, top_k)
+            doc_ids, scores = doc_ids[keep], scores[keep]
+            term_doc_ids, impacts = self.postings(terms[j])
+            positions = np.searchsorted(term_doc_ids, doc_ids)
+            found = positions < len(term_doc_ids)
+            found[found] = term_doc_ids[positions[found]] == doc_ids[found]
+            scores[found] += impacts[positions[found]] * counts[j]
+
+        matches = _top_k_rows(scores[np.newaxis, :], top_k)[0]
+        return [(int(doc_ids[idx]), score) for idx, score in matches]
+
+    def search_batch(self, queries, top_k=2, early_termination=True):
+        with span(
+            "rag.score",
+            queries=len(queries),
+            documents=self.num_documents,
+            backend="bm25",
+        ):
+            return [
+                self.search_one(query, top_k, early_termination) for query in queries
+            ]
+
+
+def load_bm25_index(data_path=TRAVEL_DATA_PATH, index_path=BM25_INDEX_PATH):
+    """Load the persisted BM25F index, rebuilding it when data or weights changed."""
+    with span("rag.load", path=data_path, backend="bm25") as load_span:
+        with open(data_path, "rb") as file:
+            raw_data = file.read()
+        source_hash = compute_source_hash(raw_data)
+        destinations = json.loads(raw_data.decode("utf-8"))["destinations"]
+        params = {"fields": DEFAULT_FIELD_WEIGHTS, "k1": DEFAULT_K1}
+
+        if os.path.exists(index_path):
+            try:
+                index = BM25FIndex.load(index_path, destinations)
+                # Stored weights come back from JSON with lists for tuples
+                if index.source_hash == source_hash and index.params == json.loads(
+                    json.dumps(params)
+                ):
+                    load_span.set(documents=index.num_documents, rebuilt=False)
+                    return index
+                event(
+                    "rag.index_stale",
+                    "🔄 Travel data or field weights changed, rebuilding BM25 index",
+                    level="warning",
+                    backend="bm25",
+                )
+            except (OSError, ValueError, KeyError) as e:
+                event(
+                    "rag.index_unreadable",
+                    f"⚠️ Could not load BM25 index, rebuilding: {e}",
+                    level="warning",
+                    backend="bm25",
+                    error=str(e),
+                )
+
+        index = BM25FIndex.fit(destinations, source_hash)
+        load_span.set(documents=index.num_documents, rebuilt=True)
+        try:
+            index.save(index_path)
+        except OSError as e:
+            event(
+                "rag.index_save_failed",
+                f"⚠️ Could not save BM25 index: {e}",
+                level="warning",
+                backend="bm25",
+                error=str(e),
+            )
+        return index
+
+
+_bm25_cache = {}
+
+
+def get_bm25_index(data_path=TRAVEL_DATA_PATH, index_path=BM25_INDEX_PATH):
+    """Process-wide BM25F index, reloaded only when the data file is touched."""
+    stat = os.stat(data_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _bm25_cache.get(data_path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, load_bm25_index(data_path, index_path))
+        _bm25_cache[data_path] = cached
+    return cached[1]
@@ -0,0 +1,163 @@
+"""
+Token-budgeted context packing for RAG prompts.
+
+Each destination is rendered once into a ladder of variants, from the full
+block down to a lean summary, and every variant carries its token count.
+The packer then fills a fixed token budget by retrieval score: every
+destination first gets the leanest variant that fits, and the best-scoring
+ones are upgraded to richer variants with whatever budget is left. The
+low-value list fields (attractions, cuisine) are the first to be trimmed.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .rag_retrieval import format_destination_info
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+RENDER_CACHE_SIZE = 4096
+DEFAULT_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "600"))
+CONTEXT_HEADER = "Here is relevant travel information:\n\n"
+
+# Rendering ladder, richest first: trim the list fields, then drop them,
+# then keep only what is needed to compare destinations at a glance
+RENDER_VARIANTS = [
+    {},
+    {"max_list_items": 3},
+    {"omit_fields": ("Top Attractions", "Local Cuisine")},
+    {
+        "omit_fields": (
+            "Top Attractions",
+            "Local Cuisine",
+            "Transportation",
+            "Cultural Tips",
+        )
+    },
+]
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception:
+        # Unknown model or no network to fetch the BPE ranks
+        return None
+
+
+def count_tokens(text):
+    """Token count of the text for gpt-4o-mini, estimated without tiktoken."""
+    encoding = _encoding()
+    if encoding is None:
+        # Roughly four characters per token for English prose
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+@dataclass(frozen=True)
+class RenderedDestination:
+    """Pre-rendered context blocks of one destination, richest first."""
+
+    name: str
+    variants: Tuple[Tuple[str, int], ...]
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(destination_json):
+    destination = json.loads(destination_json)
+    variants = []
+    for options in RENDER_VARIANTS:
+        # Blocks are separated by a blank line, which is part of their cost
+        text = format_destination_info(destination, **options) + "\n"
+        if not variants or text != variants[-1][0]:
+            variants.append((text, count_tokens(text)))
+    return RenderedDestination(destination["destination"], tuple(variants))
+
+
+def render_destination(destination):
+    """Cached rendering of a destination, keyed by its content."""
+    return _render(json.dumps(destination, sort_keys=True, ensure_ascii=False))
+
+
+_prerendered = None
+_prerender_lock = threading.Lock()
+
+
+def prerender_destinations(destinations):
+    """
+    Warm the render cache right after an index is loaded. Calls with the
+    list that was warmed last return at once; corpora larger than the
+    cache are left to render on demand.
+    """
+    global _prerendered
+    with _prerender_lock:
+        if destinations is _prerendered or len(destinations) > RENDER_CACHE_SIZE:
+            return
+        for destination in destinations:
+            if destination is not None:
+                render_destination(destination)
+        # Keep a reference so the identity check cannot match a new list
+        _prerendered = destinations
+
+
+@dataclass
+class PackedContext:
+    """Context text that fits the budget, plus what went into it."""
+
+    text: str
+    token_count: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+
+
+def pack_context(
+    scored_destinations: Sequence[Tuple[Dict[str, Any], float]],
+    token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+) -> PackedContext:
+    """
+    Pack (destination, score) pairs into at most `token_budget` tokens.
+
+    Returns an empty PackedContext when not even the leanest block fits.
+    """
+    ranked = sorted(scored_destinations, key=lambda pair: pair[1], reverse=True)
+    rendered = [render_destination(dest) for dest, _ in ranked]
+    remaining = token_budget - count_tokens(CONTEXT_HEADER)
+
+    # Pass 1: in score order, admit each destination at its leanest variant
+    chosen = {}
+    for i, item in enumerate(rendered):
+        tokens = item.variants[-1][1]
+        if tokens <= remaining:
+            chosen[i] = len(item.variants) - 1
+            remaining -= tokens
+
+    # Pass 2: in score order, upgrade to the richest variant that still fits
+    for i in sorted(chosen):
+        variants = rendered[i].variants
+        current = variants[chosen[i]][1]
+        for level, (_, tokens) in enumerate(variants[: chosen[i]]):
+            if tokens - current <= remaining:
+                chosen[i] = level
+                remaining -= tokens - current
+                break
+
+    if not chosen:
+        return PackedContext(text="", token_count=0)
+
+    blocks = [rendered[i].variants[chosen[i]][0] for i in sorted(chosen)]
+    return PackedContext(
+        text=CONTEXT_HEADER + "".join(blocks),
+        token_count=token_budget - remaining,
+        included=[rendered[i].name for i in sorted(chosen)],
+        truncated=[rendered[i].name for i in sorted(chosen) if chosen[i] > 0],
+    )
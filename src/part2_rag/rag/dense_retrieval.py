@@ -0,0 +1,191 @@
+"""
+Dense approximate-nearest-neighbour retrieval backend.
+
+Destination vectors are built locally, without any network model: a
+truncated SVD of the TF-IDF document matrix gives dense, L2-normalised
+embeddings, which are grouped into k-means clusters (an IVF index). A query
+only scores the documents in its `n_probe` closest clusters, so `n_probe`
+trades recall (more clusters) against latency (fewer clusters).
+"""
+
+import os
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from src.common.telemetry import event, span
+
+from .rag_retrieval import DATA_DIR, Retriever, _top_k_rows, get_destination_index
+
+DENSE_INDEX_PATH = os.path.join(DATA_DIR, "travel_dense_index.npz")
+
+DEFAULT_DIMENSIONS = 128
+DEFAULT_N_PROBE = int(os.getenv("RAG_DENSE_N_PROBE", "4"))
+# Unrelated documents land near, but rarely exactly at, zero in SVD space
+MIN_SIMILARITY = 0.01
+
+
+class DenseDestinationIndex(Retriever):
+    """IVF index over SVD embeddings of a fitted DestinationIndex."""
+
+    def __init__(
+        self,
+        tfidf_index,
+        components,
+        vectors,
+        centroids,
+        list_offsets,
+        list_ids,
+        n_probe=DEFAULT_N_PROBE,
+    ):
+        self.tfidf_index = tfidf_index
+        self.components = components
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.n_probe = n_probe
+
+    @property
+    def destinations(self):
+        return self.tfidf_index.destinations
+
+    @property
+    def num_lists(self):
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, tfidf_index, dimensions=DEFAULT_DIMENSIONS, num_lists=None, seed=0):
+        """Embed the TF-IDF rows with a truncated SVD and cluster them."""
+        doc_matrix = tfidf_index.doc_matrix
+        num_documents, num_features = doc_matrix.shape
+        # The SVD needs fewer components than features; beyond the number of
+        # documents the extra components carry no information anyway
+        dimensions = max(1, min(dimensions, num_features - 1, num_documents))
+        svd = TruncatedSVD(n_components=dimensions, random_state=seed)
+        vectors = normalize(svd.fit_transform(doc_matrix)).astype(np.float32)
+
+        num_lists = num_lists or max(1, int(np.sqrt(num_documents)))
+        num_lists = min(num_lists, num_documents)
+        kmeans = MiniBatchKMeans(n_clusters=num_lists, n_init=3, random_state=seed)
+        assignments = kmeans.fit_predict(vectors)
+
+        # Inverted lists in CSR layout: ids of cluster c are
+        # list_ids[list_offsets[c]:list_offsets[c + 1]]
+        list_ids = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=num_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(
+            tfidf_index,
+            svd.components_.astype(np.float32),
+            vectors,
+            normalize(kmeans.cluster_centers_).astype(np.float32),
+            list_offsets,
+            list_ids,
+        )
+
+    def save(self, path=DENSE_INDEX_PATH):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(
+                file,
+                source_hash=np.str_(self.tfidf_index.source_hash or ""),
+                components=self.components,
+                vectors=self.vectors,
+                centroids=self.centroids,
+                list_offsets=self.list_offsets,
+                list_ids=self.list_ids,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, tfidf_index, path=DENSE_INDEX_PATH):
+        """Load a saved dense index; it must match the TF-IDF index it came from."""
+        with np.load(path, allow_pickle=False) as stored:
+            if str(stored["source_hash"]) != (tfidf_index.source_hash or ""):
+                raise ValueError(f"{path} was built from different travel data")
+            return cls(
+                tfidf_index,
+                stored["components"],
+                stored["vectors"],
+                stored["centroids"],
+                stored["list_offsets"],
+                stored["list_ids"],
+            )
+
+    def embed(self, queries):
+        """Project queries into the same dense space as the documents."""
+        with span("rag.vectorize", queries=len(queries), backend="dense"):
+            query_matrix = self.tfidf_index.vectorizer.transform(queries)
+            return normalize(query_matrix @ self.components.T).astype(np.float32)
+
+    def search_batch(self, queries, top_k=2, n_probe=None):
+        n_probe = min(n_probe or self.n_probe, self.num_lists)
+        query_vectors = self.embed(queries)
+
+        with span("rag.score", queries=len(queries), backend="dense", n_probe=n_probe):
+            # Pick the n_probe closest clusters of every query
+            centroid_scores = query_vectors @ self.centroids.T
+            probes = np.argpartition(centroid_scores, -n_probe, axis=1)[:, -n_probe:]
+
+            results = []
+            for query_vector, lists in zip(query_vectors, probes):
+                candidates = np.concatenate(
+                    [
+                        self.list_ids[self.list_offsets[c] : self.list_offsets[c + 1]]
+                        for c in lists
+                    ]
+                )
+                scores = self.vectors[candidates] @ query_vector
+                matches = _top_k_rows(scores[np.newaxis, :], top_k, MIN_SIMILARITY)[0]
+                results.append(
+                    [(int(candidates[idx]), score) for idx, score in matches]
+                )
+        return results
+
+
+def load_dense_index(tfidf_index, path=DENSE_INDEX_PATH):
+    """Load the persisted dense index, rebuilding it when the data changed."""
+    with span("rag.load", path=path, backend="dense") as load_span:
+        if os.path.exists(path):
+            try:
+                index = DenseDestinationIndex.load(tfidf_index, path)
+                load_span.set(rebuilt=False)
+                return index
+            except (OSError, ValueError, KeyError) as e:
+                event(
+                    "rag.index_stale",
+                    f"🔄 Rebuilding dense destination index: {e}",
+                    level="warning",
+                    backend="dense",
+                )
+
+        index = DenseDestinationIndex.build(tfidf_index)
+        load_span.set(rebuilt=True)
+        try:
+            index.save(path)
+        except OSError as e:
+            event(
+                "rag.index_save_failed",
+                f"⚠️ Could not save dense destination index: {e}",
+                level="warning",
+                backend="dense",
+                error=str(e),
+            )
+        return index
+
+
+_dense_cache = {}
+
+
+def get_dense_index(path=DENSE_INDEX_PATH):
+    """Process-wide dense index, following reloads of the TF-IDF index."""
+    tfidf_index = get_destination_index()
+    cached = _dense_cache.get(path)
+    if cached is None or cached.tfidf_index is not tfidf_index:
+        cached = load_dense_index(tfidf_index, path)
+        _dense_cache[path] = cached
+    return cached
@@ -0,0 +1,390 @@
+"""
+Incremental destination index.
+
+Supports adding, updating and removing destinations without refitting the
+whole corpus: new documents are appended as extra sparse rows weighted with
+the current IDF (terms the corpus has not seen yet extend the vocabulary),
+deleted documents are tombstoned, and document frequencies
+are tracked as they change. Once enough of the corpus has changed, a
+compaction step recomputes IDF and drops tombstones, by default on a
+background thread while reads keep being served from the current state.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from src.common.telemetry import event
+
+from .rag_retrieval import (
+    INDEX_PATH,
+    TRAVEL_DATA_PATH,
+    DestinationIndex,
+    Retriever,
+    _new_vectorizer,
+    _top_k_rows,
+    compute_source_hash,
+    create_document_texts,
+)
+
+
+def _count_vectorizer(vocabulary=None):
+    # Same tokenisation as the TF-IDF vectorizer, but raw term counts
+    return CountVectorizer(stop_words="english", vocabulary=vocabulary)
+
+
+def _fit_counts(destinations):
+    counter = _count_vectorizer()
+    counts = counter.fit_transform(create_document_texts(destinations))
+    return counter.vocabulary_, counts.tocsr()
+
+
+def _smooth_idf(doc_freq, num_documents):
+    # Same smoothing as scikit-learn's TfidfTransformer(smooth_idf=True)
+    return np.log((1 + num_documents) / (1 + doc_freq)) + 1
+
+
+def _widen(matrix, num_terms):
+    """The same CSR rows with room for `num_terms` columns; no data copied."""
+    return sparse.csr_matrix(
+        (matrix.data, matrix.indices, matrix.indptr),
+        shape=(matrix.shape[0], num_terms),
+    )
+
+
+def _weigh(counts, idf):
+    """Turn raw term counts into L2-normalised TF-IDF rows."""
+    return normalize(counts @ sparse.diags(idf), norm="l2").tocsr()
+
+
+class IncrementalDestinationIndex(Retriever):
+    """
+    Destination index that accepts writes without a full re-index.
+
+    Row numbers are stable between compactions: appended destinations get
+    new rows at the end and removed ones leave a tombstone behind. Use
+    `search_destinations` to get results resolved against the same state
+    they were scored on, even if a compaction swaps the state meanwhile.
+    """
+
+    def __init__(
+        self, destinations, compaction_threshold=0.2, background_compaction=True
+    ):
+        self.compaction_threshold = compaction_threshold
+        self.background_compaction = background_compaction
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.RLock()
+        self._compacting = False
+        self._pending_ops = None
+
+        destinations = list(destinations)
+        vocabulary, counts = _fit_counts(destinations)
+        self._install(vocabulary, counts, destinations)
+
+    def _install(self, vocabulary, counts, destinations, doc_freq=None):
+        if doc_freq is None:
+            # CSR rows hold each term at most once, so this counts documents
+            doc_freq = np.bincount(counts.indices, minlength=len(vocabulary))
+        idf = _smooth_idf(doc_freq, counts.shape[0])
+
+        vectorizer = _new_vectorizer(vocabulary)
+        vectorizer.idf_ = idf
+        self._vectorizer = vectorizer
+        self._vocabulary = vocabulary
+        self._counter = _count_vectorizer(vocabulary)
+        self._analyzer = self._counter.build_analyzer()
+
+        self._base_counts = counts
+        self._base_matrix = _weigh(counts, idf)
+        self._delta_counts = []
+        self._delta_rows = []
+        self._delta_matrix = None
+
+        self._destinations = list(destinations)
+        self._row_by_key = {
+            dest["destination"]: row for row, dest in enumerate(self._destinations)
+        }
+        self._tombstones = set()
+        self._doc_freq = doc_freq.astype(np.int64)
+        self._num_live = len(self._destinations)
+        self._changes = 0
+        self._new_terms = 0
+
+    @property
+    def num_documents(self):
+        """Number of rows, including tombstoned ones."""
+        return len(self._destinations)
+
+    @property
+    def num_live(self):
+        return self._num_live
+
+    @property
+    def destinations(self):
+        """Row-aligned destinations; tombstoned rows are None."""
+        return self._destinations
+
+    @property
+    def doc_freq(self):
+        """Per-term document frequency over the live destinations."""
+        return self._doc_freq
+
+    @property
+    def drift(self):
+        """Share of the compacted corpus touched by writes since then."""
+        return self._changes / max(self._base_counts.shape[0], 1)
+
+    # Writes
+
+    def add_destination(self, destination):
+        with self._lock:
+            key = destination["destination"]
+            if key in self._row_by_key:
+                raise ValueError(f"destination already indexed: {key}")
+            self._append(destination)
+            self._record("add", destination)
+        self._maybe_compact()
+
+    def update_destination(self, destination):
+        with self._lock:
+            key = destination["destination"]
+            if key not in self._row_by_key:
+                raise KeyError(f"destination not indexed: {key}")
+            self._tombstone(key)
+            self._append(destination)
+            self._record("update", destination)
+        self._maybe_compact()
+
+    def remove_destination(self, name):
+        with self._lock:
+            if name not in self._row_by_key:
+                raise KeyError(f"destination not indexed: {name}")
+            self._tombstone(name)
+            self._record("remove", name)
+        self._maybe_compact()
+
+    def _append(self, destination):
+        text = create_document_texts([destination])[0]
+        new_terms = [
+            term
+            for term in dict.fromkeys(self._analyzer(text))
+            if term not in self._vocabulary
+        ]
+        if new_terms:
+            self._extend_vocabulary(new_terms)
+        counts = self._counter.transform([text]).tocsr()
+
+        self._delta_counts.append(counts)
+        self._delta_rows.append(_weigh(counts, self._vectorizer.idf_))
+        self._delta_matrix = None
+
+        self._row_by_key[destination["destination"]] = len(self._destinations)
+        self._destinations.append(destination)
+        self._doc_freq[counts.indices] += 1
+        self._num_live += 1
+        self._changes += 1
+
+    def _extend_vocabulary(self, terms):
+        """
+        Give unseen terms their own columns so the added document can be
+        found by them right away. Everything is replaced rather than
+        mutated, so searches holding the previous snapshot are unaffected;
+        the next compaction refits the vocabulary.
+        """
+        vocabulary = dict(self._vocabulary)
+        for term in terms:
+            vocabulary[term] = len(vocabulary)
+        num_terms = len(vocabulary)
+        # Weighted as if the term occurred in one document of the corpus
+        idf = np.concatenate(
+            [
+                self._vectorizer.idf_,
+                _smooth_idf(np.ones(len(terms)), self._base_counts.shape[0]),
+            ]
+        )
+
+        vectorizer = _new_vectorizer(vocabulary)
+        vectorizer.idf_ = idf
+        self._vectorizer = vectorizer
+        self._vocabulary = vocabulary
+        self._counter = _count_vectorizer(vocabulary)
+        self._analyzer = self._counter.build_analyzer()
+
+        self._base_counts = _widen(self._base_counts, num_terms)
+        self._base_matrix = _widen(self._base_matrix, num_terms)
+        self._delta_counts = [_widen(m, num_terms) for m in self._delta_counts]
+        self._delta_rows = [_widen(m, num_terms) for m in self._delta_rows]
+        self._delta_matrix = None
+        self._doc_freq = np.concatenate(
+            [self._doc_freq, np.zeros(len(terms), dtype=np.int64)]
+        )
+        self._new_terms += len(terms)
+
+    def _tombstone(self, key):
+        row = self._row_by_key.pop(key)
+        base_rows = self._base_counts.shape[0]
+        if row < base_rows:
+            counts = self._base_counts[row]
+        else:
+            counts = self._delta_counts[row - base_rows]
+
+        self._doc_freq[counts.indices] -= 1
+        self._tombstones.add(row)
+        self._destinations[row] = None
+        self._num_live -= 1
+        self._changes += 1
+
+    def _record(self, op, payload):
+        # Writes that land while a compaction is building its new state are
+        # replayed on top of it before the swap
+        if self._pending_ops is not None:
+            self._pending_ops.append((op, payload))
+
+    # Compaction
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._compacting or self.drift < self.compaction_threshold:
+                return
+            self._compacting = True
+
+        if self.background_compaction:
+            threading.Thread(target=self._run_compaction, daemon=True).start()
+        else:
+            self._run_compaction()
+
+    def _run_compaction(self):
+        try:
+            self.compact()
+        except Exception as e:
+            event(
+                "rag.compaction_failed",
+                f"❌ Error during index compaction: {e}",
+                level="error",
+                error=str(e),
+            )
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self, refit=None):
+        """
+        Recompute IDF over the live destinations and drop tombstones.
+
+        The vocabulary is refitted only when added documents brought new
+        terms (or `refit=True`), which puts them in the vectorizer's order;
+        otherwise the tracked document frequencies and stored term counts
+        are reweighted without re-tokenising anything.
+        """
+        with self._compaction_lock:
+            with self._lock:
+                live_rows = [
+                    row
+                    for row, dest in enumerate(self._destinations)
+                    if dest is not None
+                ]
+                destinations = [self._destinations[row] for row in live_rows]
+                counts = sparse.vstack(
+                    [self._base_counts, *self._delta_counts], format="csr"
+                )[live_rows]
+                vocabulary = self._vocabulary
+                doc_freq = self._doc_freq.copy()
+                if refit is None:
+                    refit = self._new_terms > 0
+                self._pending_ops = []
+
+            try:
+                if refit and destinations:
+                    vocabulary, counts = _fit_counts(destinations)
+                    doc_freq = None
+            finally:
+                with self._lock:
+                    pending_ops, self._pending_ops = self._pending_ops, None
+                    self._install(vocabulary, counts, destinations, doc_freq)
+                    for op, payload in pending_ops:
+                        if op == "add":
+                            self._append(payload)
+                        elif op == "update":
+                            self._tombstone(payload["destination"])
+                            self._append(payload)
+                        else:
+                            self._tombstone(payload)
+
+    # Reads
+
+    def _snapshot(self):
+        with self._lock:
+            if self._delta_matrix is None and self._delta_rows:
+                self._delta_matrix = sparse.vstack(self._delta_rows, format="csr")
+            return (
+                self._vectorizer,
+                self._base_matrix,
+                self._delta_matrix,
+                np.fromiter(self._tombstones, dtype=np.int64),
+                self._destinations,
+            )
+
+    def _search(self, queries, top_k, chunk_size=256):
+        vectorizer, base, delta, tombstones, destinations = self._snapshot()
+        results = []
+        for start in range(0, len(queries), chunk_size):
+            query_matrix = vectorizer.transform(queries[start : start + chunk_size])
+            similarities = (query_matrix @ base.T).toarray()
+            if delta is not None:
+                delta_similarities = (query_matrix @ delta.T).toarray()
+                similarities = np.hstack([similarities, delta_similarities])
+            # Tombstoned rows can never make it past the > 0 filter
+            similarities[:, tombstones] = -np.inf
+            results.extend(_top_k_rows(similarities, top_k))
+        return destinations, results
+
+    def search_batch(self, queries, top_k=2):
+        """Return one list of (row, similarity) pairs per query, live rows only."""
+        return self._search(list(queries), top_k)[1]
+
+    def search_destinations(self, query, top_k=2):
+        """Return (destination, similarity) pairs for the best live matches."""
+        return self.search_destinations_batch([query], top_k=top_k)[0]
+
+    def search_destinations_batch(self, queries, top_k=2):
+        destinations, results = self._search(list(queries), top_k)
+        return [
+            [
+                (destinations[row], score)
+                for row, score in matches
+                if destinations[row] is not None
+            ]
+            for matches in results
+        ]
+
+    # Persistence
+
+    def save(self, data_path=TRAVEL_DATA_PATH, index_path=INDEX_PATH):
+        """
+        Write the live catalogue back to disk with a matching prebuilt index,
+        so the next `load_destination_index` picks it up without refitting.
+        """
+        # Hold off writes so the files match one consistent state
+        with self._compaction_lock, self._lock:
+            self.compact(refit=True)
+            destinations = list(self._destinations)
+            vectorizer, doc_matrix = self._vectorizer, self._base_matrix
+
+        raw_data = json.dumps(
+            {"destinations": destinations}, indent=4, ensure_ascii=False
+        ).encode("utf-8")
+        tmp_path = f"{data_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(raw_data)
+        os.replace(tmp_path, data_path)
+
+        index = DestinationIndex(
+            vectorizer, doc_matrix, compute_source_hash(raw_data), destinations
+        )
+        index.save(index_path)
+        return index
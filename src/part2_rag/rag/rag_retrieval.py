@@ -1,12 +1,26 @@
+import hashlib
 import json
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from abc import ABC, abstractmethod
 
+import numpy as np
 
-def load_travel_data():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, "travel_data.json")
+from src.common.telemetry import event, span
+
+# scikit-learn and scipy are imported where an index is built or loaded:
+# together they take over a second to import, which every cold start
+# (and every tool subprocess that only imports this module) would pay
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+TRAVEL_DATA_PATH = os.path.join(DATA_DIR, "travel_data.json")
+INDEX_PATH = os.path.join(DATA_DIR, "travel_index.npz")
+
+# Bump whenever create_document_texts or the vectorizer settings change,
+# so index files built by older code are refitted instead of reused
+INDEX_FORMAT_VERSION = 1
+
+
+def load_travel_data(file_path=TRAVEL_DATA_PATH):
     with open(file_path, "r", encoding="utf-8") as file:
         data = json.load(file)
     return data["destinations"]
@@ -16,7 +30,8 @@ def create_document_texts(destinations):
     documents = []
     for dest in destinations:
         # Combine all relevant text fields for comprehensive search
-        # Order matters: destination name first for relevance weighting
+        # (field order does not change TF-IDF weights; the bm25 backend
+        # weights fields separately, see bm25_retrieval.py)
         text = f"{dest['destination']} {dest['description']} "
         text += f"{' '.join(dest['top_attractions'])} "
         text += f"{' '.join(dest['local_cuisine'])} "
@@ -25,62 +40,347 @@ def create_document_texts(destinations):
     return documents
 
 
-def find_relevant_destinations(query, destinations, top_k=2):
-    # Convert structured data to searchable text documents
-    documents = create_document_texts(destinations)
+def compute_source_hash(raw_data):
+    """Content hash of the raw travel data, tied to the index format."""
+    digest = hashlib.sha256(f"v{INDEX_FORMAT_VERSION}:".encode("utf-8"))
+    digest.update(raw_data)
+    return digest.hexdigest()
+
+
+def _new_vectorizer(vocabulary=None):
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
-    # Initialize TF-IDF vectorizer
     # TF-IDF: Term Frequency × Inverse Document Frequency
     # Prioritizes unique words that appear frequently in specific documents
-    vectorizer = TfidfVectorizer(
+    return TfidfVectorizer(
         stop_words="english",  # Remove common words (the, and, is, etc.)
+        vocabulary=vocabulary,
     )
 
+
+class Retriever(ABC):
+    """
+    Interface shared by the destination search backends.
+
+    Implementations return (document index, score) pairs, best match first,
+    where the document index points into `destinations`.
+    """
+
+    destinations = None
+
+    @property
+    def num_documents(self):
+        return len(self.destinations)
+
+    def search(self, query, top_k=2):
+        """Return (document index, score) pairs for the best matches."""
+        return self.search_batch([query], top_k=top_k)[0]
+
+    @abstractmethod
+    def search_batch(self, queries, top_k=2):
+        """Return one list of (document index, score) pairs per query."""
+
+
+class DestinationIndex(Retriever):
+    """
+    TF-IDF index over the destination documents.
+
+    The vectorizer is fitted once and the document matrix is kept as
+    L2-normalised CSR rows, so answering a query costs one `transform`
+    plus one sparse dot product instead of a full refit of the corpus.
+    """
+
+    def __init__(self, vectorizer, doc_matrix, source_hash=None, destinations=None):
+        self.vectorizer = vectorizer
+        self.doc_matrix = doc_matrix
+        self.source_hash = source_hash
+        self.destinations = destinations
+
+    @property
+    def num_documents(self):
+        return self.doc_matrix.shape[0]
+
+    @classmethod
+    def fit(cls, destinations, source_hash=None):
+        """Fit a fresh vectorizer on the destinations and index them."""
+        vectorizer = _new_vectorizer()
+        doc_matrix = vectorizer.fit_transform(create_document_texts(destinations))
+        return cls(vectorizer, doc_matrix.tocsr(), source_hash, destinations)
+
+    def save(self, path=INDEX_PATH):
+        """Persist vocabulary, IDF weights and the sparse document matrix."""
+        terms = np.asarray(self.vectorizer.get_feature_names_out(), dtype=str)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(
+                file,
+                version=np.int64(INDEX_FORMAT_VERSION),
+                source_hash=np.str_(self.source_hash or ""),
+                terms=terms,
+                idf=self.vectorizer.idf_,
+                data=self.doc_matrix.data,
+                indices=self.doc_matrix.indices,
+                indptr=self.doc_matrix.indptr,
+                shape=np.asarray(self.doc_matrix.shape, dtype=np.int64),
+            )
+        # Replace atomically so a concurrent reader never sees a partial file
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH, destinations=None):
+        """Load an index written by `save` without refitting anything."""
+        from scipy import sparse
+
+        with np.load(path, allow_pickle=False) as stored:
+            if int(stored["version"]) != INDEX_FORMAT_VERSION:
+                raise ValueError(f"unsupported index format in {path}")
+            terms = stored["terms"]
+            vectorizer = _new_vectorizer(
+                vocabulary={str(term): i for i, term in enumerate(terms)}
+            )
+            vectorizer.idf_ = stored["idf"]
+            doc_matrix = sparse.csr_matrix(
+                (stored["data"], stored["indices"], stored["indptr"]),
+                shape=tuple(stored["shape"]),
+            )
+            source_hash = str(stored["source_hash"]) or None
+        return cls(vectorizer, doc_matrix, source_hash, destinations)
+
+    def score(self, query):
+        """Cosine similarity between the query and every indexed document."""
+        return self.score_batch([query])[0]
+
+    def score_batch(self, queries):
+        """Similarity matrix with one row per query and one column per document."""
+        # Transform all user queries into one sparse TF-IDF matrix (same space)
+        with span("rag.vectorize", queries=len(queries)):
+            query_matrix = self.vectorizer.transform(queries)
+        # Both sides are L2-normalised, so a single sparse product gives
+        # the cosine similarity for every (query, document) pair
+        with span("rag.score", queries=len(queries), documents=self.num_documents):
+            return (query_matrix @ self.doc_matrix.T).toarray()
+
+    def search_batch(self, queries, top_k=2, chunk_size=256):
+        """
+        Return one list of (document index, similarity) pairs per query.
+
+        Queries are scored `chunk_size` at a time so the dense similarity
+        block stays bounded for large corpora.
+        """
+        results = []
+        for start in range(0, len(queries), chunk_size):
+            similarities = self.score_batch(queries[start : start + chunk_size])
+            results.extend(_top_k_rows(similarities, top_k))
+        return results
+
+
+def _top_k_rows(similarities, top_k, min_score=0.0):
+    """Best `top_k` (index, score) pairs of every row, highest first."""
+    k = min(top_k, similarities.shape[1])
+    if k <= 0:
+        return [[] for _ in range(similarities.shape[0])]
+
+    # argpartition() moves the k largest scores of each row to the end in
+    # linear time; only those k candidates are then sorted (descending)
+    top_indices = np.argpartition(similarities, -k, axis=1)[:, -k:]
+    top_scores = np.take_along_axis(similarities, top_indices, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    top_indices = np.take_along_axis(top_indices, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    # Only keep results with actual similarity (> min_score)
+    return [
+        [
+            (int(idx), float(score))
+            for idx, score in zip(row_idx, row_scores)
+            if score > min_score
+        ]
+        for row_idx, row_scores in zip(top_indices, top_scores)
+    ]
+
+
+def load_destination_index(data_path=TRAVEL_DATA_PATH, index_path=INDEX_PATH):
+    """
+    Load the persisted index, rebuilding it only when the data has changed.
+
+    The index file stores the content hash of the travel data it was built
+    from; a mismatch (or a missing/corrupt file) triggers a refit and save.
+    """
+    with span("rag.load", path=data_path) as load_span:
+        with open(data_path, "rb") as file:
+            raw_data = file.read()
+        source_hash = compute_source_hash(raw_data)
+        destinations = json.loads(raw_data.decode("utf-8"))["destinations"]
+
+        if os.path.exists(index_path):
+            try:
+                index = DestinationIndex.load(index_path, destinations)
+                if index.source_hash == source_hash:
+                    load_span.set(documents=index.num_documents, rebuilt=False)
+                    return index
+                event(
+                    "rag.index_stale",
+                    "🔄 Travel data changed, rebuilding destination index",
+                    level="warning",
+                )
+            except (OSError, ValueError, KeyError) as e:
+                event(
+                    "rag.index_unreadable",
+                    f"⚠️ Could not load destination index, rebuilding: {e}",
+                    level="warning",
+                    error=str(e),
+                )
+
+        index = DestinationIndex.fit(destinations, source_hash)
+        load_span.set(documents=index.num_documents, rebuilt=True)
+        try:
+            index.save(index_path)
+        except OSError as e:
+            # A read-only deployment can still serve from the in-memory index
+            event(
+                "rag.index_save_failed",
+                f"⚠️ Could not save destination index: {e}",
+                level="warning",
+                error=str(e),
+            )
+        return index
+
+
+_index_cache = {}
+
+
+def get_destination_index(data_path=TRAVEL_DATA_PATH, index_path=INDEX_PATH):
+    """Process-wide index, reloaded only when the data file is touched."""
+    stat = os.stat(data_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _index_cache.get(data_path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, load_destination_index(data_path, index_path))
+        _index_cache[data_path] = cached
+    return cached[1]
+
+
+def _dense_backend():
+    # Imported lazily: the dense backend pulls in clustering code that the
+    # default TF-IDF deployments never need
+    from .dense_retrieval import get_dense_index
+
+    return get_dense_index()
+
+
+def _bm25_backend():
+    from .bm25_retrieval import get_bm25_index
+
+    return get_bm25_index()
+
+
+# Backend name -> factory returning a ready Retriever over travel_data.json
+RETRIEVER_BACKENDS = {
+    "tfidf": get_destination_index,
+    "dense": _dense_backend,
+    "bm25": _bm25_backend,
+}
+
+
+def get_retriever(backend=None):
+    """Retriever for the configured backend (RAG_RETRIEVER_BACKEND, default tfidf)."""
+    backend = backend or os.getenv("RAG_RETRIEVER_BACKEND", "tfidf")
     try:
-        # Transform documents into TF-IDF vectors
-        doc_vectors = vectorizer.fit_transform(documents)
+        factory = RETRIEVER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"unknown retriever backend {backend!r}, "
+            f"expected one of {sorted(RETRIEVER_BACKENDS)}"
+        ) from None
+    return factory()
+
+
+def _resolve_index(destinations, index):
+    if index is None:
+        index = get_destination_index()
+        # Same records in the same order (list equality checks identity
+        # first, so passing index.destinations itself costs nothing)
+        if index.destinations != destinations:
+            # The caller brought its own corpus instead of travel_data.json,
+            # so fit a throwaway index that lines up with it
+            index = DestinationIndex.fit(destinations)
+    return index
 
-        # Transform user query into TF-IDF vector (same space)
-        query_vector = vectorizer.transform([query])
 
-        # Calculate cosine similarity between query and all documents
-        # Cosine similarity measures vector angles (0=different, 1=same)
-        similarities = cosine_similarity(query_vector, doc_vectors)[0]
+def find_relevant_destinations(
+    query, destinations, top_k=2, index=None, return_scores=False
+):
+    """
+    Retrieve the destinations most similar to the query.
 
-        # Get top-k most similar destinations
-        # argsort() returns indices sorted by similarity (ascending)
-        # [-top_k:][::-1] gets last top_k indices and reverses (descending)
-        top_indices = similarities.argsort()[-top_k:][::-1]
+    With `return_scores=True` the result is a list of (destination,
+    similarity) pairs instead of bare destinations.
+    """
+    index = _resolve_index(destinations, index)
+
+    try:
+        # Score the query against the prebuilt document matrix
+        matches = index.search(query, top_k=top_k)
 
-        # Filter results with actual similarity (> 0)
         relevant_destinations = []
-        for idx in top_indices:
-            # Only include if there's some similarity
-            if similarities[idx] > 0:
+        for idx, similarity in matches:
+            if return_scores:
+                relevant_destinations.append((destinations[idx], similarity))
+            else:
                 relevant_destinations.append(destinations[idx])
-                print(
-                    f"📍 Found: {destinations[idx]['destination']} "
-                    f"(similarity: {similarities[idx]:.3f})"
-                )
+            event(
+                "rag.match",
+                destination=destinations[idx]["destination"],
+                similarity=round(similarity, 3),
+            )
 
         if not relevant_destinations:
-            print("🔍 No relevant destinations found for query:", query)
+            event("rag.no_match", query=query)
 
         return relevant_destinations
 
     except Exception as e:
-        print(f"❌ Error during similarity search: {e}")
+        event(
+            "rag.search_failed",
+            f"❌ Error during similarity search: {e}",
+            level="error",
+            error=str(e),
+        )
         return []
 
 
-def format_destination_info(destination):
+def find_relevant_destinations_batch(queries, destinations, top_k=2, index=None):
+    """
+    Retrieve destinations for many queries with a single sparse product.
+
+    Returns one list per query of (destination, similarity) pairs, best
+    match first; queries without any matching destination get an empty list.
+    """
+    index = _resolve_index(destinations, index)
+    return [
+        [(destinations[idx], similarity) for idx, similarity in matches]
+        for matches in index.search_batch(list(queries), top_k=top_k)
+    ]
+
+
+def format_destination_info(destination, max_list_items=None, omit_fields=()):
     # Format information in a structured, LLM-friendly way
+    # max_list_items / omit_fields let the context packer shrink a block
+    fields = [
+        ("Best Season", destination["best_season"]),
+        ("Budget Range", destination["budget_range"]),
+        ("Top Attractions", destination["top_attractions"]),
+        ("Local Cuisine", destination["local_cuisine"]),
+        ("Transportation", destination["transportation"]),
+        ("Cultural Tips", destination["cultural_tips"]),
+        ("Weather", destination["weather_info"]),
+    ]
+
     info = f"**{destination['destination']}**\n"
-    info += f"• Best Season: {destination['best_season']}\n"
-    info += f"• Budget Range: {destination['budget_range']}\n"
-    info += f"• Top Attractions: {', '.join(destination['top_attractions'])}\n"
-    info += f"• Local Cuisine: {', '.join(destination['local_cuisine'])}\n"
-    info += f"• Transportation: {destination['transportation']}\n"
-    info += f"• Cultural Tips: {destination['cultural_tips']}\n"
-    info += f"• Weather: {destination['weather_info']}\n"
+    for label, value in fields:
+        if label in omit_fields:
+            continue
+        if isinstance(value, list):
+            value = ", ".join(value[:max_list_items])
+        info += f"• {label}: {value}\n"
     return info
@@ -0,0 +1,132 @@
+"""
+Sharded destination retrieval for large catalogues.
+
+The corpus is split into row shards of one globally fitted TF-IDF index, so
+every shard scores in the same vector space. Queries fan out to all shards,
+each shard returns its local top-k and the results are merged with a heap.
+"""
+
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from .rag_retrieval import DestinationIndex, Retriever, _top_k_rows
+
+
+def _search_shard(doc_matrix, offset, query_matrix, top_k, chunk_size=256):
+    """Local top-k of one shard, with document indices made global."""
+    results = []
+    for start in range(0, query_matrix.shape[0], chunk_size):
+        chunk = query_matrix[start : start + chunk_size]
+        similarities = (chunk @ doc_matrix.T).toarray()
+        for matches in _top_k_rows(similarities, top_k):
+            results.append([(offset + idx, score) for idx, score in matches])
+    return results
+
+
+# Each process-pool worker owns exactly one shard, handed over once at start-up
+_worker_shard = None
+
+
+def _init_shard_worker(doc_matrix, offset):
+    global _worker_shard
+    _worker_shard = (doc_matrix, offset)
+
+
+def _search_worker_shard(query_matrix, top_k):
+    doc_matrix, offset = _worker_shard
+    return _search_shard(doc_matrix, offset, query_matrix, top_k)
+
+
+class ShardedDestinationIndex(Retriever):
+    """
+    Row-sharded view of a DestinationIndex served by a worker pool.
+
+    With `executor="process"` every shard lives in its own single-worker
+    process, so shards are transferred once and queries only ship the sparse
+    query matrix. With `executor="thread"` shards share the process and rely
+    on scipy's sparse kernels running without the GIL.
+    """
+
+    def __init__(self, index, num_shards=None, executor="process"):
+        if executor not in ("process", "thread"):
+            raise ValueError(f"unknown executor: {executor!r}")
+
+        self.index = index
+        self.executor = executor
+        num_shards = num_shards or os.cpu_count() or 1
+        num_shards = max(1, min(num_shards, index.num_documents))
+        bounds = np.linspace(0, index.num_documents, num_shards + 1, dtype=int)
+        self.shards = [
+            (index.doc_matrix[start:stop], int(start))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+        if executor == "process":
+            self._pools = [
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_init_shard_worker,
+                    initargs=shard,
+                )
+                for shard in self.shards
+            ]
+        else:
+            self._pools = [ThreadPoolExecutor(max_workers=num_shards)]
+
+    @property
+    def num_shards(self):
+        return len(self.shards)
+
+    @property
+    def destinations(self):
+        return self.index.destinations
+
+    def search_batch(self, queries, top_k=2):
+        """Fan the queries out to every shard and merge the per-shard top-k."""
+        query_matrix = self.index.vectorizer.transform(queries)
+
+        if self.executor == "process":
+            futures = [
+                pool.submit(_search_worker_shard, query_matrix, top_k)
+                for pool in self._pools
+            ]
+        else:
+            futures = [
+                self._pools[0].submit(
+                    _search_shard, doc_matrix, offset, query_matrix, top_k
+                )
+                for doc_matrix, offset in self.shards
+            ]
+        shard_results = [future.result() for future in futures]
+
+        # Every shard list is already sorted by descending similarity, so a
+        # heap merge only has to look at the first top_k entries overall
+        return [
+            list(
+                itertools.islice(
+                    heapq.merge(*per_query, key=lambda match: -match[1]), top_k
+                )
+            )
+            for per_query in zip(*shard_results)
+        ]
+
+    def close(self):
+        for pool in self._pools:
+            pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_sharded_index(destinations, num_shards=None, executor="process"):
+    """Fit one global index over the destinations and shard it."""
+    return ShardedDestinationIndex(
+        DestinationIndex.fit(destinations), num_shards, executor
+    )
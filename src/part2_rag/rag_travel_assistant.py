@@ -1,41 +1,97 @@
+import argparse
+import asyncio
 import os
-from openai import OpenAI
+import sys
+import threading
+import time
 from dotenv import load_dotenv
+
+# Add the project root to the path so we can import from src
+# (the rag package reports to src.common.telemetry)
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
 from rag.rag_retrieval import (
-    load_travel_data,
+    get_retriever,
     find_relevant_destinations,
-    format_destination_info,
+)
+from rag.context_packing import (
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    pack_context,
+    prerender_destinations,
 )
 
+from src.common.batch_runner import add_batch_arguments, run_batch_cli
+from src.common.llm_cache import (
+    acached_chat_completion,
+    cache_enabled,
+    cached_chat_completion,
+    get_response_cache,
+)
+from src.common.model_clients import (
+    awarm_up_connection,
+    get_async_openai_client,
+    get_openai_client,
+    lazy_client,
+    warm_up_connection,
+)
+from src.common.streaming import (
+    astream_chat_completion,
+    get_timing_recorder,
+    stream_chat_completion,
+)
+from src.common.telemetry import span
+
 # Load environment variables from .env file
 load_dotenv()
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 # Initialize OpenAI client with GitHub Models endpoint
 # GitHub Models provides free access to popular LLMs including GPT-4o-mini
-client = OpenAI(
-    base_url="https://models.inference.ai.azure.com",
-    api_key=GITHUB_TOKEN,
-)
-
-
-def get_rag_enhanced_advice(user_query):
-    """Get travel advice enhanced with RAG (retrieved information)."""
-    # Step 1: Load travel data from JSON file
-    destinations = load_travel_data()
-
-    # Step 2: Find relevant destinations using TF-IDF similarity matching
-    relevant_destinations = find_relevant_destinations(
-        user_query,
-        destinations,
-    )
-
-    # Step 3: Format retrieved information as context
-    context = ""
-    if relevant_destinations:
-        context = "Here is relevant travel information:\n\n"
-        for dest in relevant_destinations:
-            context += format_destination_info(dest) + "\n"
+# (shared connection pool and rate-limit-aware scheduler), created on first use
+get_client = lazy_client(get_openai_client)
+# Async client for batch mode, on the same scheduler (one per event loop,
+# so the async helpers can be run from more than one asyncio.run)
+get_async_client = get_async_openai_client
+
+# Generation settings shared by the sync and async paths
+COMPLETION_SETTINGS = {
+    "model": "gpt-4o-mini",  # Free model via GitHub Models
+    "temperature": 0.7,  # Balance between creativity and consistency
+    "max_tokens": 500,  # Limit response length for workshop demo
+}
+
+
+def build_rag_messages(user_query, context_token_budget=None):
+    """Retrieve context for the query and build the RAG chat messages."""
+    # Step 1: Load the prebuilt retriever for this deployment
+    # (RAG_RETRIEVER_BACKEND: "tfidf" by default, or "dense" for ANN search)
+    with span("rag.retrieve") as retrieve_span:
+        retriever = get_retriever()
+        # Render every destination's context blocks once per loaded index
+        prerender_destinations(retriever.destinations)
+
+        # Step 2: Find relevant destinations using similarity matching
+        relevant_destinations = find_relevant_destinations(
+            user_query,
+            retriever.destinations,
+            index=retriever,
+            return_scores=True,
+        )
+        retrieve_span.set(matches=len(relevant_destinations))
+
+    # Step 3: Pack cached destination blocks into the context token budget,
+    # trimming attraction and cuisine lists of lower-ranked matches first
+    with span("rag.context") as context_span:
+        packed = pack_context(
+            relevant_destinations,
+            context_token_budget or DEFAULT_CONTEXT_TOKEN_BUDGET,
+        )
+        context_span.set(
+            tokens=packed.token_count,
+            included=len(packed.included),
+            truncated=len(packed.truncated),
+        )
+    if packed.text:
+        context = packed.text
     else:
         context = "No specific destination information found in the database."
 
@@ -64,20 +120,102 @@ def get_rag_enhanced_advice(user_query):
         Please provide travel advice based ONLY on the information provided above.
         """
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def get_rag_enhanced_advice(user_query, context_token_budget=None, use_cache=None):
+    """
+    Get travel advice enhanced with RAG (retrieved information).
+    With use_cache (default: LLM_CACHE_ENABLED) repeated prompts are
+    answered from the local response cache without a network call.
+    """
+    messages = build_rag_messages(user_query, context_token_budget)
+
     # Step 6: Call GitHub Models API with RAG-enhanced prompt
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",  # Free model via GitHub Models
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.7,  # Balance between creativity and consistency
-        max_tokens=500,  # Limit response length for workshop demo
+    # (or reuse the cached answer to an identical prompt)
+    if use_cache is None:
+        use_cache = cache_enabled()
+    response = cached_chat_completion(
+        get_client(),
+        get_response_cache() if use_cache else None,
+        messages=messages,
+        **COMPLETION_SETTINGS,
     )
 
     return response.choices[0].message.content
 
 
+async def aget_rag_enhanced_advice(
+    user_query, context_token_budget=None, use_cache=None
+):
+    """Async variant of get_rag_enhanced_advice used by batch mode."""
+    messages = build_rag_messages(user_query, context_token_budget)
+
+    if use_cache is None:
+        use_cache = cache_enabled()
+    response = await acached_chat_completion(
+        get_async_client(),
+        get_response_cache() if use_cache else None,
+        messages=messages,
+        **COMPLETION_SETTINGS,
+    )
+
+    return response.choices[0].message.content
+
+
+def stream_rag_enhanced_advice(user_query, context_token_budget=None, use_cache=None):
+    """
+    Streaming variant of get_rag_enhanced_advice that yields the advice as
+    it is generated. The connection to the model endpoint is opened while
+    retrieval runs, so neither delays the first token more than needed.
+    """
+    started = time.perf_counter()
+    warm_up = threading.Thread(target=warm_up_connection, daemon=True)
+    warm_up.start()
+    messages = build_rag_messages(user_query, context_token_budget)
+    # Let the handshake finish so the request reuses that connection
+    warm_up.join(timeout=5)
+
+    if use_cache is None:
+        use_cache = cache_enabled()
+    yield from stream_chat_completion(
+        get_client(),
+        get_response_cache() if use_cache else None,
+        label="rag_advice",
+        started=started,
+        messages=messages,
+        **COMPLETION_SETTINGS,
+    )
+
+
+async def astream_rag_enhanced_advice(
+    user_query, context_token_budget=None, use_cache=None
+):
+    """Async streaming variant of get_rag_enhanced_advice."""
+    started = time.perf_counter()
+    # Retrieval is CPU-bound, so it runs in a thread while the loop
+    # opens the connection
+    messages, _ = await asyncio.gather(
+        asyncio.to_thread(build_rag_messages, user_query, context_token_budget),
+        awarm_up_connection(),
+    )
+
+    if use_cache is None:
+        use_cache = cache_enabled()
+    async for delta in astream_chat_completion(
+        get_async_client(),
+        get_response_cache() if use_cache else None,
+        label="rag_advice",
+        started=started,
+        messages=messages,
+        **COMPLETION_SETTINGS,
+    ):
+        yield delta
+
+
 def main():
     """
     Main function demonstrating RAG-enhanced travel advice.
@@ -86,14 +224,30 @@ def main():
     - Without RAG: Generic travel advice based on LLM training data
     - With RAG: Specific advice based on retrieved travel database information
     """
+    parser = argparse.ArgumentParser(description="RAG-enhanced travel assistant")
+    # Example query - pass different ones to test different scenarios
+    parser.add_argument("query", nargs="?", default="Plan a trip to Tokyo")
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch_cli(args, aget_rag_enhanced_advice)
+        return
 
-    # Example query - modify this to test different scenarios
-    query = "Plan a trip to Tokyo"
+    query = args.query
     print(f"\n🔍 User Query: {query}")
 
-    # Get RAG-enhanced advice with retrieved context
-    advice = get_rag_enhanced_advice(query)
-    print("\n💡 RAG-Enhanced Travel Advice:" f"\n{advice}")
+    # Stream RAG-enhanced advice with retrieved context
+    print("\n💡 RAG-Enhanced Travel Advice:")
+    # One trace for the query: retrieval, context packing and the LLM call
+    with span("rag.query"):
+        for delta in stream_rag_enhanced_advice(query):
+            print(delta, end="", flush=True)
+    print()
+
+    timing = get_timing_recorder().last
+    if timing is not None and timing.ttft_ms is not None:
+        print(f"⏱️ First token after {timing.ttft_ms:.0f}ms (including retrieval)")
 
 
 if __name__ == "__main__":
@@ -4,59 +4,75 @@ Demonstrates how external tools enhance agent capabilities.
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 
-# AutoGen imports
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.ui import Console
+# Add the project root to the path so we can import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
-# Import our custom tools
-from tools.weather_tool import get_weather_info
-from tools.flight_tool import search_flights
-from tools.currency_tool import convert_currency
+from src.common.model_clients import get_agent_model_client, lazy_client
 
 # Load environment variables
 load_dotenv()
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 
-# Create OpenAI client for GitHub Models
-model_client = OpenAIChatCompletionClient(
-    model="gpt-4o-mini",
-    api_key=GITHUB_TOKEN,
-    base_url="https://models.inference.ai.azure.com",
-)
+# Create OpenAI client for GitHub Models on first use
+# (shared connection pool and rate-limit-aware scheduler; recorded to or
+# replayed from a cassette when MODEL_CASSETTE_MODE is set)
+get_model_client = lazy_client(lambda: get_agent_model_client("gpt-4o-mini"))
 
 
-# Create agent with tools
-travel_agent = AssistantAgent(
-    name="TravelAgent",
-    model_client=model_client,
-    tools=[get_weather_info, search_flights, convert_currency],
-    system_message="""You are a helpful travel planning assistant. You have access to:
+def create_travel_agent():
+    """Travel agent with the weather, flight and currency tools."""
+    # AutoGen and the tools are imported here, not at module load, so
+    # importing this module (or the CLI) stays fast
+    from autogen_agentchat.agents import AssistantAgent
+
+    # Import our custom tools (async variants, so the tool calls of one turn
+    # run concurrently and a turn takes as long as its slowest tool)
+    from tools.async_tools import get_async_travel_tools
+
+    return AssistantAgent(
+        name="TravelAgent",
+        model_client=get_model_client(),
+        tools=get_async_travel_tools(),
+        system_message="""You are a helpful travel planning assistant. You have access to:
     1. Weather information - use to check weather conditions for destinations
     2. Flight search - use to find flights between cities
     3. Currency converter - use to help with budget planning
     Use these tools to provide comprehensive, practical travel advice.
     Always be specific with dates, amounts, and locations when using tools.""",
-    reflect_on_tool_use=True,
-    model_client_stream=True,
-)
+        reflect_on_tool_use=True,
+        model_client_stream=True,
+    )
 
 
 # Run the agent and stream the messages to the console.
 async def main(query):
-    await Console(travel_agent.run_stream(task=query))
-    # Close the connection to the model client.
-    await model_client.close()
+    from autogen_agentchat.ui import Console
+
+    travel_agent = create_travel_agent()
+    try:
+        await Console(travel_agent.run_stream(task=query))
+    finally:
+        # Close the connection to the model client (and finish any cassette)
+        await get_model_client().close()
 
 
 if __name__ == "__main__":
+    import argparse
     import asyncio
 
-    # query = "what is the weather like in Tokyo in end of August?"
-    # query = "find flights from New York City (NYC) to Tokyo on 2025-09-15"
-    # query = "how much is 100 USD in JPY?"
-    query = "find flights from New York City (NYC) to Tokyo on 2025-09-15, provide the expected weather in Tokyo around that date, and convert 100 USD to JPY."
-    asyncio.run(main(query))
+    parser = argparse.ArgumentParser(description="Tool-enabled travel agent")
+    # Example queries:
+    # "what is the weather like in Tokyo in end of August?"
+    # "find flights from New York City (NYC) to Tokyo on 2025-09-15"
+    # "how much is 100 USD in JPY?"
+    parser.add_argument(
+        "query",
+        nargs="?",
+        default="find flights from New York City (NYC) to Tokyo on 2025-09-15, provide the expected weather in Tokyo around that date, and convert 100 USD to JPY.",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.query))
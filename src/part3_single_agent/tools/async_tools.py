@@ -0,0 +1,80 @@
+"""
+Travel Tools - Async Variants
+Async versions of the travel tools. Blocking backends run on the bounded
+tool thread pool (tool_executor) with per-call timeouts and cancellation,
+so the tool calls of one agent turn run concurrently without blocking the
+event loop.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from autogen_core import CancellationToken
+from autogen_core.tools import FunctionTool
+
+from .currency_tool import convert_currency
+from .flight_tool import FlightInfo, search_flights
+
+from .tool_executor import run_blocking
+from .weather_tool import WeatherInfo, get_weather_info
+
+
+def async_tool(async_func: Callable[..., Any], sync_func: Callable[..., Any]):
+    """
+    FunctionTool for the async variant of a tool that keeps the sync
+    tool's name and description, so the model sees the same tool.
+    """
+    return FunctionTool(
+        async_func, description=sync_func.__doc__ or "", name=sync_func.__name__
+    )
+
+
+async def aget_weather_info(
+    location: str,
+    days: int = 3,
+    cancellation_token: Optional[CancellationToken] = None,
+) -> WeatherInfo:
+    """Async get_weather_info with a timeout and cancellation."""
+    return await run_blocking(
+        get_weather_info, location, days, cancellation_token=cancellation_token
+    )
+
+
+async def asearch_flights(
+    origin: str,
+    destination: str,
+    departure_date: str,
+    cancellation_token: Optional[CancellationToken] = None,
+) -> List[FlightInfo]:
+    """Async search_flights with a timeout and cancellation."""
+    return await run_blocking(
+        search_flights,
+        origin,
+        destination,
+        departure_date,
+        cancellation_token=cancellation_token,
+    )
+
+
+async def aconvert_currency(
+    amount: float,
+    from_currency: str,
+    to_currency: str,
+    cancellation_token: Optional[CancellationToken] = None,
+) -> Dict:
+    """Async convert_currency with a timeout and cancellation."""
+    return await run_blocking(
+        convert_currency,
+        amount,
+        from_currency,
+        to_currency,
+        cancellation_token=cancellation_token,
+    )
+
+
+def get_async_travel_tools() -> List[FunctionTool]:
+    """The travel tools as async FunctionTools with their sync names."""
+    return [
+        async_tool(aget_weather_info, get_weather_info),
+        async_tool(asearch_flights, search_flights),
+        async_tool(aconvert_currency, convert_currency),
+    ]
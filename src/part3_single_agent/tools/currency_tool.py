@@ -3,56 +3,161 @@ Travel Tools - Currency Conversion Service
 Simple currency converter for travel budgeting.
 """
 
-from typing import Dict
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Union
 
+import numpy as np
 
-def get_exchange_rate(from_currency: str, to_currency: str) -> float:
+# Mock exchange rates (USD as base)
+MOCK_USD_RATES = {
+    "USD": 1.0,
+    "EUR": 0.85,
+    "GBP": 0.75,
+    "JPY": 110.0,
+    "CAD": 1.25,
+    "AUD": 1.35,
+    "CHF": 0.92,
+    "CNY": 6.45,
+}
+
+# Seconds before the rate table is refreshed from the rate source
+RATE_TTL_SECONDS = 3600.0
+
+Codes = Union[str, Sequence[str], np.ndarray]
+
+
+def fetch_usd_rates() -> Dict[str, float]:
     """
-    Get exchange rate between two currencies.
+    Fetch current exchange rates with USD as base.
     This is a mock service - in real implementation, use ExchangeRate-API.
     """
-    # Mock exchange rates (USD as base)
-    exchange_rates = {
-        "USD": 1.0,
-        "EUR": 0.85,
-        "GBP": 0.75,
-        "JPY": 110.0,
-        "CAD": 1.25,
-        "AUD": 1.35,
-        "CHF": 0.92,
-        "CNY": 6.45,
-    }
+    return dict(MOCK_USD_RATES)
+
+
+class RateTable:
+    """
+    Immutable snapshot of exchange rates as a precomputed N x N cross-rate
+    matrix: `matrix[index[a], index[b]]` converts currency a into b.
+
+    Rates are rounded to 4 decimals like the single-pair lookup always
+    was. Unknown codes are treated like USD.
+    """
+
+    def __init__(
+        self,
+        usd_rates: Dict[str, float],
+        ttl_seconds: float = RATE_TTL_SECONDS,
+        fetched_at: Optional[float] = None,
+    ):
+        if "USD" not in usd_rates:
+            usd_rates = {"USD": 1.0, **usd_rates}
+        self.codes = tuple(usd_rates)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.ttl_seconds = ttl_seconds
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+        usd = np.array([usd_rates[code] for code in self.codes], dtype=np.float64)
+        # from -> USD -> to
+        matrix = np.round(usd[np.newaxis, :] / usd[:, np.newaxis], 4)
+        np.fill_diagonal(matrix, 1.0)
+        matrix.setflags(write=False)
+        self.matrix = matrix
+        self._fallback = self.index["USD"]
+
+    @property
+    def expired(self) -> bool:
+        return time.time() - self.fetched_at >= self.ttl_seconds
+
+    def indices(self, codes: Codes) -> np.ndarray:
+        """Matrix indices of currency codes (a scalar code gives a 0-d array)."""
+        codes = np.asarray(codes)
+        # Look up each distinct code once; batches repeat a few codes a lot
+        unique, inverse = np.unique(codes, return_inverse=True)
+        lookup = np.array(
+            [self.index.get(str(code), self._fallback) for code in unique],
+            dtype=np.intp,
+        )
+        return lookup[inverse].reshape(codes.shape)
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        i = self.index.get(from_currency, self._fallback)
+        j = self.index.get(to_currency, self._fallback)
+        return float(self.matrix[i, j])
 
-    try:
-        if from_currency == to_currency:
-            return 1.0
 
-        # Convert through USD if needed
-        usd_rate_from = exchange_rates.get(from_currency, 1.0)
-        usd_rate_to = exchange_rates.get(to_currency, 1.0)
+_rate_table = None
+_refresh_lock = threading.Lock()
 
-        # Calculate rate: from_currency -> USD -> to_currency
-        rate = usd_rate_to / usd_rate_from
-        return round(rate, 4)
+
+def get_rate_table() -> RateTable:
+    """Current rate table, refreshed from the rate source once its TTL passed."""
+    global _rate_table
+    table = _rate_table
+    if table is not None and not table.expired:
+        return table
+    with _refresh_lock:
+        # Another caller may have refreshed while we waited for the lock
+        if _rate_table is None or _rate_table.expired:
+            set_rate_table(RateTable(fetch_usd_rates()))
+        return _rate_table
+
+
+def set_rate_table(table: RateTable) -> None:
+    """
+    Atomically replace the rate table. Readers take one reference per
+    call, so a conversion never mixes rates from two tables.
+    """
+    global _rate_table
+    _rate_table = table
+
+
+def get_exchange_rate(from_currency: str, to_currency: str) -> float:
+    """
+    Get exchange rate between two currencies.
+    This is a mock service - in real implementation, use ExchangeRate-API.
+    """
+    try:
+        return get_rate_table().rate(from_currency, to_currency)
 
     except Exception as e:
         print(f"Currency conversion error: {e}")
         return 1.0
 
 
+def convert_currency_batch(
+    amounts: Union[Iterable[float], np.ndarray],
+    from_codes: Codes,
+    to_codes: Codes,
+    table: Optional[RateTable] = None,
+) -> np.ndarray:
+    """
+    Convert arrays of amounts in one vectorized operation.
+    Codes may be arrays matching `amounts` or single codes that apply to
+    every amount. Results are not rounded, so line items can be summed
+    before rounding to cents.
+    """
+    table = table or get_rate_table()
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rates = table.matrix[table.indices(from_codes), table.indices(to_codes)]
+    return amounts * rates
+
+
 def convert_currency(
     amount: float,
     from_currency: str,
     to_currency: str,
 ) -> Dict:
     """Convert amount from one currency to another."""
-    rate = get_exchange_rate(from_currency, to_currency)
-    converted_amount = amount * rate
+    table = get_rate_table()
+    converted_amount = convert_currency_batch(
+        amount, from_currency, to_currency, table=table
+    )
 
     return {
         "original_amount": amount,
         "from_currency": from_currency,
         "to_currency": to_currency,
-        "exchange_rate": rate,
-        "converted_amount": round(converted_amount, 2),
+        "exchange_rate": table.rate(from_currency, to_currency),
+        "converted_amount": round(float(converted_amount), 2),
     }
@@ -0,0 +1,96 @@
+"""
+Travel Tools - Batch Flight Search
+Searches many routes concurrently and packs the results into a compact
+columnar structure: field names are sent once, each route carries plain
+value rows, and results can be cut to the cheapest k flights and to the
+fields the caller needs.
+"""
+
+import asyncio
+from dataclasses import astuple, fields
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .flight_tool import FlightInfo, search_flights
+from .tool_executor import run_blocking
+
+# Fields identifying a route; sent once per route, not once per flight
+ROUTE_FIELDS = ["origin", "destination", "departure_date"]
+# Per-flight fields, in FlightInfo order
+FLIGHT_FIELDS = [f.name for f in fields(FlightInfo) if f.name not in ROUTE_FIELDS]
+# Routes accepted in one batch
+MAX_BATCH_ROUTES = 50
+
+Route = Tuple[str, str, str]
+
+
+def compact_flight_results(
+    routes: Sequence[Route],
+    results: Sequence[Any],
+    top_k: Optional[int] = None,
+    field_names: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Columnar form of per-route search results:
+
+        {"route_fields": ["origin", "destination", "departure_date"],
+         "fields": ["price", "airline"],
+         "routes": [["NYC", "Tokyo", "2025-09-15", [[699.99, "Budget Airways"]]]],
+         "errors": {"1": "..."}}     # only for routes that failed
+
+    `results[i]` is a list of FlightInfo or an exception. Flights are
+    sorted by price and cut to `top_k`; `field_names` selects and orders
+    the per-flight fields (default: all of FLIGHT_FIELDS).
+    """
+    field_names = list(field_names or FLIGHT_FIELDS)
+    unknown = [name for name in field_names if name not in FLIGHT_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown flight fields {unknown}, expected some of {FLIGHT_FIELDS}"
+        )
+    all_names = [f.name for f in fields(FlightInfo)]
+    columns = [all_names.index(name) for name in field_names]
+
+    packed = []
+    errors = {}
+    for i, (route, flights) in enumerate(zip(routes, results)):
+        rows = []
+        if isinstance(flights, BaseException):
+            errors[str(i)] = str(flights) or type(flights).__name__
+        else:
+            flights = sorted(flights, key=lambda flight: flight.price)
+            for flight in flights[:top_k] if top_k else flights:
+                values = astuple(flight)
+                rows.append([values[c] for c in columns])
+        packed.append([*route, rows])
+
+    result = {"route_fields": ROUTE_FIELDS, "fields": field_names, "routes": packed}
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+async def search_flights_batch(
+    routes: Sequence[Route],
+    top_k: Optional[int] = None,
+    field_names: Optional[Sequence[str]] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Search every (origin, destination, departure_date) route concurrently
+    on the tool thread pool and return compact_flight_results(). Repeated
+    routes are searched once; a route that fails or times out is reported
+    under "errors" without failing the batch.
+    """
+    routes = [tuple(route) for route in routes]
+    if len(routes) > MAX_BATCH_ROUTES:
+        raise ValueError(f"At most {MAX_BATCH_ROUTES} routes per batch")
+
+    unique: List[Route] = list(dict.fromkeys(routes))
+    searched = await asyncio.gather(
+        *(run_blocking(search_flights, *route, timeout=timeout) for route in unique),
+        return_exceptions=True,
+    )
+    by_route = dict(zip(unique, searched))
+    return compact_flight_results(
+        routes, [by_route[route] for route in routes], top_k, field_names
+    )
@@ -0,0 +1,355 @@
+"""
+Travel Tools - Flight Inventory Engine
+Indexed, memory-mapped flight schedule and fare store behind search_flights.
+
+The inventory is a directory of columnar .npy arrays sorted by
+(origin, destination, date, price), plus a small JSON dictionary of
+airport and airline codes. A route key per row makes every route/date
+lookup a binary search, and memory-mapping lets worker processes share
+one copy of the data through the page cache.
+"""
+
+import csv
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+INVENTORY_FORMAT_VERSION = 1
+DICTIONARY_FILE = "dictionary.json"
+COLUMNS = ("route_key", "date", "price", "airline", "duration", "stops")
+CSV_FIELDS = (
+    "origin",
+    "destination",
+    "departure_date",
+    "price",
+    "airline",
+    "duration",
+    "stops",
+)
+# Days after the earliest departure a route key can address
+MAX_DATE_SPAN = 1 << 16
+
+_DURATION_RE = re.compile(r"^\s*(?:(\d+)\s*h)?\s*(?:(\d+)\s*m)?\s*$")
+_CODE_RE = re.compile(r"\(([A-Za-z]{3})\)")
+
+
+def parse_duration(duration: str) -> int:
+    """Minutes of an "8h 30m" style duration (bare numbers are minutes)."""
+    if str(duration).strip().isdigit():
+        return int(duration)
+    match = _DURATION_RE.match(str(duration))
+    if not match or not any(match.groups()):
+        raise ValueError(f"Unrecognized duration: {duration!r}")
+    hours, minutes = match.groups()
+    return int(hours or 0) * 60 + int(minutes or 0)
+
+
+def format_duration(minutes: int) -> str:
+    return f"{minutes // 60}h {minutes % 60}m"
+
+
+def to_day(departure_date: str) -> int:
+    """Days since 1970-01-01 of an ISO date."""
+    return int(np.datetime64(departure_date, "D").astype(np.int64))
+
+
+def from_day(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+def airport_code(location: str) -> str:
+    """Airport code of "New York City (NYC)" style names, or the name itself."""
+    match = _CODE_RE.search(location)
+    return (match.group(1) if match else location).strip().upper()
+
+
+def _strings(values) -> np.ndarray:
+    """Fixed-width unicode array, so sorting and np.unique stay in C."""
+    return np.asarray(values).astype(str)
+
+
+class FlightInventory:
+    """
+    Read-only flight inventory answering route/date queries by binary
+    search over the sorted route keys.
+
+    route_key = (origin * n_airports + destination) * MAX_DATE_SPAN + day
+    offset, so one route's rows are contiguous and ordered by date, and
+    within one route and date they are ordered by price.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        airports: List[str],
+        airlines: List[str],
+        first_day: int,
+    ):
+        self.columns = columns
+        self.airports = airports
+        self.airlines = airlines
+        self.first_day = first_day
+        self.airport_index = {code: i for i, code in enumerate(airports)}
+        self.route_key = columns["route_key"]
+        self.price = columns["price"]
+        self.date = columns["date"]
+        self.stops = columns["stops"]
+
+    def __len__(self) -> int:
+        return len(self.route_key)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        origin: np.ndarray,
+        destination: np.ndarray,
+        day: np.ndarray,
+        price: np.ndarray,
+        airline: np.ndarray,
+        duration: np.ndarray,
+        stops: np.ndarray,
+        airports: List[str],
+        airlines: List[str],
+    ) -> "FlightInventory":
+        """Build from code-encoded columns (indices into airports/airlines)."""
+        day = np.asarray(day, dtype=np.int64)
+        first_day = int(day.min()) if len(day) else 0
+        offset = day - first_day
+        if len(offset) and offset.max() >= MAX_DATE_SPAN:
+            raise ValueError("Departure dates span more than MAX_DATE_SPAN days")
+
+        route_key = (
+            np.asarray(origin, dtype=np.int64) * len(airports)
+            + np.asarray(destination, dtype=np.int64)
+        ) * MAX_DATE_SPAN + offset
+        price = np.asarray(price, dtype=np.float64)
+        # Sort by route key, then price
+        order = np.lexsort((price, route_key))
+        columns = {
+            "route_key": route_key[order],
+            "date": day[order].astype(np.int32),
+            "price": price[order],
+            "airline": np.asarray(airline, dtype=np.int32)[order],
+            "duration": np.asarray(duration, dtype=np.int32)[order],
+            "stops": np.asarray(stops, dtype=np.int8)[order],
+        }
+        return cls(columns, list(airports), list(airlines), first_day)
+
+    @classmethod
+    def from_columns(
+        cls,
+        origin,
+        destination,
+        departure_date,
+        price,
+        airline,
+        duration,
+        stops,
+    ) -> "FlightInventory":
+        """
+        Build from raw CSV_FIELDS columns (names, ISO dates or datetime64,
+        "8h 30m" or minutes). Codes and durations are parsed once per
+        distinct value rather than per row.
+        """
+        # Airport names -> codes, shared between origin and destination
+        names, name_ids = np.unique(
+            np.concatenate([_strings(origin), _strings(destination)]),
+            return_inverse=True,
+        )
+        airports, code_ids = np.unique(
+            [airport_code(name) for name in names], return_inverse=True
+        )
+        airport_ids = code_ids[name_ids.ravel()]
+        airlines, airline_ids = np.unique(_strings(airline), return_inverse=True)
+
+        duration = np.asarray(duration)
+        if duration.dtype.kind not in "iuf":
+            values, value_ids = np.unique(_strings(duration), return_inverse=True)
+            minutes = np.array([parse_duration(v) for v in values], dtype=np.int64)
+            duration = minutes[value_ids.ravel()]
+
+        return cls.from_arrays(
+            airport_ids[: len(airport_ids) // 2],
+            airport_ids[len(airport_ids) // 2 :],
+            np.asarray(departure_date, dtype="datetime64[D]").astype(np.int64),
+            np.asarray(price, dtype=np.float64),
+            airline_ids.ravel(),
+            duration,
+            np.asarray(stops, dtype=np.int64),
+            airports=airports.tolist(),
+            airlines=airlines.tolist(),
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple]) -> "FlightInventory":
+        """Build from (origin, destination, date, price, airline, duration, stops)."""
+        columns = list(zip(*records)) or [() for _ in CSV_FIELDS]
+        return cls.from_columns(*columns)
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "FlightInventory":
+        """Build from a CSV file with a CSV_FIELDS header."""
+        with open(csv_path, "r", encoding="utf-8", newline="") as file:
+            reader = csv.DictReader(file)
+            return cls.from_records(
+                tuple(row[field] for field in CSV_FIELDS) for row in reader
+            )
+
+    @classmethod
+    def from_parquet(cls, parquet_path: str) -> "FlightInventory":
+        """Build from a Parquet file with CSV_FIELDS columns (needs pyarrow)."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Loading Parquet flight data requires pyarrow (pip install pyarrow)"
+            )
+        table = pq.read_table(parquet_path, columns=list(CSV_FIELDS))
+        # Columns go to numpy whole; strings become fixed-width unicode
+        return cls.from_columns(
+            *(table[f].to_numpy(zero_copy_only=False) for f in CSV_FIELDS)
+        )
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            # Replace rather than overwrite, so processes still mapping the
+            # old files keep a consistent copy
+            path = os.path.join(directory, f"{name}.npy")
+            with open(path + ".tmp", "wb") as file:
+                np.save(file, self.columns[name])
+            os.replace(path + ".tmp", path)
+        dictionary = {
+            "version": INVENTORY_FORMAT_VERSION,
+            "airports": self.airports,
+            "airlines": self.airlines,
+            "first_day": self.first_day,
+        }
+        # The dictionary is written last, so a directory without one is
+        # never mistaken for a complete inventory
+        tmp_path = os.path.join(directory, DICTIONARY_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(dictionary, file)
+        os.replace(tmp_path, os.path.join(directory, DICTIONARY_FILE))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "FlightInventory":
+        """Load a saved inventory, memory-mapping the columns by default."""
+        with open(os.path.join(directory, DICTIONARY_FILE), encoding="utf-8") as f:
+            dictionary = json.load(f)
+        if dictionary.get("version") != INVENTORY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported flight inventory format in {directory}")
+        columns = {
+            name: np.load(
+                os.path.join(directory, f"{name}.npy"),
+                mmap_mode="r" if mmap else None,
+            )
+            for name in COLUMNS
+        }
+        return cls(
+            columns,
+            dictionary["airports"],
+            dictionary["airlines"],
+            dictionary["first_day"],
+        )
+
+    def _route_base(self, origin: str, destination: str) -> Optional[int]:
+        o = self.airport_index.get(airport_code(origin))
+        d = self.airport_index.get(airport_code(destination))
+        if o is None or d is None:
+            return None
+        return (o * len(self.airports) + d) * MAX_DATE_SPAN
+
+    def search_rows(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        limit: Optional[int] = None,
+        max_stops: Optional[int] = None,
+        window_days: int = 0,
+    ) -> np.ndarray:
+        """
+        Row indices of flights on the route departing within
+        `window_days` of `departure_date`, cheapest first.
+        """
+        base = self._route_base(origin, destination)
+        if base is None:
+            return np.empty(0, dtype=np.intp)
+        day = to_day(departure_date) - self.first_day
+        low = max(day - window_days, 0)
+        high = min(day + window_days, MAX_DATE_SPAN - 1)
+        if high < low:
+            return np.empty(0, dtype=np.intp)
+
+        start = np.searchsorted(self.route_key, base + low, side="left")
+        stop = np.searchsorted(self.route_key, base + high, side="right")
+        rows = np.arange(start, stop)
+        if max_stops is not None:
+            rows = rows[self.stops[start:stop] <= max_stops]
+        if window_days:
+            # Rows are price-sorted per day only; merge the days by price
+            prices = self.price[rows]
+            if limit is not None and 0 < limit < len(rows):
+                top = np.argpartition(prices, limit - 1)[:limit]
+                rows, prices = rows[top], prices[top]
+            rows = rows[np.argsort(prices, kind="stable")]
+        return rows if limit is None else rows[:limit]
+
+    def row(self, i: int) -> Dict:
+        airports = self.airports
+        route = int(self.route_key[i]) // MAX_DATE_SPAN
+        return {
+            "origin": airports[route // len(airports)],
+            "destination": airports[route % len(airports)],
+            "departure_date": from_day(self.date[i]),
+            "price": float(self.price[i]),
+            "airline": self.airlines[int(self.columns["airline"][i])],
+            "duration": format_duration(int(self.columns["duration"][i])),
+            "stops": int(self.stops[i]),
+        }
+
+
+_inventory = None
+_inventory_lock = threading.Lock()
+
+
+def get_flight_inventory() -> Optional[FlightInventory]:
+    """
+    Process-wide inventory from FLIGHT_INVENTORY_PATH, or None when unset.
+    The path may be a saved inventory directory, which is memory-mapped,
+    or a .csv/.parquet file, which is indexed next to it on first use.
+    """
+    global _inventory
+    path = os.getenv("FLIGHT_INVENTORY_PATH")
+    if not path:
+        return None
+    with _inventory_lock:
+        if _inventory is None:
+            _inventory = load_flight_inventory(path)
+        return _inventory
+
+
+def load_flight_inventory(path: str) -> FlightInventory:
+    if os.path.isdir(path):
+        return FlightInventory.load(path)
+
+    directory = os.path.splitext(path)[0] + "_inventory"
+    dictionary_path = os.path.join(directory, DICTIONARY_FILE)
+    if os.path.exists(dictionary_path) and os.path.getmtime(
+        dictionary_path
+    ) >= os.path.getmtime(path):
+        return FlightInventory.load(directory)
+
+    print(f"🏗️ Indexing flight data from {path}...")
+    if path.endswith(".parquet"):
+        inventory = FlightInventory.from_parquet(path)
+    else:
+        inventory = FlightInventory.from_csv(path)
+    inventory.save(directory)
+    # Reload memory-mapped so the built copy can be freed
+    return FlightInventory.load(directory)
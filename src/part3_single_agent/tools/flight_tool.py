@@ -6,6 +6,11 @@ Simple mock flight search for travel planning.
 from dataclasses import dataclass
 from typing import List
 
+from .flight_inventory import get_flight_inventory
+
+# Flights returned per search when backed by a flight inventory
+MAX_RESULTS = 5
+
 
 @dataclass
 class FlightInfo:
@@ -29,6 +34,14 @@ def search_flights(
     This is a mock service - in real implementation, use Amadeus or Skyscanner API.
     """
     try:
+        # Local schedule and fare data, when FLIGHT_INVENTORY_PATH is set
+        inventory = get_flight_inventory()
+        if inventory is not None:
+            rows = inventory.search_rows(
+                origin, destination, departure_date, limit=MAX_RESULTS
+            )
+            return [FlightInfo(**inventory.row(i)) for i in rows]
+
         # Mock flight data with some variation based on destination
         base_price = 800 if "Tokyo" in destination else 600
 
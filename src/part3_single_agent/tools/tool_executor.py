@@ -0,0 +1,70 @@
+"""
+Travel Tools - Tool Executor
+Bounded thread pool that runs blocking tool backends for async callers,
+with per-call timeouts and cancellation. Kept free of AutoGen imports so
+light processes such as the MCP server can use it.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from src.common.telemetry import span
+
+if TYPE_CHECKING:
+    from autogen_core import CancellationToken
+
+# Seconds a single tool call may take before it is abandoned
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "10"))
+# Blocking backend calls running at once; further calls queue
+DEFAULT_TOOL_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Process-wide bounded pool shared by all blocking tool backends."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_TOOL_WORKERS, thread_name_prefix="tool"
+            )
+        return _executor
+
+
+async def run_blocking(
+    func: Callable[..., Any],
+    *args,
+    timeout: Optional[float] = None,
+    cancellation_token: Optional["CancellationToken"] = None,
+    **kwargs,
+) -> Any:
+    """
+    Await `func(*args, **kwargs)` running on the tool thread pool.
+
+    Raises TimeoutError after `timeout` seconds (default:
+    TOOL_TIMEOUT_SECONDS). A cancelled or timed out call that has not
+    started yet never runs; one that has started finishes in its thread
+    but its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context, so telemetry spans of the
+    # backend nest under this call
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    future = loop.run_in_executor(get_tool_executor(), call)
+    if cancellation_token is not None:
+        cancellation_token.link_future(future)
+
+    timeout = DEFAULT_TOOL_TIMEOUT if timeout is None else timeout
+    name = getattr(func, "__name__", "tool")
+    with span("tool.call", tool=name):
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{name} timed out after {timeout:g}s") from None
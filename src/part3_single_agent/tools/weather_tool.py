@@ -3,14 +3,34 @@ Travel Tools - Weather Service
 Simple mock weather service for travel planning.
 """
 
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from datetime import date
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# The provider always returns this many forecast days; shorter requests
+# are served from the same cache entry
+MAX_FORECAST_DAYS = 5
 
 
 @dataclass
 class WeatherInfo:
     """Weather information data structure."""
 
+    # No per-instance __dict__: many of these are held in the cache
+    __slots__ = (
+        "location",
+        "temperature",
+        "description",
+        "humidity",
+        "wind_speed",
+        "forecast_days",
+    )
+
     location: str
     temperature: float
     description: str
@@ -18,13 +38,31 @@ class WeatherInfo:
     wind_speed: float
     forecast_days: List[Dict[str, Any]]
 
+    def for_request(self, location: str, days: int) -> "WeatherInfo":
+        """Copy for the requested location spelling and number of days."""
+        return WeatherInfo(
+            location=location,
+            temperature=self.temperature,
+            description=self.description,
+            humidity=self.humidity,
+            wind_speed=self.wind_speed,
+            forecast_days=self.forecast_days[:days],
+        )
 
-def get_weather_info(location: str, days: int = 3) -> WeatherInfo:
+
+def normalize_location(location: str) -> str:
+    """Cache key form of a location: case- and whitespace-insensitive."""
+    return " ".join(location.split()).casefold()
+
+
+def fetch_forecasts(locations: List[str]) -> Dict[str, WeatherInfo]:
     """
-    Get weather information for a location.
+    Fetch current weather and a MAX_FORECAST_DAYS forecast for several
+    locations in one provider call.
     This is a mock service - in real implementation, use OpenWeatherMap API.
     """
-    try:
+    forecasts = {}
+    for location in locations:
         # Mock weather forecast data
         mock_forecast = [
             {
@@ -64,22 +102,159 @@ def get_weather_info(location: str, days: int = 3) -> WeatherInfo:
             },
         ]
 
-        return WeatherInfo(
+        forecasts[location] = WeatherInfo(
             location=location,
             temperature=20.5,
             description="Partly cloudy with occasional showers",
             humidity=65,
             wind_speed=12.5,
-            forecast_days=mock_forecast[:days],
+            forecast_days=mock_forecast[:MAX_FORECAST_DAYS],
         )
+    return forecasts
+
+
+class ForecastCache:
+    """
+    Thread-safe LRU cache of provider forecasts keyed by normalized
+    location and calendar day, with per-entry TTL.
+
+    Concurrent misses for the same key are coalesced: the first caller
+    fetches, the others wait for its result, so each key costs at most
+    one upstream call at a time.
+    """
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(location: str) -> Tuple[str, str]:
+        return normalize_location(location), date.today().isoformat()
+
+    def get_many(
+        self, locations: Iterable[str], fetch=fetch_forecasts
+    ) -> List[WeatherInfo]:
+        """
+        Forecasts for `locations` in order. Keys that are neither cached
+        nor being fetched by another caller are fetched with a single
+        `fetch(locations)` call.
+        """
+        locations = list(locations)
+        keys = [self.key(location) for location in locations]
+        results: Dict[Tuple[str, str], WeatherInfo] = {}
+        owned: Dict[Tuple[str, str], str] = {}
+        waiting: Dict[Tuple[str, str], Future] = {}
+
+        now = time.monotonic()
+        with self._lock:
+            for location, key in zip(locations, keys):
+                if key in results or key in owned or key in waiting:
+                    continue
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    results[key] = entry[1]
+                    self.hits += 1
+                    continue
+                self.misses += 1
+                if key in self._in_flight:
+                    waiting[key] = self._in_flight[key]
+                else:
+                    self._in_flight[key] = Future()
+                    owned[key] = location
+
+        if owned:
+            self._fetch(owned, fetch, results)
+        for key, future in waiting.items():
+            results[key] = future.result()
+
+        return [results[key] for key in keys]
+
+    def _fetch(self, owned, fetch, results):
+        try:
+            self.fetches += 1
+            fetched = fetch(list(owned.values()))
+            infos = {key: fetched[location] for key, location in owned.items()}
+        except BaseException as e:
+            # Waiters share the failure; the next call retries
+            with self._lock:
+                for key in owned:
+                    self._in_flight.pop(key).set_exception(e)
+            raise
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, info in infos.items():
+                self._entries[key] = (expires_at, info)
+                self._entries.move_to_end(key)
+                self._in_flight.pop(key).set_result(info)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        results.update(infos)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_forecast_cache: Optional[ForecastCache] = None
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Process-wide cache configured from WEATHER_CACHE_TTL / _SIZE."""
+    global _forecast_cache
+    if _forecast_cache is None:
+        _forecast_cache = ForecastCache(
+            ttl_seconds=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+            max_entries=int(os.getenv("WEATHER_CACHE_SIZE", "1024")),
+        )
+    return _forecast_cache
+
+
+def _unavailable(location: str) -> WeatherInfo:
+    return WeatherInfo(
+        location=location,
+        temperature=20,
+        description="Weather data unavailable",
+        humidity=50,
+        wind_speed=10,
+        forecast_days=[],
+    )
+
+
+def get_weather_info(location: str, days: int = 3) -> WeatherInfo:
+    """
+    Get weather information for a location.
+    This is a mock service - in real implementation, use OpenWeatherMap API.
+    """
+    try:
+        (info,) = get_forecast_cache().get_many([location])
+        return info.for_request(location, days)
 
     except Exception as e:
         print(f"Weather service error: {e}")
-        return WeatherInfo(
-            location=location,
-            temperature=20,
-            description="Weather data unavailable",
-            humidity=50,
-            wind_speed=10,
-            forecast_days=[],
-        )
+        return _unavailable(location)
+
+
+def get_weather_info_batch(locations: List[str], days: int = 3) -> List[WeatherInfo]:
+    """
+    Get weather information for several locations, fetching all uncached
+    ones in a single provider call.
+    """
+    # Iterated more than once below, so a generator must not be used up
+    locations = list(locations)
+    try:
+        infos = get_forecast_cache().get_many(locations)
+        return [
+            info.for_request(location, days) for location, info in zip(locations, infos)
+        ]
+
+    except Exception as e:
+        print(f"Weather service error: {e}")
+        return [_unavailable(location) for location in locations]
@@ -0,0 +1,203 @@
+"""
+Conversation History Management
+Token-budgeted model context for the multi-agent team: the latest turns
+stay verbatim, older tool results are compressed into short structured
+summaries, and the oldest turns are dropped once an agent's context
+would exceed its token budget. Every model call's prompt size is
+recorded so cost growth per turn can be checked.
+"""
+
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+from typing_extensions import Self
+
+from autogen_core import Component
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import (
+    FunctionExecutionResult,
+    FunctionExecutionResultMessage,
+    LLMMessage,
+    UserMessage,
+)
+
+from src.common.telemetry import count, enabled
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(messages: List[LLMMessage]) -> int:
+    """Rough token count of messages at about four characters per token."""
+    chars = 0
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(message, FunctionExecutionResultMessage):
+            chars += sum(len(result.content) + len(result.name) for result in content)
+        elif isinstance(content, list):
+            # Function calls, or multimodal user content
+            for item in content:
+                chars += len(getattr(item, "arguments", "") or str(item))
+                chars += len(getattr(item, "name", ""))
+    return chars // 4 + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def summarize_tool_result(result: FunctionExecutionResult, max_chars: int) -> str:
+    """Structured, size-capped stand-in for an old tool result."""
+    text = " ".join(result.content.split())
+    summary = {"tool": result.name, "result": text[:max_chars]}
+    if len(text) > max_chars:
+        summary["omitted_chars"] = len(text) - max_chars
+    if result.is_error:
+        summary["error"] = True
+    return json.dumps(summary, ensure_ascii=False)
+
+
+class ContextTokenReport:
+    """Prompt tokens of every model call, per context label, in call order."""
+
+    def __init__(self):
+        self._turns: Dict[str, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, label: str, tokens: int) -> None:
+        with self._lock:
+            self._turns[label].append(tokens)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._turns.clear()
+
+    def turns(self) -> Dict[str, List[int]]:
+        with self._lock:
+            return {label: list(tokens) for label, tokens in self._turns.items()}
+
+    def summary(self) -> str:
+        lines = []
+        total = 0
+        for label, tokens in sorted(self.turns().items()):
+            total += sum(tokens)
+            series = ", ".join(str(t) for t in tokens)
+            lines.append(f"   {label}: {series}")
+        return "\n".join([f"🧮 Prompt tokens per turn (total ~{total}):", *lines])
+
+
+class BudgetedChatCompletionContextConfig(BaseModel):
+    token_budget: int
+    keep_last: int = 6
+    summary_chars: int = 300
+    label: str = ""
+    initial_messages: Optional[List[LLMMessage]] = None
+
+
+class BudgetedChatCompletionContext(
+    ChatCompletionContext, Component[BudgetedChatCompletionContextConfig]
+):
+    """
+    Model context capped at `token_budget` tokens.
+
+    The last `keep_last` messages are passed verbatim; tool results before
+    them are replaced by summaries of at most `summary_chars` characters.
+    If that is still over budget, the oldest messages after the opening
+    task are dropped, never leaving a tool result without its call.
+    """
+
+    component_config_schema = BudgetedChatCompletionContextConfig
+    component_provider_override = (
+        "src.part4_multi_agent.history.BudgetedChatCompletionContext"
+    )
+
+    def __init__(
+        self,
+        token_budget: int,
+        keep_last: int = 6,
+        summary_chars: int = 300,
+        label: str = "",
+        initial_messages: Optional[List[LLMMessage]] = None,
+        report: Optional[ContextTokenReport] = None,
+        count_tokens: Callable[[List[LLMMessage]], int] = estimate_tokens,
+    ):
+        super().__init__(initial_messages)
+        if token_budget <= 0:
+            raise ValueError("token_budget must be greater than 0.")
+        self.token_budget = token_budget
+        self.keep_last = keep_last
+        self.summary_chars = summary_chars
+        self.label = label
+        self.report = report
+        self._count_tokens = count_tokens
+
+    def _compress(self, messages: List[LLMMessage]) -> List[LLMMessage]:
+        cutoff = max(len(messages) - self.keep_last, 0)
+        compressed = []
+        for i, message in enumerate(messages):
+            if i < cutoff and isinstance(message, FunctionExecutionResultMessage):
+                message = FunctionExecutionResultMessage(
+                    content=[
+                        FunctionExecutionResult(
+                            content=summarize_tool_result(result, self.summary_chars),
+                            name=result.name,
+                            call_id=result.call_id,
+                            is_error=result.is_error,
+                        )
+                        for result in message.content
+                    ]
+                )
+            compressed.append(message)
+        return compressed
+
+    def _fit(self, messages: List[LLMMessage]) -> List[LLMMessage]:
+        # Keep the opening task: everything else refers back to it
+        head = messages[:1] if messages and isinstance(messages[0], UserMessage) else []
+        body = messages[len(head) :]
+        while len(body) > 1 and self._count_tokens(head + body) > self.token_budget:
+            body = body[1:]
+            # A tool result must follow its function call message
+            while body and isinstance(body[0], FunctionExecutionResultMessage):
+                body = body[1:]
+        return head + body
+
+    async def get_messages(self) -> List[LLMMessage]:
+        messages = self._fit(self._compress(self._messages))
+        if self.report is not None or enabled():
+            tokens = self._count_tokens(messages)
+            if self.report is not None:
+                self.report.record(self.label, tokens)
+            count(
+                "agent_context_tokens_total",
+                tokens,
+                "Estimated prompt tokens of history sent per agent",
+                agent=self.label,
+            )
+        return messages
+
+    def _to_config(self) -> BudgetedChatCompletionContextConfig:
+        return BudgetedChatCompletionContextConfig(
+            token_budget=self.token_budget,
+            keep_last=self.keep_last,
+            summary_chars=self.summary_chars,
+            label=self.label,
+            initial_messages=self._initial_messages,
+        )
+
+    @classmethod
+    def _from_config(cls, config: BudgetedChatCompletionContextConfig) -> Self:
+        return cls(**config.model_dump())
+
+
+def budgeted_context(
+    label: str, report: Optional[ContextTokenReport] = None
+) -> BudgetedChatCompletionContext:
+    """Context configured from HISTORY_TOKEN_BUDGET / HISTORY_KEEP_LAST."""
+    return BudgetedChatCompletionContext(
+        token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "3000")),
+        keep_last=int(os.getenv("HISTORY_KEEP_LAST", "6")),
+        label=label,
+        report=report,
+    )
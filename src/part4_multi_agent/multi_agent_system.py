@@ -4,70 +4,49 @@ Specialized agents collaborating for comprehensive travel planning.
 """
 
 import os
+import sys
+import time
 from dotenv import load_dotenv
 
-# AutoGen imports
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import SelectorGroupChat
-from autogen_agentchat.conditions import TextMentionTermination
-from autogen_agentchat.ui import Console
+# Add the project root to the path so we can import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 # Import our custom tools
 from src.part3_single_agent.tools.weather_tool import get_weather_info
 from src.part3_single_agent.tools.flight_tool import search_flights
 from src.part3_single_agent.tools.currency_tool import convert_currency
+from src.common.model_clients import get_agent_model_client, lazy_client
+from src.common.tool_memo import format_tool_stats, memoize_tool
 
 # Load environment variables
 load_dotenv()
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-
-# Create OpenAI client for GitHub Models
-model_client = OpenAIChatCompletionClient(
-    model="gpt-4o-mini",
-    api_key=GITHUB_TOKEN,
-    base_url="https://models.inference.ai.azure.com",
-)
-
-# Flight Agent
-flight_agent = AssistantAgent(
-    name="FlightAgent",
-    description="An agent for searching flight information",
-    model_client=model_client,
-    tools=[search_flights],
-    system_message="""
+
+# Create OpenAI client for GitHub Models on first use
+# (shared connection pool and rate-limit-aware scheduler; recorded to or
+# replayed from a cassette when MODEL_CASSETTE_MODE is set)
+get_model_client = lazy_client(lambda: get_agent_model_client("gpt-4o-mini"))
+
+# Agents repeat the same lookups within a conversation and across
+# sessions; serve repeats from a short-lived cache (rates change fastest)
+search_flights = memoize_tool(search_flights, ttl_seconds=300)
+get_weather_info = memoize_tool(get_weather_info, ttl_seconds=600)
+convert_currency = memoize_tool(convert_currency, ttl_seconds=60)
+
+FLIGHT_AGENT_PROMPT = """
     You are a flight search agent.
     Your only tool is search_flights - use it to find information.
     You make only one search call at a time.
     Once you have the results, you never do calculations based on them.
-    """,
-    reflect_on_tool_use=True,
-    model_client_stream=True,
-)
-
-# Weather Agent
-weather_agent = AssistantAgent(
-    name="WeatherAgent",
-    description="An agent for searching weather information",
-    model_client=model_client,
-    tools=[get_weather_info],
-    system_message="""
+    """
+
+WEATHER_AGENT_PROMPT = """
     You are a weather search agent.
     Your only tool is get_weather_info - use it to find information.
     You make only one search call at a time.
     Once you have the results, you never do calculations based on them.
-    """,
-    reflect_on_tool_use=True,
-    model_client_stream=True,
-)
-
-# Budget Agent
-budget_agent = AssistantAgent(
-    name="BudgetAgent",
-    description="An agent for searching budget information.",
-    model_client=model_client,
-    tools=[convert_currency],
-    system_message="""
+    """
+
+BUDGET_AGENT_PROMPT = """
     You are a travel budget agent.
     Your job is to find the best currency conversion rates and budget options for travel.
     Your only tool is convert_currency - use it for currency conversion tasks.
@@ -75,17 +54,9 @@ budget_agent = AssistantAgent(
     This means you need to look at the flight prices and the budget in the same currency.
     You make only one search call at a time.
     Once you have the results, you never do calculations based on them.
-    """,
-    reflect_on_tool_use=True,
-    model_client_stream=True,
-)
-
-# Planning Agent
-planning_agent = AssistantAgent(
-    name="PlanningAgent",
-    description="An agent for planning tasks, this agent should be the first to engage when given a new task.",
-    model_client=model_client,
-    system_message="""
+    """
+
+PLANNING_AGENT_PROMPT = """
     You are a planning agent.
     Your job is to break down complex tasks into smaller, manageable subtasks.
     Your team members are:
@@ -103,21 +74,7 @@ planning_agent = AssistantAgent(
     You can assign repetitive tasks to the same agent.
 
     Only after all tasks are complete, and the answer is summarized, and sufficient information is provided to the user query, end with "FINISHED".
-    """,
-    reflect_on_tool_use=True,
-    model_client_stream=True,
-)
-
-# Define a termination condition that stops the task if the critic approves.
-text_termination = TextMentionTermination("FINISHED")
-
-# Create the multi-agent team
-agents = [
-    planning_agent,
-    flight_agent,
-    weather_agent,
-    budget_agent,
-]
+    """
 
 selector_prompt = """
     Select an agent to perform task.
@@ -132,26 +89,168 @@ selector_prompt = """
     Only select one agent.
     """
 
-team = SelectorGroupChat(
-    agents,
-    model_client=model_client,
-    termination_condition=text_termination,
-    selector_prompt=selector_prompt,
-    allow_repeated_speaker=True,
-)
 
+class TravelTeam:
+    """
+    The planning and specialist agents, built on first use rather than at
+    import, with both ways of running them.
+    """
+
+    def __init__(self, model_client):
+        # AutoGen is imported here, not at module load, so importing this
+        # module (or the CLI) stays fast
+        from autogen_agentchat.agents import AssistantAgent
+        from autogen_agentchat.teams import SelectorGroupChat
+        from autogen_agentchat.conditions import TextMentionTermination
+
+        from src.part4_multi_agent.history import (
+            ContextTokenReport,
+            budgeted_context,
+        )
+        from src.part4_multi_agent.parallel_plan import ParallelPlanRunner
+        from src.part4_multi_agent.speaker_selection import PlanSelector
 
-async def main(query):
+        # Each agent (and the selector) sees a token-budgeted view of the
+        # history instead of the full, ever-growing transcript
+        history_report = ContextTokenReport()
+
+        # Flight Agent
+        flight_agent = AssistantAgent(
+            name="FlightAgent",
+            description="An agent for searching flight information",
+            model_client=model_client,
+            model_context=budgeted_context("FlightAgent", history_report),
+            tools=[search_flights],
+            system_message=FLIGHT_AGENT_PROMPT,
+            reflect_on_tool_use=True,
+            model_client_stream=True,
+        )
+
+        # Weather Agent
+        weather_agent = AssistantAgent(
+            name="WeatherAgent",
+            description="An agent for searching weather information",
+            model_client=model_client,
+            model_context=budgeted_context("WeatherAgent", history_report),
+            tools=[get_weather_info],
+            system_message=WEATHER_AGENT_PROMPT,
+            reflect_on_tool_use=True,
+            model_client_stream=True,
+        )
+
+        # Budget Agent
+        budget_agent = AssistantAgent(
+            name="BudgetAgent",
+            description="An agent for searching budget information.",
+            model_client=model_client,
+            model_context=budgeted_context("BudgetAgent", history_report),
+            tools=[convert_currency],
+            system_message=BUDGET_AGENT_PROMPT,
+            reflect_on_tool_use=True,
+            model_client_stream=True,
+        )
+
+        # Planning Agent
+        planning_agent = AssistantAgent(
+            name="PlanningAgent",
+            description="An agent for planning tasks, this agent should be the first to engage when given a new task.",
+            model_client=model_client,
+            model_context=budgeted_context("PlanningAgent", history_report),
+            system_message=PLANNING_AGENT_PROMPT,
+            reflect_on_tool_use=True,
+            model_client_stream=True,
+        )
+
+        # Define a termination condition that stops the task if the critic approves.
+        text_termination = TextMentionTermination("FINISHED")
+
+        # Create the multi-agent team
+        agents = [
+            planning_agent,
+            flight_agent,
+            weather_agent,
+            budget_agent,
+        ]
+
+        # Route PlanningAgent's numbered assignments without an LLM call; the
+        # selector prompt above is only used when the next speaker is ambiguous
+        plan_selector = PlanSelector(
+            planner=planning_agent.name,
+            specialists=[flight_agent.name, weather_agent.name, budget_agent.name],
+        )
+
+        team = SelectorGroupChat(
+            agents,
+            model_client=plan_selector.timed(model_client),
+            model_context=budgeted_context("Selector", history_report),
+            termination_condition=text_termination,
+            selector_prompt=selector_prompt,
+            allow_repeated_speaker=True,
+            selector_func=plan_selector,
+        )
+
+        # Alternative execution mode: run independent subtasks of the plan
+        # concurrently, and dependent ones (budget checks on flight prices) after
+        parallel_runner = ParallelPlanRunner(
+            planning_agent,
+            [flight_agent, weather_agent, budget_agent],
+            termination_text="FINISHED",
+        )
+
+        self.history_report = history_report
+        self.plan_selector = plan_selector
+        self.team = team
+        self.parallel_runner = parallel_runner
+
+
+async def main(query, parallel=False):
     """Run the multi-agent travel planning system."""
-    await Console(team.run_stream(task=query))
-    await model_client.close()
+    from autogen_agentchat.ui import Console
+
+    travel_team = TravelTeam(get_model_client())
+    started = time.perf_counter()
+    try:
+        if parallel:
+            await Console(travel_team.parallel_runner.run_stream(query))
+        else:
+            await Console(travel_team.team.run_stream(task=query))
+    finally:
+        await get_model_client().close()
+
+    print(f"⏱️ Conversation took {time.perf_counter() - started:.1f}s")
+    if parallel:
+        print(travel_team.parallel_runner.stats.summary())
+    else:
+        # Every turn routed by plan leaves no selector call to time, so fall
+        # back to the configured per-call estimate
+        print(
+            travel_team.plan_selector.stats.summary(
+                float(os.getenv("SELECTOR_LLM_SECONDS_ESTIMATE", "1.5"))
+            )
+        )
+    print(travel_team.history_report.summary())
+    tool_report = format_tool_stats()
+    if tool_report:
+        print(tool_report)
 
 
 if __name__ == "__main__":
+    import argparse
     import asyncio
 
-    # Example query - change this to test different scenarios
-    query = "find flights from New York City (NYC) to Tokyo on 2025-09-15, provide the expected weather in Tokyo around that date, and convert 100 USD to JPY."
-    # query = "I have a budget of 100000 JPY, and I want to find flights to Tokyo on 2025-09-15."
+    parser = argparse.ArgumentParser(description="Multi-agent travel planner")
+    # Example query - pass different ones to test different scenarios
+    # e.g. "I have a budget of 100000 JPY, and I want to find flights to Tokyo on 2025-09-15."
+    parser.add_argument(
+        "query",
+        nargs="?",
+        default="find flights from New York City (NYC) to Tokyo on 2025-09-15, provide the expected weather in Tokyo around that date, and convert 100 USD to JPY.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run independent subtasks of the plan concurrently",
+    )
+    args = parser.parse_args()
 
-    asyncio.run(main(query))
+    asyncio.run(main(args.query, parallel=args.parallel))
@@ -0,0 +1,237 @@
+"""
+Parallel Plan Execution
+Runs PlanningAgent's subtasks as a dependency graph: independent
+assignments go to their agents concurrently, dependent ones wait for the
+results they need, and everything is joined back into the conversation
+before PlanningAgent summarises.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern, Sequence, Set
+
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.messages import BaseChatMessage, TextMessage
+from autogen_core import CancellationToken
+
+from src.common.telemetry import record_llm_usage, span
+from src.part4_multi_agent.plan_parsing import Assignment, parse_plan
+
+# Dependent agent -> {agent it needs results from: when its task mentions}
+DEFAULT_IMPLICIT_DEPENDENCIES: Dict[str, Dict[str, Pattern]] = {
+    # A budget check needs flight prices, a plain conversion does not
+    "BudgetAgent": {
+        "FlightAgent": re.compile(
+            r"flight|fare|ticket|price|cost|afford|enough|sufficient", re.I
+        ),
+    },
+}
+# Explicit references such as "using the results of step 1"
+STEP_REFERENCE_RE = re.compile(r"\b(?:step|task)\s*#?\s*(\d+)", re.I)
+
+
+def plan_dependencies(
+    plan: Sequence[Assignment],
+    implicit: Dict[str, Dict[str, Pattern]] = DEFAULT_IMPLICIT_DEPENDENCIES,
+) -> List[Set[int]]:
+    """
+    Indices of the earlier assignments each assignment has to wait for:
+    explicit step references, implicit agent dependencies, and earlier
+    work of the same agent (one agent handles one task at a time).
+    """
+    dependencies = []
+    for i, assignment in enumerate(plan):
+        waits_for = set()
+        referenced = {int(n) for n in STEP_REFERENCE_RE.findall(assignment.task)}
+        providers = implicit.get(assignment.agent, {})
+        for j, earlier in enumerate(plan[:i]):
+            if earlier.step in referenced or earlier.agent == assignment.agent:
+                waits_for.add(j)
+                continue
+            pattern = providers.get(earlier.agent)
+            if pattern is not None and pattern.search(assignment.task):
+                waits_for.add(j)
+        dependencies.append(waits_for)
+    return dependencies
+
+
+def critical_path_seconds(
+    dependencies: List[Set[int]], durations: List[float]
+) -> float:
+    """Longest chain of dependent step durations."""
+    finish = []
+    for i, waits_for in enumerate(dependencies):
+        start = max((finish[j] for j in waits_for), default=0.0)
+        finish.append(start + durations[i])
+    return max(finish, default=0.0)
+
+
+def _record_turn_usage(turn_span, agent_name, messages) -> None:
+    """Token usage of an agent's turn, summed over its messages."""
+    prompt_tokens = completion_tokens = 0
+    for message in messages:
+        usage = getattr(message, "models_usage", None)
+        if usage is not None:
+            prompt_tokens += usage.prompt_tokens
+            completion_tokens += usage.completion_tokens
+    turn_span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    record_llm_usage(prompt_tokens, completion_tokens, label=agent_name)
+
+
+@dataclass
+class PlanRunStats:
+    """Latency profile of one parallel plan execution."""
+
+    wall_seconds: float = 0.0
+    step_seconds: List[float] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+
+    def summary(self) -> str:
+        sequential = sum(self.step_seconds)
+        return (
+            f"🔀 {len(self.step_seconds)} subtasks in {self.wall_seconds:.1f}s "
+            f"(sum of subtasks {sequential:.1f}s, "
+            f"critical path {self.critical_path_seconds:.1f}s)"
+        )
+
+
+class ParallelPlanRunner:
+    """
+    Execution mode for the planner/specialist team that replaces
+    SelectorGroupChat's one-speaker-at-a-time loop with a plan DAG.
+
+    `run_stream(task)` yields the conversation's messages as they are
+    produced and ends with a TaskResult, so it can be passed to Console.
+    """
+
+    def __init__(
+        self,
+        planner,
+        specialists: Sequence,
+        termination_text: str = "FINISHED",
+        max_rounds: int = 3,
+        implicit_dependencies: Dict[
+            str, Dict[str, Pattern]
+        ] = DEFAULT_IMPLICIT_DEPENDENCIES,
+    ):
+        self.planner = planner
+        self.specialists = {agent.name: agent for agent in specialists}
+        self.termination_text = termination_text
+        self.max_rounds = max_rounds
+        self.implicit_dependencies = implicit_dependencies
+        self.stats = PlanRunStats()
+
+    async def _run_step(self, task, assignment, inputs, cancellation_token):
+        agent = self.specialists[assignment.agent]
+        request = TextMessage(
+            content=f"User request: {task}\n\nYour task: {assignment.task}",
+            source=self.planner.name,
+        )
+        started = time.perf_counter()
+        with span("agent.turn", agent=agent.name, step=assignment.step) as turn_span:
+            try:
+                response = await agent.on_messages(
+                    [*inputs, request], cancellation_token
+                )
+                messages = [*response.inner_messages, response.chat_message]
+            except Exception as e:
+                # Report the failure to the planner instead of aborting the plan
+                turn_span.set(error=str(e))
+                messages = [
+                    TextMessage(content=f"Subtask failed: {e}", source=agent.name)
+                ]
+            _record_turn_usage(turn_span, agent.name, messages)
+        return messages, time.perf_counter() - started
+
+    async def _execute_plan(self, task, plan, output, cancellation_token):
+        """Run the plan's DAG, putting messages on `output` as steps finish."""
+        dependencies = plan_dependencies(plan, self.implicit_dependencies)
+        steps: List[asyncio.Task] = []
+        durations = [0.0] * len(plan)
+
+        async def run(i, assignment):
+            # Dependencies always point at earlier steps, so no cycles
+            inputs = []
+            for j in sorted(dependencies[i]):
+                messages = await steps[j]
+                inputs.append(messages[-1])
+            messages, durations[i] = await self._run_step(
+                task, assignment, inputs, cancellation_token
+            )
+            for message in messages:
+                await output.put(message)
+            return messages
+
+        for i, assignment in enumerate(plan):
+            steps.append(asyncio.ensure_future(run(i, assignment)))
+        try:
+            results = await asyncio.gather(*steps)
+        finally:
+            for step in steps:
+                step.cancel()
+
+        self.stats.step_seconds.extend(durations)
+        self.stats.critical_path_seconds += critical_path_seconds(
+            dependencies, durations
+        )
+        # Final answers in plan order, for the planner to summarise
+        return [messages[-1] for messages in results]
+
+    async def run_stream(
+        self, task: str, cancellation_token: Optional[CancellationToken] = None
+    ):
+        cancellation_token = cancellation_token or CancellationToken()
+        self.stats = PlanRunStats()
+        started = time.perf_counter()
+        transcript: List = []
+        stop_reason = None
+
+        planner_input: List[BaseChatMessage] = [
+            TextMessage(content=task, source="user")
+        ]
+        transcript.append(planner_input[0])
+        yield planner_input[0]
+
+        for _ in range(self.max_rounds):
+            with span("agent.turn", agent=self.planner.name) as turn_span:
+                response = await self.planner.on_messages(
+                    planner_input, cancellation_token
+                )
+                planner_messages = [*response.inner_messages, response.chat_message]
+                _record_turn_usage(turn_span, self.planner.name, planner_messages)
+            for message in planner_messages:
+                transcript.append(message)
+                yield message
+
+            text = response.chat_message.to_text()
+            if self.termination_text in text:
+                stop_reason = f"Text '{self.termination_text}' mentioned"
+                break
+            plan = parse_plan(text, self.specialists)
+            if not plan:
+                stop_reason = "Planner made no assignments"
+                break
+
+            output: asyncio.Queue = asyncio.Queue()
+            execution = asyncio.ensure_future(
+                self._execute_plan(task, plan, output, cancellation_token)
+            )
+            while not (execution.done() and output.empty()):
+                getter = asyncio.ensure_future(output.get())
+                await asyncio.wait(
+                    {getter, execution}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter.done():
+                    transcript.append(getter.result())
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            # Join the results back into the planner's conversation
+            planner_input = await execution
+        else:
+            stop_reason = f"Maximum of {self.max_rounds} planning rounds reached"
+
+        self.stats.wall_seconds = time.perf_counter() - started
+        yield TaskResult(messages=transcript, stop_reason=stop_reason)
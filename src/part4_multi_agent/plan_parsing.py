@@ -0,0 +1,37 @@
+"""
+Plan Parsing
+Reads PlanningAgent's "1. <agent> : <task>" assignments out of its
+messages so the team can route turns without asking the LLM.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List
+
+# "1. FlightAgent : find flights", also "2) **WeatherAgent**: ..." markdown
+ASSIGNMENT_RE = re.compile(
+    r"^\s*(\d+)\s*[.)]\s*\**\s*([A-Za-z_]\w*)\s*\**\s*:\s*\**\s*(.+?)\s*$",
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """One numbered subtask of a plan."""
+
+    step: int
+    agent: str
+    task: str
+
+
+def parse_plan(text: str, agent_names: Iterable[str]) -> List[Assignment]:
+    """
+    Assignments in `text` addressed to one of `agent_names`, in the order
+    they are listed. Lines naming anyone else are ignored.
+    """
+    names = set(agent_names)
+    return [
+        Assignment(int(step), agent, task)
+        for step, agent, task in ASSIGNMENT_RE.findall(text)
+        if agent in names
+    ]
@@ -0,0 +1,169 @@
+"""
+Speaker Selection
+Rule-based fast path for SelectorGroupChat: dispatches PlanningAgent's
+numbered assignments in order and only falls back to the LLM selector
+when the next speaker is ambiguous.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from autogen_agentchat.messages import BaseChatMessage
+from autogen_core.models import ChatCompletionClient, CreateResult
+
+from src.common.telemetry import span
+from src.part4_multi_agent.plan_parsing import parse_plan
+
+
+@dataclass
+class SelectorStats:
+    """Speaker selections of one conversation, by how they were made."""
+
+    rule_selections: int = 0
+    llm_selections: int = 0
+    llm_seconds: float = 0.0
+
+    @property
+    def mean_llm_seconds(self) -> float:
+        return self.llm_seconds / self.llm_selections if self.llm_selections else 0.0
+
+    def summary(self, llm_seconds_estimate: Optional[float] = None) -> str:
+        """
+        Report line. Time saved is the avoided LLM calls times the mean
+        measured selector latency (or `llm_seconds_estimate` when this
+        conversation never fell back to the LLM).
+        """
+        per_call = self.mean_llm_seconds or llm_seconds_estimate
+        if not per_call:
+            saved = "time saved unknown (no LLM selection measured yet)"
+        elif self.mean_llm_seconds:
+            saved = f"~{self.rule_selections * per_call:.1f}s saved"
+        else:
+            saved = (
+                f"~{self.rule_selections * per_call:.1f}s saved "
+                f"at an estimated {per_call:.1f}s per selector call"
+            )
+        return (
+            f"🧭 Speaker selection: {self.rule_selections} by plan, "
+            f"{self.llm_selections} by LLM "
+            f"({self.rule_selections} selector LLM calls avoided, {saved})"
+        )
+
+
+class TimedModelClient(ChatCompletionClient):
+    """Delegating model client that reports how long each call takes."""
+
+    def __init__(self, client: ChatCompletionClient, on_call):
+        self._client = client
+        self._on_call = on_call
+
+    async def create(self, *args, **kwargs) -> CreateResult:
+        started = time.perf_counter()
+        try:
+            with span("agent.select_llm"):
+                return await self._client.create(*args, **kwargs)
+        finally:
+            self._on_call(time.perf_counter() - started)
+
+    async def create_stream(self, *args, **kwargs):
+        started = time.perf_counter()
+        # Detached: an async generator may be closed from another context
+        call_span = span("agent.select_llm", stream=True)
+        try:
+            async for chunk in self._client.create_stream(*args, **kwargs):
+                yield chunk
+        finally:
+            call_span.finish()
+            self._on_call(time.perf_counter() - started)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self):
+        return self._client.actual_usage()
+
+    def total_usage(self):
+        return self._client.total_usage()
+
+    def count_tokens(self, messages, **kwargs) -> int:
+        return self._client.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages, **kwargs) -> int:
+        return self._client.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self._client.capabilities
+
+    @property
+    def model_info(self):
+        return self._client.model_info
+
+
+class PlanSelector:
+    """
+    `selector_func` for SelectorGroupChat.
+
+    - A new user message goes to the planner.
+    - After the planner's latest message, its assignments are dispatched
+      in the listed order; once all have answered, the planner speaks
+      again to summarise.
+    - Anything else (no parsable plan, an off-plan speaker) returns None,
+      which makes SelectorGroupChat ask the LLM selector.
+
+    Pass `timed(model_client)` as the team's model client to measure the
+    LLM selector's latency for the report.
+    """
+
+    def __init__(self, planner: str, specialists: Sequence[str]):
+        self.planner = planner
+        self.specialists = list(specialists)
+        self.stats = SelectorStats()
+
+    def reset(self) -> None:
+        """Start counting for a new conversation."""
+        self.stats = SelectorStats()
+
+    def timed(self, client: ChatCompletionClient) -> ChatCompletionClient:
+        return TimedModelClient(client, self._record_llm_call)
+
+    def _record_llm_call(self, seconds: float) -> None:
+        self.stats.llm_selections += 1
+        self.stats.llm_seconds += seconds
+
+    def next_speaker(self, messages: List[BaseChatMessage]) -> Optional[str]:
+        """Deterministic next speaker, or None if it is ambiguous."""
+        if not messages or messages[-1].source == "user":
+            return self.planner
+
+        plan_index = None
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].source == self.planner:
+                plan_index = i
+                break
+        if plan_index is None:
+            return None
+
+        plan = parse_plan(messages[plan_index].to_text(), self.specialists)
+        if not plan:
+            return None
+
+        done = 0
+        for message in messages[plan_index + 1 :]:
+            if done < len(plan) and message.source == plan[done].agent:
+                done += 1
+            else:
+                # Someone spoke out of plan order; let the LLM sort it out
+                return None
+        return plan[done].agent if done < len(plan) else self.planner
+
+    def __call__(self, thread) -> Optional[str]:
+        with span("agent.select") as select_span:
+            messages = [m for m in thread if isinstance(m, BaseChatMessage)]
+            speaker = self.next_speaker(messages)
+            # None hands the decision to SelectorGroupChat's LLM selector
+            select_span.set(speaker=speaker, method="plan" if speaker else "llm")
+        if speaker is not None:
+            self.stats.rule_selections += 1
+        return speaker
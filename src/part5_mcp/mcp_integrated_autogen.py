@@ -3,58 +3,103 @@ Simple Tool-Enabled Travel Agent using AutoGen > 0.4 and GitHub Models
 Demonstrates how external tools enhance agent capabilities.
 """
 
+import asyncio
 import os
+import sys
+import time
 from dotenv import load_dotenv
 
-# AutoGen imports
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.ui import Console
-from autogen_ext.tools.mcp import StdioServerParams, mcp_server_tools
+# Add the project root to the path so we can import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
+from src.common.model_clients import get_agent_model_client, lazy_client
 
 # Load environment variables
 load_dotenv()
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-
-# Create OpenAI client for GitHub Models
-model_client = OpenAIChatCompletionClient(
-    model="gpt-4o-mini",
-    api_key=GITHUB_TOKEN,
-    base_url="https://models.inference.ai.azure.com",
-)
-
-
-# Run the agent and stream the messages to the console.
-async def main(query):
-    # Get the absolute path to the MCP server script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    server_script = os.path.join(current_dir, "mcp_server.py")
-    print("Server script path:", server_script)
-
-    server_params = StdioServerParams(command="python", args=[server_script])
-    mcp_tools = await mcp_server_tools(server_params)
-
-    # Create agent with tools
-    travel_agent = AssistantAgent(
-        name="TravelAgent",
-        model_client=model_client,
+
+# Create OpenAI client for GitHub Models on first use
+# (shared connection pool and rate-limit-aware scheduler; recorded to or
+# replayed from a cassette when MODEL_CASSETTE_MODE is set)
+get_model_client = lazy_client(lambda: get_agent_model_client("gpt-4o-mini"))
+
+
+def create_travel_agent(mcp_tools, name="TravelAgent"):
+    # Imported on first use so importing this module stays fast
+    from autogen_agentchat.agents import AssistantAgent
+
+    return AssistantAgent(
+        name=name,
+        model_client=get_model_client(),
         tools=mcp_tools,
         system_message="""You are a helpful travel planning assistant. 
         You have access to: Flight search - use to find flights between cities
+        For several routes or dates, use the batch flight search in a single call.
         Use these tools to provide comprehensive, practical travel advice.
         Always be specific with dates, amounts, and locations when using tools.""",
         reflect_on_tool_use=True,
         model_client_stream=True,
     )
 
-    await Console(travel_agent.run_stream(task=query))
-    # Close the connection to the model client.
-    await model_client.close()
+
+# Run the agents and stream the messages to the console.
+async def main(queries, pool_size=None):
+    from autogen_agentchat.ui import Console
+
+    from src.part5_mcp.mcp_pool import McpServerPool, default_server_params
+
+    # One warm pool of MCP sessions (server processes for stdio, or
+    # connections to a shared server when MCP_SERVER_URL is set) serves
+    # every agent session; the tool listing is fetched once
+    server_params = default_server_params()
+    pool_size = pool_size or int(os.getenv("MCP_POOL_SIZE", "2"))
+    started = time.perf_counter()
+    try:
+        async with McpServerPool(
+            server_params,
+            size=pool_size,
+            health_check_interval=float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30")),
+        ) as pool:
+            mcp_tools = await pool.tools()
+            ready = time.perf_counter() - started
+            print(f"🔌 {pool_size} MCP sessions ready in {ready:.1f}s")
+
+            # Agent sessions share the pool; a tool call leases a session only
+            # for its own duration
+            if len(queries) == 1:
+                await Console(
+                    create_travel_agent(mcp_tools).run_stream(task=queries[0])
+                )
+            else:
+                results = await asyncio.gather(
+                    *(
+                        create_travel_agent(mcp_tools, f"TravelAgent{i}").run(
+                            task=query
+                        )
+                        for i, query in enumerate(queries, start=1)
+                    )
+                )
+                for query, result in zip(queries, results):
+                    print(f"\n❓ {query}\n{result.messages[-1].to_text()}")
+            if pool.restarts:
+                print(f"♻️ MCP sessions restarted {pool.restarts} time(s)")
+    finally:
+        # Close the connection to the model client (and finish any cassette)
+        await get_model_client().close()
 
 
 if __name__ == "__main__":
-    import asyncio
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MCP-integrated travel agent")
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        default=["find flights from New York City (NYC) to Tokyo on 2025-09-15"],
+        help="One or more queries, run as concurrent agent sessions",
+    )
+    parser.add_argument(
+        "--pool-size", type=int, default=None, help="Warm MCP sessions (MCP_POOL_SIZE)"
+    )
+    args = parser.parse_args()
 
-    query = "find flights from New York City (NYC) to Tokyo on 2025-09-15"
-    asyncio.run(main(query))
+    asyncio.run(main(args.queries, pool_size=args.pool_size))
@@ -0,0 +1,258 @@
+"""
+MCP Server Pool
+Keeps a fixed number of pre-warmed MCP client sessions (one server
+process each for stdio, one connection each for HTTP/SSE) alive across
+agent runs, with periodic health checks, restart-on-failure and
+exclusive session leasing.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import anyio
+from autogen_ext.tools.mcp import (
+    SseServerParams,
+    StdioServerParams,
+    create_mcp_server_session,
+    mcp_server_tools,
+)
+
+from src.common.telemetry import current_span, event, span
+
+SERVER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "mcp_server.py"
+)
+
+# Exceptions that mean the session's transport is gone, not that a
+# single request failed
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+    EOFError,
+)
+
+
+def default_server_params():
+    """
+    SSE params for a shared server when MCP_SERVER_URL is set (e.g.
+    http://127.0.0.1:8000/sse), otherwise stdio params that spawn
+    mcp_server.py with the current interpreter.
+    """
+    url = os.getenv("MCP_SERVER_URL")
+    if url:
+        return SseServerParams(url=url)
+    return StdioServerParams(
+        command=sys.executable, args=[SERVER_SCRIPT], read_timeout_seconds=30
+    )
+
+
+@dataclass
+class _Slot:
+    index: int
+    session: object = None
+    generation: int = 0
+    restarts: int = 0
+    leased: bool = False
+    broken: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class PooledSession:
+    """
+    Stand-in for an MCP ClientSession that runs every request on a
+    leased pool session, so tool adapters built on it spread their calls
+    over the whole pool.
+    """
+
+    def __init__(self, pool: "McpServerPool"):
+        self._pool = pool
+
+    async def list_tools(self, *args, **kwargs):
+        async with self._pool.lease() as session:
+            return await session.list_tools(*args, **kwargs)
+
+    async def call_tool(self, name, *args, **kwargs):
+        with span("mcp.call", tool=name):
+            async with self._pool.lease() as session:
+                return await session.call_tool(name, *args, **kwargs)
+
+
+class McpServerPool:
+    """
+    Pool of `size` initialized MCP sessions to `server_params`.
+
+    Each slot runs in its own task, which owns the session's transport
+    (anyio requires entering and leaving it in the same task). Idle
+    sessions are pinged every `health_check_interval` seconds; a session
+    that fails a ping or breaks during a lease is closed and restarted
+    with exponential backoff.
+
+        async with McpServerPool(default_server_params(), size=4) as pool:
+            tools = await pool.tools()            # shared tool adapters
+            async with pool.lease() as session:   # exclusive session
+                await session.call_tool("mcp_search_flights", {...})
+    """
+
+    def __init__(
+        self,
+        server_params=None,
+        size: int = 2,
+        health_check_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        startup_timeout: float = 60.0,
+    ):
+        self.server_params = server_params or default_server_params()
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.startup_timeout = startup_timeout
+        self._slots: List[_Slot] = []
+        self._tasks: List[asyncio.Task] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._ready: Optional[asyncio.Semaphore] = None
+        self._tools = None
+        self._closing = False
+
+    async def __aenter__(self) -> "McpServerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start every slot and wait until all of them are warm."""
+        self._idle = asyncio.Queue()
+        self._ready = asyncio.Semaphore(0)
+        self._slots = [_Slot(i) for i in range(self.size)]
+        self._tasks = [
+            asyncio.ensure_future(self._run_slot(slot)) for slot in self._slots
+        ]
+
+        async def all_ready():
+            for _ in self._slots:
+                await self._ready.acquire()
+
+        try:
+            await asyncio.wait_for(all_ready(), self.startup_timeout)
+        except asyncio.TimeoutError:
+            warm = sum(slot.session is not None for slot in self._slots)
+            if not warm:
+                await self.close()
+                raise RuntimeError("No MCP server session could be started")
+            event(
+                "mcp.pool_partially_warm",
+                f"⚠️ Only {warm}/{self.size} MCP sessions warm, continuing",
+                level="warning",
+                warm=warm,
+                size=self.size,
+            )
+
+    async def _run_slot(self, slot: _Slot) -> None:
+        backoff = 0.5
+        while not self._closing:
+            try:
+                async with create_mcp_server_session(self.server_params) as session:
+                    await session.initialize()
+                    slot.session = session
+                    slot.generation += 1
+                    slot.broken.clear()
+                    backoff = 0.5
+                    await self._idle.put((slot, slot.generation))
+                    self._ready.release()
+                    await self._watch(slot, session)
+            except Exception as e:
+                if not self._closing:
+                    event(
+                        "mcp.session_failed",
+                        f"⚠️ MCP session {slot.index} failed: {e}",
+                        level="warning",
+                        session=slot.index,
+                        error=str(e),
+                    )
+            slot.session = None
+            if self._closing:
+                return
+            slot.restarts += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _watch(self, slot: _Slot, session) -> None:
+        """Return once the session is broken, failed a ping, or closing."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(
+                    slot.broken.wait(), timeout=self.health_check_interval
+                )
+                return
+            except asyncio.TimeoutError:
+                pass
+            if slot.leased:
+                # A tool call is in flight; a failure there breaks the slot
+                continue
+            try:
+                await asyncio.wait_for(session.send_ping(), self.ping_timeout)
+            except Exception as e:
+                event(
+                    "mcp.health_check_failed",
+                    f"⚠️ MCP session {slot.index} failed health check: {e}",
+                    level="warning",
+                    session=slot.index,
+                    error=str(e),
+                )
+                return
+
+    @asynccontextmanager
+    async def lease(self):
+        """Exclusive use of one warm session until the block exits."""
+        waiting = time.perf_counter()
+        while True:
+            slot, generation = await self._idle.get()
+            # Entries of sessions that have been restarted since are stale
+            if slot.generation == generation and slot.session is not None:
+                break
+        slot.leased = True
+        current_span().set(
+            session=slot.index,
+            lease_ms=round((time.perf_counter() - waiting) * 1000, 3),
+        )
+
+        try:
+            yield slot.session
+        except TRANSPORT_ERRORS:
+            slot.broken.set()
+            raise
+        except BaseException:
+            self._idle.put_nowait((slot, generation))
+            raise
+        else:
+            self._idle.put_nowait((slot, generation))
+        finally:
+            slot.leased = False
+
+    async def tools(self):
+        """Tool adapters for agents; every call runs on a leased session."""
+        if self._tools is None:
+            self._tools = await mcp_server_tools(
+                self.server_params, session=PooledSession(self)
+            )
+        return self._tools
+
+    @property
+    def restarts(self) -> int:
+        return sum(slot.restarts for slot in self._slots)
+
+    async def close(self) -> None:
+        self._closing = True
+        # Cancel rather than wait: a slot may be sleeping in its restart
+        # backoff or stuck starting a server that never answers
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -2,12 +2,16 @@
 
 import sys
 import os
+from typing import List, Optional
+
 from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel
 
 # Add the project root to the path so we can import from src
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from src.part3_single_agent.tools.flight_tool import search_flights
+from src.part3_single_agent.tools.flight_batch import search_flights_batch
 
 # Create an MCP server
 mcp = FastMCP("Search flights MCP Server")
@@ -19,6 +23,48 @@ def mcp_search_flights(origin: str, destination: str, departure_date: str):
     return search_flights(origin, destination, departure_date)
 
 
+class FlightRoute(BaseModel):
+    origin: str
+    destination: str
+    departure_date: str
+
+
+@mcp.tool()
+async def mcp_search_flights_batch(
+    routes: List[FlightRoute],
+    top_k: Optional[int] = 3,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    Search flights for many routes at once (prices in USD). Returns
+    compact results: "fields" names the values of each flight row, and
+    "routes" holds [origin, destination, departure_date, rows] per route,
+    cheapest first. top_k limits flights per route (null for all); fields
+    picks from price, airline, duration, stops (default all).
+    """
+    return await search_flights_batch(
+        [(r.origin, r.destination, r.departure_date) for r in routes],
+        top_k=top_k,
+        field_names=fields,
+    )
+
+
 if __name__ == "__main__":
-    # Run the server using stdio for AutoGen integration
-    mcp.run(transport="stdio")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search flights MCP server")
+    # stdio: one server per client process (spawned by AutoGen)
+    # sse / streamable-http: one long-lived local server shared by many
+    # agent processes, e.g. MCP_SERVER_URL=http://127.0.0.1:8000/sse
+    parser.add_argument(
+        "--transport", choices=["stdio", "sse", "streamable-http"], default="stdio"
+    )
+    parser.add_argument("--host", default=os.getenv("MCP_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("MCP_SERVER_PORT", "8000"))
+    )
+    args = parser.parse_args()
+
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
@@ -0,0 +1,57 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "src", "part2_rag"))
+
+from rag.incremental_index import IncrementalDestinationIndex  # noqa: E402
+
+
+def destination(name, description, attractions, cuisine):
+    return {
+        "destination": name,
+        "description": description,
+        "top_attractions": attractions,
+        "local_cuisine": cuisine,
+        "cultural_tips": "Learn a few local greetings.",
+        "weather_info": "Mild in spring and autumn.",
+    }
+
+
+DESTINATIONS = [
+    destination(
+        "Tokyo, Japan",
+        "Neon city with temples and quiet gardens",
+        ["Senso-ji", "Shibuya Crossing"],
+        ["Sushi", "Ramen"],
+    ),
+    destination(
+        "Bali, Indonesia",
+        "Island of rice terraces, beaches and temples",
+        ["Ubud", "Uluwatu"],
+        ["Nasi goreng"],
+    ),
+]
+
+
+def test_added_destination_is_found_by_its_new_terms():
+    index = IncrementalDestinationIndex(
+        DESTINATIONS, compaction_threshold=10, background_compaction=False
+    )
+    index.add_destination(
+        destination(
+            "Osaka, Japan",
+            "Street food capital of the Kansai region",
+            ["Dotonbori"],
+            ["Takoyaki", "Okonomiyaki"],
+        )
+    )
+
+    matches = index.search_destinations("Osaka takoyaki")
+    assert [dest["destination"] for dest, _ in matches] == ["Osaka, Japan"]
+    # Existing documents are still scored against the widened vocabulary
+    assert index.search_destinations("temples")
+    index.compact()
+    matches = index.search_destinations("Osaka takoyaki")
+    assert [dest["destination"] for dest, _ in matches] == ["Osaka, Japan"]